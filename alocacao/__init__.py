@@ -0,0 +1,28 @@
+"""
+ALOCAÇÃO DE CARGAS:
+- io: leitura das instâncias e persistência dos resultados
+- model: formulação do modelo no Gurobi
+- preprocess: remoção de UMs e veículos inutilizáveis antes do modelo
+- cache: cache dos modelos construídos
+- solve: execução de uma instância e do lote de instâncias
+- reotimizacao: alterações incrementais e reotimização a quente
+- sensibilidade: reotimização em uma grade de fatores de custo
+- pareto: fronteira custo x nível de serviço por epsilon-restrição
+- online: alocação em horizonte rolante de UMs que chegam em fluxo
+- servico: serviço local (HTTP) com fila e trabalhadores do Gurobi
+- campanha: campanha distribuída com fila SQLite em disco compartilhado
+- lagrangian: relaxação lagrangiana (limite inferior e reparo)
+- mochila: mochila de peso e volume com carga mínima (carga de um veículo)
+- colunas: geração de colunas com cargas por veículo
+- espacial: decomposição dos clientes por coordenadas em grupos resolvidos em paralelo
+- heuristics: heurísticas construtivas e conversão de atribuições
+- verificador: verificação vetorizada da viabilidade e do custo de uma solução
+- report: relatórios no terminal e exportação em CSV/Parquet
+- banco: banco SQLite de resultados com consultas entre execuções
+- plots: visualizações dos resultados
+- perfil: medição de tempo e memória por etapa
+- bench: benchmarks de desempenho
+- sweep: varredura de parâmetros do Gurobi
+- gerador: gerador de instâncias
+- cli: linha de comando (python -m alocacao)
+"""
@@ -0,0 +1,277 @@
+import os
+import re
+import sqlite3
+import time
+
+from gurobipy import GRB
+
+from .io import carregar_resultados
+from .model import VERSAO_FORMULACAO
+from .report import linhas_resultados_instancia
+
+# Banco de resultados: cada execução (resumo, parâmetros, tempos por etapa,
+# carga por veículo e linha de cada UM, com o motivo das não alocadas) vai
+# para um arquivo SQLite com índices, em uma transação por instância e
+# inserções em lote. Comparar rodadas vira uma consulta SQL em vez de reler
+# os relatórios CSV. As linhas por UM são as mesmas da exportação
+# incremental (linhas_resultados_instancia).
+#
+# A família é o nome da instância sem a variação final (20v20c300p_c1 ->
+# 20v20c300p, lag_0 -> lag); a posição da raiz fica na coluna raiz. O
+# método (mip, lagrangeano, colunas, espacial) e VERSAO_FORMULACAO
+# identificam a formulação.
+
+NOME_BANCO = 'resultados.db'
+TIMEOUT_BANCO = 60  # s de espera pelo lock do arquivo
+
+_VARIACAO = re.compile(r'_[a-z]?\d+$')
+
+COLUNAS_EXECUCAO = [
+    'instancia', 'familia', 'raiz', 'metodo', 'versao_formulacao', 'campanha',
+    'registrado_em', 'status', 'viavel', 'custo_total', 'melhor_solucao', 'solucao_relaxada',
+    'gap_otimizacao', 'tempo_execucao', 'tempo_para_otimo', 'tempo_limite', 'custo_transporte',
+    'frete_morto_total', 'custo_nao_alocacao', 'veiculos_ativos', 'veiculos_inativos',
+    'ums_alocadas', 'ums_nao_alocadas', 'peso_nao_alocado', 'volume_nao_alocado',
+    'modelo_em_cache', 'iteracoes_decomposicao'
+]
+
+COLUNAS_VEICULO = [
+    'veiculo_id', 'veiculo_tipo', 'destino', 'ums', 'peso_total', 'volume_total',
+    'capacidade_peso', 'capacidade_volume', 'custo_veiculo', 'taxa_utilizacao_peso',
+    'taxa_utilizacao_volume'
+]
+
+COLUNAS_UM = [
+    'um_id', 'um_tipo', 'peso', 'volume', 'cliente_id', 'destino', 'alocada', 'veiculo_id',
+    'motivo'
+]
+
+_ESQUEMA = [
+    f"""CREATE TABLE IF NOT EXISTS execucoes (
+        id INTEGER PRIMARY KEY,
+        {', '.join(COLUNAS_EXECUCAO)},
+        UNIQUE (instancia, metodo, registrado_em)
+    )""",
+    """CREATE TABLE IF NOT EXISTS parametros (
+        execucao_id INTEGER NOT NULL REFERENCES execucoes (id), nome TEXT, valor
+    )""",
+    """CREATE TABLE IF NOT EXISTS etapas (
+        execucao_id INTEGER NOT NULL REFERENCES execucoes (id), etapa TEXT, tempo REAL,
+        pico_memoria_mb REAL
+    )""",
+    f"""CREATE TABLE IF NOT EXISTS veiculos (
+        execucao_id INTEGER NOT NULL REFERENCES execucoes (id), {', '.join(COLUNAS_VEICULO)}
+    )""",
+    f"""CREATE TABLE IF NOT EXISTS ums (
+        execucao_id INTEGER NOT NULL REFERENCES execucoes (id), {', '.join(COLUNAS_UM)}
+    )""",
+    "CREATE INDEX IF NOT EXISTS execucoes_familia ON execucoes (familia, metodo)",
+    "CREATE INDEX IF NOT EXISTS execucoes_metodo ON execucoes (metodo, versao_formulacao)",
+    "CREATE INDEX IF NOT EXISTS execucoes_campanha ON execucoes (campanha)",
+    "CREATE INDEX IF NOT EXISTS parametros_execucao ON parametros (execucao_id)",
+    "CREATE INDEX IF NOT EXISTS parametros_nome ON parametros (nome, valor)",
+    "CREATE INDEX IF NOT EXISTS etapas_execucao ON etapas (execucao_id, etapa)",
+    "CREATE INDEX IF NOT EXISTS veiculos_execucao ON veiculos (execucao_id)",
+    "CREATE INDEX IF NOT EXISTS ums_execucao ON ums (execucao_id, alocada)",
+]
+
+
+def familia_instancia(nome):
+    return _VARIACAO.sub('', nome)
+
+
+def conectar_banco(caminho_banco):
+    # Cria o banco e as tabelas se preciso. Autocommit: as transações são
+    # abertas explicitamente, uma por instância.
+
+    pasta = os.path.dirname(caminho_banco)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+
+    conexao = sqlite3.connect(caminho_banco, timeout=TIMEOUT_BANCO, isolation_level=None)
+    conexao.execute(f"PRAGMA busy_timeout = {TIMEOUT_BANCO * 1000}")
+    for comando in _ESQUEMA:
+        conexao.execute(comando)
+
+    return conexao
+
+
+def _linha_execucao(resultados, instancia, campanha, registrado_em):
+    nome = resultados['tipo_instancia']
+    verificacao = resultados.get('verificacao')
+
+    linha = {coluna: resultados.get(coluna) for coluna in COLUNAS_EXECUCAO}
+    linha.update({
+        'instancia': nome,
+        'familia': familia_instancia(nome),
+        'raiz': instancia.get('raiz'),
+        'metodo': resultados.get('metodo', 'mip'),
+        'versao_formulacao': VERSAO_FORMULACAO,
+        'campanha': campanha,
+        'registrado_em': registrado_em,
+        'viavel': int(verificacao['viavel']) if verificacao else None,
+        'modelo_em_cache': int(bool(resultados.get('modelo_em_cache'))),
+    })
+
+    return [linha[coluna] for coluna in COLUNAS_EXECUCAO]
+
+
+def _inserir(conexao, resultados, instancia, parametros, campanha, registrado_em):
+    # Retorna o id da execução ou None se ela já estava no banco
+
+    cursor = conexao.execute(
+        f"INSERT OR IGNORE INTO execucoes ({', '.join(COLUNAS_EXECUCAO)}) "
+        f"VALUES ({', '.join('?' * len(COLUNAS_EXECUCAO))})",
+        _linha_execucao(resultados, instancia, campanha, registrado_em))
+    if cursor.rowcount == 0:
+        return None
+    execucao_id = cursor.lastrowid
+
+    conexao.executemany(
+        "INSERT INTO parametros VALUES (?, ?, ?)",
+        [(execucao_id, nome, valor if isinstance(valor, (int, float)) or valor is None
+          else str(valor))
+         for nome, valor in (parametros or {}).items()])
+
+    conexao.executemany(
+        "INSERT INTO etapas VALUES (?, ?, ?, ?)",
+        [(execucao_id, etapa, medicao.get('tempo'), medicao.get('pico_memoria_mb'))
+         for etapa, medicao in (resultados.get('etapas') or {}).items()])
+
+    conexao.executemany(
+        f"INSERT INTO veiculos VALUES ({', '.join('?' * (len(COLUNAS_VEICULO) + 1))})",
+        [(execucao_id, aloc['veiculo_id'], aloc['veiculo_tipo'], aloc['destino'],
+          len(aloc['cargas']), aloc['peso_total'], aloc['volume_total'], aloc['capacidade_peso'],
+          aloc['capacidade_volume'], aloc['custo_veiculo'], aloc['taxa_utilizacao_peso'],
+          aloc['taxa_utilizacao_volume'])
+         for aloc in resultados.get('alocacoes', [])])
+
+    _, linhas_ums = linhas_resultados_instancia(resultados, instancia)
+    conexao.executemany(
+        f"INSERT INTO ums VALUES ({', '.join('?' * (len(COLUNAS_UM) + 1))})",
+        [(execucao_id, linha['um_id'], linha['um_tipo'], linha['peso'], linha['volume'],
+          linha['cliente_id'], linha['destino'], linha['alocada'],
+          linha['veiculo_id'] if linha['alocada'] else None, linha['motivo'] or None)
+         for linha in linhas_ums])
+
+    return execucao_id
+
+
+def registrar_execucao(caminho_banco, resultados, instancia, parametros=None, campanha=None,
+                       registrado_em=None):
+    # Grava uma execução em uma única transação. parametros é um dicionário
+    # {nome: valor} (método, limite de tempo, threads...). Retorna o id da
+    # execução.
+
+    conexao = conectar_banco(caminho_banco)
+    try:
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            execucao_id = _inserir(conexao, resultados, instancia, parametros, campanha,
+                                   time.time() if registrado_em is None else registrado_em)
+            conexao.execute("COMMIT")
+        except Exception:
+            conexao.execute("ROLLBACK")
+            raise
+    finally:
+        conexao.close()
+
+    return execucao_id
+
+
+def importar_resultados_salvos(caminho_banco, pasta_resultados):
+    # Importa os JSONs de salvar_resultados de uma pasta, com a data de
+    # modificação do arquivo como data do registro: importar de novo a mesma
+    # pasta não duplica execuções
+
+    caminhos = sorted(os.path.join(pasta_resultados, f) for f in os.listdir(pasta_resultados)
+                      if f.endswith('_resultados.json'))
+
+    conexao = conectar_banco(caminho_banco)
+    importadas = 0
+    try:
+        for caminho in caminhos:
+            try:
+                resultados, instancia = carregar_resultados(caminho)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ {os.path.basename(caminho)} ignorado: {e}")
+                continue
+
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                execucao_id = _inserir(conexao, resultados, instancia, None, None,
+                                       os.path.getmtime(caminho))
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+            importadas += execucao_id is not None
+    finally:
+        conexao.close()
+
+    print(f"✅ {importadas} de {len(caminhos)} resultados importados para {caminho_banco}")
+    return importadas
+
+
+def consultar(caminho_banco, sql, parametros=()):
+    # Lista de dicionários com as linhas de uma consulta qualquer
+
+    conexao = conectar_banco(caminho_banco)
+    try:
+        conexao.row_factory = sqlite3.Row
+        return [dict(linha) for linha in conexao.execute(sql, parametros).fetchall()]
+    finally:
+        conexao.close()
+
+
+def tempo_por_familia(caminho_banco, metodo=None):
+    # Tempo de resolução por família de instâncias e método
+
+    filtro = "WHERE metodo = ?" if metodo else ""
+    return consultar(caminho_banco, f"""
+        SELECT familia, metodo, COUNT(*) AS execucoes,
+               AVG(tempo_execucao) AS tempo_medio, MIN(tempo_execucao) AS tempo_minimo,
+               MAX(tempo_execucao) AS tempo_maximo, SUM(status = ?) AS otimas
+        FROM execucoes {filtro}
+        GROUP BY familia, metodo ORDER BY familia, metodo""",
+                     (GRB.OPTIMAL, metodo) if metodo else (GRB.OPTIMAL,))
+
+
+def gap_por_metodo(caminho_banco, familia=None):
+    # Gap e tempo por formulação (método e versão do modelo)
+
+    filtro = "WHERE familia = ?" if familia else ""
+    return consultar(caminho_banco, f"""
+        SELECT metodo, versao_formulacao, COUNT(*) AS execucoes,
+               AVG(gap_otimizacao) AS gap_medio, MAX(gap_otimizacao) AS gap_maximo,
+               SUM(status = ?) AS otimas, AVG(tempo_execucao) AS tempo_medio
+        FROM execucoes {filtro}
+        GROUP BY metodo, versao_formulacao ORDER BY metodo, versao_formulacao""",
+                     (GRB.OPTIMAL, familia) if familia else (GRB.OPTIMAL,))
+
+
+CONSULTAS = {
+    'tempo': tempo_por_familia,
+    'gap': gap_por_metodo,
+}
+
+
+def imprimir_consulta(linhas, titulo):
+    print(f"\n{'='*80}")
+    print(f"🗄️ {titulo}")
+    print(f"{'='*80}")
+
+    if not linhas:
+        print("  (nenhuma execução)")
+        return
+
+    colunas = list(linhas[0])
+    textos = [[f"{valor:.2f}" if isinstance(valor, float) else
+               ('-' if valor is None else str(valor)) for valor in linha.values()]
+              for linha in linhas]
+    larguras = [max(len(coluna), *(len(texto[k]) for texto in textos))
+                for k, coluna in enumerate(colunas)]
+
+    print(' '.join(f"{coluna:>{largura}}" for coluna, largura in zip(colunas, larguras)))
+    for texto in textos:
+        print(' '.join(f"{valor:>{largura}}" for valor, largura in zip(texto, larguras)))
@@ -0,0 +1,527 @@
+"""
+BENCHMARKS:
+- carregamento: tempo e pico de memória de carregar_dados e carregar_dados_streaming
+  em arquivos gerados com N UMs (padrão 10 mil e 100 mil)
+- importacao: tempo de importação do pacote com python -X importtime em processos
+  novos; falha se passar do limite ou se a pilha de gráficos/análise voltar a
+  ser importada no carregamento dos módulos
+- pipeline: instâncias do gerador com semente fixa em cada tamanho; mede
+  carregamento, construção do modelo (sem resolver), heurística gulosa, extração
+  dos KPIs de uma atribuição sintética, relatório CSV e gráficos. Compara com
+  uma referência salva e falha se alguma etapa ficar mais lenta que a
+  tolerância. Não chama optimize, então roda sem licença completa do Gurobi
+- mochila: subproblema de cada veículo (UMs elegíveis, capacidades e carga
+  mínima) resolvido pelo Gurobi e por resolver_mochila nos modos exato e
+  aproximado; compara valor e tempo. Cada subproblema tem uma variável por
+  UM elegível, o que cabe na licença restrita nas instâncias do gerador
+- lote: vazão (instâncias/s) na resolução de milhares de instâncias mini do
+  gerador: um processo novo por instância (amostra), parâmetros e log por
+  modelo, um ambiente do Gurobi reaproveitado e vários trabalhadores com um
+  ambiente cada
+- verificador: verificar_solucao em instâncias de N UMs (padrão 10 mil e 100
+  mil) com UMs em dicionários e em arrays e uma atribuição aleatória; falha
+  se passar do limite
+"""
+
+import contextlib
+import gc
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .config import RAIZ
+from .io import carregar_dados, carregar_dados_streaming, carregar_instancia
+
+NUM_UMS_PADRAO = [10000, 100000]
+
+REPETICOES_IMPORTACAO = 5
+LIMITE_IMPORTACAO_MS = 500
+NUM_MAIS_CAROS = 10
+MODULO_IMPORTACAO = 'alocacao.cli'
+MODULOS_PROIBIDOS = ['matplotlib', 'seaborn', 'pandas', 'networkx']
+
+# Tamanhos pelo número máximo de UMs das configurações do gerador
+TAMANHOS_PIPELINE = ['mini', '300']
+SEMENTE_PIPELINE = 42
+REPETICOES_PIPELINE = 3
+TOLERANCIA_REGRESSAO = 1.25
+DIFERENCA_MINIMA_REGRESSAO = 0.01  # s; abaixo disso é ruído de medição
+
+TAMANHOS_MOCHILA = ['300']
+
+QUANTIDADE_LOTE = 2000
+AMOSTRA_PROCESSOS_LOTE = 20  # instâncias resolvidas com um processo novo cada
+TEMPO_LIMITE_LOTE = 60
+
+LIMITE_VERIFICACAO_S = 0.5
+
+
+def medir(funcao, caminho):
+    # Tempo e memória em execuções separadas: o tracemalloc deixa a leitura
+    # várias vezes mais lenta e distorceria a comparação de tempo.
+    gc.collect()
+    inicio = time.perf_counter()
+    dados = funcao(caminho)
+    tempo = time.perf_counter() - inicio
+    del dados
+
+    gc.collect()
+    tracemalloc.start()
+    dados = funcao(caminho)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del dados
+
+    gc.collect()
+    return tempo, pico / (1024 * 1024)
+
+
+def benchmark_carregamento(lista_num_ums=None):
+    from .gerador import escrever_instancia_grande
+
+    carregadores = [
+        ('carregar_dados', carregar_dados),
+        ('carregar_dados_streaming', carregar_dados_streaming),
+    ]
+
+    print(f"{'UMs':>8} {'Carregador':<26} {'Tempo (s)':>10} {'Pico (MiB)':>11}")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for num_ums in lista_num_ums or NUM_UMS_PADRAO:
+            caminho = os.path.join(pasta, f'bench_{num_ums}.csv')
+            escrever_instancia_grande(caminho, num_ums)
+
+            for nome, funcao in carregadores:
+                tempo, pico = medir(funcao, caminho)
+                print(f"{num_ums:>8} {nome:<26} {tempo:>10.3f} {pico:>11.1f}")
+
+    return True
+
+
+def medir_importacao(modulo=MODULO_IMPORTACAO):
+    # Cada linha do -X importtime tem "self [us] | cumulative [us] | módulo";
+    # o total é o cumulativo do próprio módulo medido.
+    processo = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ, capture_output=True, text=True, check=True)
+
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, cumulativo, nome = linha[len('import time:'):].split('|')
+        tempos[nome.strip()] = int(cumulativo) / 1000
+
+    return tempos
+
+
+def modulos_carregados(modulo=MODULO_IMPORTACAO):
+    codigo = (f'import sys, {modulo}; '
+              'print("\\n".join(sys.modules))')
+    processo = subprocess.run([sys.executable, '-c', codigo],
+                              cwd=RAIZ, capture_output=True, text=True, check=True)
+    return set(processo.stdout.split())
+
+
+def benchmark_importacao(repeticoes=REPETICOES_IMPORTACAO, modulo=MODULO_IMPORTACAO):
+    medicoes = [medir_importacao(modulo) for _ in range(repeticoes)]
+    totais = [m[modulo] for m in medicoes]
+    mediana = statistics.median(totais)
+
+    print(f"⏳ import {modulo}: mediana {mediana:.1f} ms "
+          f"(mín {min(totais):.1f} ms, máx {max(totais):.1f} ms, {repeticoes} execuções)")
+
+    print(f"\n📊 {NUM_MAIS_CAROS} módulos de primeiro nível mais caros (última execução):")
+    primeiro_nivel = {nome: tempo for nome, tempo in medicoes[-1].items()
+                      if '.' not in nome and nome != modulo.split('.')[0]}
+    for nome, tempo in sorted(primeiro_nivel.items(), key=lambda item: -item[1])[:NUM_MAIS_CAROS]:
+        print(f"  {nome:<30} {tempo:>8.1f} ms")
+
+    carregados = modulos_carregados(modulo)
+    proibidos = [m for m in MODULOS_PROIBIDOS if m in carregados]
+
+    ok = True
+    if proibidos:
+        print(f"\n❌ Importados no carregamento do módulo: {', '.join(proibidos)}")
+        ok = False
+
+    if mediana > LIMITE_IMPORTACAO_MS:
+        print(f"\n❌ Importação acima do limite de {LIMITE_IMPORTACAO_MS} ms")
+        ok = False
+
+    if ok:
+        print("\n✅ Importação dentro do limite")
+
+    return ok
+
+
+def configuracao_tamanho(tamanho):
+    from .gerador import CONFIGURACOES
+
+    max_ums = 5 if tamanho == 'mini' else int(tamanho)
+    for config in CONFIGURACOES:
+        if config['max_ums'] == max_ums:
+            return config
+
+    raise ValueError(f"Tamanho desconhecido: {tamanho}")
+
+
+def gerar_instancia_bench(tamanho, pasta, semente=SEMENTE_PIPELINE):
+    from .gerador import gerar_instancia
+
+    random.seed(semente)
+    dados = gerar_instancia(configuracao_tamanho(tamanho), 'centro', 1, pasta)
+
+    return os.path.join(pasta, f"{dados['Arquivo']}.csv")
+
+
+def cronometrar(funcao, repeticoes):
+    # Mediana e mínimo de várias execuções, com coleta de lixo entre elas
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    return {'mediana': statistics.median(tempos), 'minimo': min(tempos)}
+
+
+def resultados_sinteticos(nome, instancia, atribuicao):
+    # resultados no formato de executar_instancia_com_timeout para uma
+    # atribuição da heurística, sem passar pelo solver
+    from gurobipy import GRB
+
+    from .heuristics import atribuicao_para_valores, custo_atribuicao
+    from .solve import extrair_resultados
+
+    resultados = {
+        'tipo_instancia': nome,
+        'status': GRB.TIME_LIMIT,
+        'tempo_execucao': 0.0,
+        'tempo_para_otimo': None,
+        'gap_otimizacao': None,
+        'solucao_relaxada': None,
+    }
+    resultados.update(extrair_resultados(
+        instancia, *atribuicao_para_valores(instancia, atribuicao)))
+    resultados['custo_total'] = resultados['melhor_solucao'] = custo_atribuicao(
+        instancia, atribuicao)
+
+    return resultados
+
+
+def _construir_modelo(instancia):
+    from .model import criar_modelo
+
+    modelo = criar_modelo(instancia)[0]
+    modelo.update()
+    modelo.dispose()
+
+
+def etapas_pipeline(nome, instancia, caminho, pasta):
+    from .heuristics import atribuicao_para_valores, heuristica_gulosa
+    from .plots import gerar_visualizacoes
+    from .report import exportar_resultados_csv
+    from .solve import extrair_resultados
+
+    atribuicao = heuristica_gulosa(instancia)
+    x_val, alpha_val = atribuicao_para_valores(instancia, atribuicao)
+    resultados = resultados_sinteticos(nome, instancia, atribuicao)
+
+    return [
+        ('carregamento', lambda: carregar_instancia(caminho)),
+        ('construcao_modelo', lambda: _construir_modelo(instancia)),
+        ('heuristica', lambda: heuristica_gulosa(instancia)),
+        ('extracao', lambda: extrair_resultados(instancia, x_val, alpha_val)),
+        ('relatorio', lambda: exportar_resultados_csv([resultados], [instancia], pasta)),
+        ('visualizacoes', lambda: gerar_visualizacoes(resultados, instancia, pasta)),
+    ]
+
+
+def _gurobi_disponivel():
+    try:
+        import gurobipy as gp
+
+        gp.Env().dispose()
+        return True
+    except Exception as e:
+        print(f"⚠️ Gurobi indisponível, construção do modelo ignorada: {str(e)}")
+        return False
+
+
+def benchmark_pipeline(tamanhos=None, repeticoes=REPETICOES_PIPELINE, referencia=None,
+                       salvar_referencia=None):
+
+    medicoes = {}
+    gurobi = _gurobi_disponivel()
+
+    print(f"{'Tamanho':>8} {'Etapa':<20} {'Mediana (s)':>12} {'Mínimo (s)':>11} {'Ref. (s)':>9}")
+
+    anteriores = {}
+    if referencia and os.path.exists(referencia):
+        with open(referencia, encoding='utf-8') as file:
+            anteriores = json.load(file)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for tamanho in tamanhos or TAMANHOS_PIPELINE:
+            caminho = gerar_instancia_bench(tamanho, pasta)
+            instancia = carregar_instancia(caminho)
+
+            for etapa, funcao in etapas_pipeline(tamanho, instancia, caminho, pasta):
+                if etapa == 'construcao_modelo' and not gurobi:
+                    continue
+
+                chave = f"{tamanho}/{etapa}"
+                medicoes[chave] = cronometrar(funcao, repeticoes)
+
+                ref = anteriores.get(chave, {}).get('mediana')
+                print(f"{tamanho:>8} {etapa:<20} {medicoes[chave]['mediana']:>12.3f} "
+                      f"{medicoes[chave]['minimo']:>11.3f} "
+                      f"{ref if ref is not None else float('nan'):>9.3f}")
+
+    # Regressão pelo mínimo, menos sensível a ruído da máquina que a mediana
+    regressoes = [chave for chave, medicao in medicoes.items()
+                  if chave in anteriores
+                  and medicao['minimo'] > TOLERANCIA_REGRESSAO * anteriores[chave]['minimo']
+                  and medicao['minimo'] - anteriores[chave]['minimo'] > DIFERENCA_MINIMA_REGRESSAO]
+
+    if salvar_referencia:
+        with open(salvar_referencia, mode='w', encoding='utf-8') as file:
+            json.dump(medicoes, file, indent=2)
+        print(f"\n💾 Referência salva em: {salvar_referencia}")
+
+    if regressoes:
+        print(f"\n❌ Mais lentas que {TOLERANCIA_REGRESSAO:.2f}x a referência: {', '.join(regressoes)}")
+        return False
+
+    if anteriores:
+        print("\n✅ Nenhuma regressão em relação à referência")
+
+    return True
+
+
+def _mochila_gurobi(lucro, peso, volume, cap_peso, cap_volume, carga_minima):
+    import gurobipy as gp
+    from gurobipy import GRB
+
+    with gp.Env(params={'OutputFlag': 0}) as env, gp.Model(env=env) as modelo:
+        z = modelo.addVars(len(lucro), vtype=GRB.BINARY)
+        itens = range(len(lucro))
+        modelo.setObjective(gp.quicksum(lucro[k] * z[k] for k in itens), GRB.MAXIMIZE)
+        modelo.addConstr(gp.quicksum(peso[k] * z[k] for k in itens) <= cap_peso)
+        modelo.addConstr(gp.quicksum(volume[k] * z[k] for k in itens) <= cap_volume)
+        modelo.addConstr(gp.quicksum(peso[k] * z[k] for k in itens) >= carga_minima)
+
+        inicio = time.perf_counter()
+        modelo.optimize()
+        tempo = time.perf_counter() - inicio
+
+        return (modelo.ObjVal if modelo.status == GRB.OPTIMAL else 0.0), tempo
+
+
+def benchmark_mochila(tamanhos=None, semente=SEMENTE_PIPELINE):
+    from .lagrangian import dados_relaxacao
+    from .mochila import resolver_mochila
+    from .preprocess import preprocessar_instancia
+
+    if not _gurobi_disponivel():
+        return False
+
+    metodos = ['exato', 'aproximado']
+    tempos = {m: [] for m in ['gurobi'] + metodos}
+    gaps = {m: [] for m in metodos}
+
+    print(f"{'Tamanho':>8} {'Veículo':>8} {'UMs':>5} {'Gurobi':>12} "
+          + ' '.join(f"{m:>12} {'Gap (%)':>8}" for m in metodos))
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for tamanho in tamanhos or TAMANHOS_MOCHILA:
+            instancia, _ = preprocessar_instancia(carregar_instancia(
+                gerar_instancia_bench(tamanho, pasta, semente)))
+            dados = dados_relaxacao(instancia)
+
+            for j, veiculo in enumerate(instancia["veiculos"]):
+                itens = dados['elegivel'][:, j]
+                subproblema = (dados['lucro'][itens], dados['peso'][itens], dados['volume'][itens],
+                               dados['cap_peso'][j], dados['cap_volume'][j], dados['carga_minima'][j])
+
+                otimo, tempo = _mochila_gurobi(*subproblema)
+                tempos['gurobi'].append(tempo)
+
+                colunas = []
+                for metodo in metodos:
+                    inicio = time.perf_counter()
+                    valor = resolver_mochila(*subproblema, metodo=metodo)['valor']
+                    tempos[metodo].append(time.perf_counter() - inicio)
+                    gaps[metodo].append((otimo - valor) / otimo * 100 if otimo else 0.0)
+                    colunas.append(f"{valor:>12.1f} {gaps[metodo][-1]:>8.2f}")
+
+                print(f"{tamanho:>8} {veiculo['id']:>8} {int(itens.sum()):>5} {otimo:>12.1f} "
+                      + ' '.join(colunas))
+
+    print(f"\n{'Método':<12} {'Tempo médio (s)':>16} {'Gap médio (%)':>14} {'Gap máx. (%)':>13}")
+    for metodo, lista in tempos.items():
+        gap_medio = statistics.mean(gaps[metodo]) if metodo in gaps else 0.0
+        gap_maximo = max(gaps[metodo]) if metodo in gaps else 0.0
+        print(f"{metodo:<12} {statistics.mean(lista):>16.4f} {gap_medio:>14.2f} {gap_maximo:>13.2f}")
+
+    return True
+
+
+@contextlib.contextmanager
+def _silenciar_saida():
+    # Redireciona o descritor 1 (e não só sys.stdout): pega também o log do
+    # Gurobi e os processos trabalhadores criados aqui dentro
+    sys.stdout.flush()
+    original = os.dup(1)
+    with open(os.devnull, 'w') as nulo:
+        os.dup2(nulo.fileno(), 1)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            os.dup2(original, 1)
+            os.close(original)
+
+
+def _gerar_lote(pasta, quantidade, semente):
+    from .gerador import gerar_instancia
+
+    config = configuracao_tamanho('mini')
+    caminhos = []
+    for k in range(quantidade):
+        random.seed(semente + k)
+        dados = gerar_instancia(config, 'centro', k + 1, pasta)
+        caminhos.append(os.path.join(pasta, f"{dados['Arquivo']}.csv"))
+
+    return caminhos
+
+
+def _lote_no_processo(caminhos, pasta_logs, env, configurar):
+    from .io import nome_instancia
+    from .solve import executar_instancia_com_timeout
+
+    return [executar_instancia_com_timeout(
+        nome_instancia(caminho), carregar_instancia(caminho), TEMPO_LIMITE_LOTE, 1, pasta_logs,
+        env=env, configurar=configurar) for caminho in caminhos]
+
+
+def benchmark_lote(quantidade=QUANTIDADE_LOTE, trabalhadores=None, semente=SEMENTE_PIPELINE):
+    from .solve import criar_ambiente, resolver_lote
+
+    if not _gurobi_disponivel():
+        return False
+
+    trabalhadores = trabalhadores or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta_instancias = os.path.join(pasta, 'instancias')
+        pasta_logs = os.path.join(pasta, 'logs')
+        os.makedirs(pasta_instancias)
+
+        inicio = time.perf_counter()
+        with _silenciar_saida():
+            caminhos = _gerar_lote(pasta_instancias, quantidade, semente)
+        print(f"🧪 {quantidade} instâncias mini geradas em {time.perf_counter() - inicio:.1f} s")
+
+        medicoes = []
+
+        amostra = caminhos[:AMOSTRA_PROCESSOS_LOTE]
+        inicio = time.perf_counter()
+        for caminho in amostra:
+            subprocess.run([sys.executable, '-m', 'alocacao', 'solve', caminho,
+                            '--sem-visualizacoes', '--tempo-limite', str(TEMPO_LIMITE_LOTE),
+                            '--threads', '1', '--pasta-resultados', pasta_logs],
+                           cwd=RAIZ, capture_output=True, check=True)
+        medicoes.append(('processo por instância', len(amostra), time.perf_counter() - inicio))
+
+        # Os dois modos no mesmo processo usam um ambiente sem console para
+        # medir só a diferença entre configurar cada modelo (parâmetros e um
+        # arquivo de log por instância) e herdar tudo do ambiente
+        with _silenciar_saida():
+            env = criar_ambiente(TEMPO_LIMITE_LOTE, 1, console=False)
+            inicio = time.perf_counter()
+            por_modelo = _lote_no_processo(caminhos, pasta_logs, env, configurar=True)
+            medicoes.append(('configuração por modelo', quantidade, time.perf_counter() - inicio))
+            env.dispose()
+
+            env = criar_ambiente(TEMPO_LIMITE_LOTE, 1,
+                                 os.path.join(pasta_logs, 'gurobi_log_lote.log'), console=False)
+            inicio = time.perf_counter()
+            reaproveitado = _lote_no_processo(caminhos, pasta_logs, env, configurar=False)
+            medicoes.append(('ambiente reaproveitado', quantidade, time.perf_counter() - inicio))
+            env.dispose()
+
+            argumentos = ('mip', TEMPO_LIMITE_LOTE, 1, pasta_logs, None, None, None, True)
+            inicio = time.perf_counter()
+            paralelo = {caminho: resolvida[0] for caminho, resolvida
+                        in resolver_lote(caminhos, trabalhadores, argumentos)
+                        if not isinstance(resolvida, Exception)}
+            medicoes.append((f"{trabalhadores} trabalhadores", quantidade,
+                             time.perf_counter() - inicio))
+
+    print(f"\n{'Modo':<26} {'Instâncias':>11} {'Tempo (s)':>10} {'Instâncias/s':>13}")
+    for modo, resolvidas, tempo in medicoes:
+        print(f"{modo:<26} {resolvidas:>11} {tempo:>10.2f} {resolvidas / tempo:>13.1f}")
+
+    # Os modos resolvem as mesmas instâncias e precisam chegar ao mesmo ótimo
+    divergentes = sum(
+        a is None or b is None or c is None
+        or abs(a['melhor_solucao'] - b['melhor_solucao']) > 1e-6 * max(1, abs(a['melhor_solucao']))
+        or abs(a['melhor_solucao'] - c['melhor_solucao']) > 1e-6 * max(1, abs(a['melhor_solucao']))
+        for a, b, c in zip(por_modelo, reaproveitado, (paralelo.get(c) for c in caminhos)))
+    if divergentes:
+        print(f"\n❌ {divergentes} instâncias com resultado diferente entre os modos")
+        return False
+
+    return True
+
+
+def benchmark_verificador(lista_num_ums=None, repeticoes=REPETICOES_PIPELINE,
+                          semente=SEMENTE_PIPELINE):
+    from .gerador import escrever_instancia_grande
+    from .verificador import verificar_solucao
+
+    random.seed(semente)
+    ok = True
+
+    print(f"{'UMs':>8} {'Carregador':<26} {'Mediana (s)':>12} {'Mínimo (s)':>11}")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for num_ums in lista_num_ums or NUM_UMS_PADRAO:
+            caminho = os.path.join(pasta, f'bench_{num_ums}.csv')
+            escrever_instancia_grande(caminho, num_ums)
+
+            for nome, funcao in (('carregar_dados', carregar_dados),
+                                 ('carregar_dados_streaming', carregar_dados_streaming)):
+                dados = funcao(caminho)
+                ums = dados['ums']
+                ids = ums['id'].tolist() if isinstance(ums, dict) else [um['id'] for um in ums]
+                ids_veiculos = [v['id'] for v in dados['veiculos']]
+                atribuicao = {um_id: random.choice(ids_veiculos) for um_id in ids}
+
+                tempos = cronometrar(lambda: verificar_solucao(dados, atribuicao), repeticoes)
+                print(f"{num_ums:>8} {nome:<26} {tempos['mediana']:>12.3f} {tempos['minimo']:>11.3f}")
+                ok = ok and tempos['mediana'] <= LIMITE_VERIFICACAO_S
+
+    if not ok:
+        print(f"\n❌ Verificação acima de {LIMITE_VERIFICACAO_S} s")
+
+    return ok
+
+
+BENCHMARKS = {
+    'carregamento': benchmark_carregamento,
+    'importacao': benchmark_importacao,
+    'pipeline': benchmark_pipeline,
+    'mochila': benchmark_mochila,
+    'lote': benchmark_lote,
+    'verificador': benchmark_verificador,
+}
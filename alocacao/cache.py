@@ -0,0 +1,98 @@
+import gzip
+import hashlib
+import json
+import os
+
+import gurobipy as gp
+
+from .config import PASTA_CACHE_MODELOS
+from .model import VERSAO_FORMULACAO, criar_modelo
+
+# O modelo vai para um MPS comprimido (o Gurobi lê e escreve .mps.gz
+# diretamente) e o mapeamento das chaves de x, y e alpha para os índices das
+# variáveis vai para um JSON comprimido ao lado. Parâmetros do solver não
+# fazem parte do arquivo: são aplicados por configurar_modelo a cada execução.
+
+
+def chave_instancia(instancia):
+    # Hash do conteúdo que entra no modelo e da versão da formulação: mudar
+    # um peso, uma penalidade ou a própria formulação gera outra entrada.
+
+    conteudo = json.dumps({
+        'versao_formulacao': VERSAO_FORMULACAO,
+        'veiculos': instancia['veiculos'],
+        'ums': instancia['ums'],
+        'clientes': instancia['clientes'],
+    }, sort_keys=True, ensure_ascii=False)
+
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def _caminhos_cache(chave, pasta_cache):
+    return (os.path.join(pasta_cache, f"{chave}.mps.gz"),
+            os.path.join(pasta_cache, f"{chave}_variaveis.json.gz"))
+
+
+def salvar_modelo_cache(modelo, x, y, alpha, chave, pasta_cache=PASTA_CACHE_MODELOS):
+
+    os.makedirs(pasta_cache, exist_ok=True)
+    caminho_modelo, caminho_variaveis = _caminhos_cache(chave, pasta_cache)
+
+    modelo.update()
+
+    mapeamento = {
+        nome: [[list(k) if isinstance(k, tuple) else k, var.index]
+               for k, var in variaveis.items()]
+        for nome, variaveis in (('x', x), ('y', y), ('alpha', alpha))
+    }
+
+    # Grava em arquivos temporários e renomeia no fim, para que uma execução
+    # interrompida não deixe uma entrada pela metade no cache
+    temporario_modelo = caminho_modelo.replace('.mps.gz', '.tmp.mps.gz')
+    modelo.write(temporario_modelo)
+
+    with gzip.open(f"{caminho_variaveis}.tmp", mode='wt', encoding='utf-8') as file:
+        json.dump(mapeamento, file)
+
+    os.replace(f"{caminho_variaveis}.tmp", caminho_variaveis)
+    os.replace(temporario_modelo, caminho_modelo)
+
+
+def carregar_modelo_cache(chave, pasta_cache=PASTA_CACHE_MODELOS, env=None):
+    # Retorna (modelo, x, y, alpha) como criar_modelo, ou None se a entrada
+    # não existe
+
+    caminho_modelo, caminho_variaveis = _caminhos_cache(chave, pasta_cache)
+    if not (os.path.exists(caminho_modelo) and os.path.exists(caminho_variaveis)):
+        return None
+
+    modelo = gp.read(caminho_modelo, env=env)
+    variaveis = modelo.getVars()
+
+    with gzip.open(caminho_variaveis, mode='rt', encoding='utf-8') as file:
+        mapeamento = json.load(file)
+
+    x, y, alpha = (
+        {tuple(k) if isinstance(k, list) else k: variaveis[indice]
+         for k, indice in mapeamento[nome]}
+        for nome in ('x', 'y', 'alpha'))
+
+    return modelo, x, y, alpha
+
+
+def obter_modelo(instancia, pasta_cache=PASTA_CACHE_MODELOS, env=None):
+    # criar_modelo com cache: constrói e grava na primeira vez, relê o MPS
+    # nas seguintes. Retorna também se veio do cache.
+
+    chave = chave_instancia(instancia)
+
+    carregado = carregar_modelo_cache(chave, pasta_cache, env)
+    if carregado is not None:
+        print(f"📦 Modelo lido do cache: {chave[:12]}")
+        return carregado + (True,)
+
+    modelo, x, y, alpha = criar_modelo(instancia, env)
+    salvar_modelo_cache(modelo, x, y, alpha, chave, pasta_cache)
+    print(f"💾 Modelo gravado no cache: {chave[:12]}")
+
+    return modelo, x, y, alpha, False
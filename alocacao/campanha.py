@@ -0,0 +1,290 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .banco import registrar_execucao
+from .config import PASTA_INSTANCIAS, PASTA_RESULTADOS, TIMEOUT
+from .io import listar_instancias, nome_instancia, salvar_resultados
+from .report import exportar_resultados_incremental
+from .solve import parametros_execucao, resolver_lote
+
+# Campanha distribuída: a fila é um arquivo SQLite em um sistema de arquivos
+# compartilhado entre as máquinas (com locks de arquivo funcionando, como
+# NFSv4 ou SMB; sem WAL, que exige memória compartilhada no mesmo host).
+# Cada trabalhador, em qualquer máquina, reivindica uma instância pendente
+# em uma transação exclusiva, resolve com o seu ambiente do Gurobi (como no
+# lote) e grava um batimento periódico enquanto resolve. Instâncias em
+# execução sem batimento há mais de EXPIRACAO_BATIMENTO voltam para a fila,
+# até MAXIMO_TENTATIVAS. Os resultados vão para a pasta de resultados
+# compartilhada: o JSON de salvar_resultados por instância e a exportação
+# incremental em arquivos por trabalhador, já que vários processos não podem
+# anexar ao mesmo CSV. A fila guarda também o resumo de cada instância e,
+# com banco, cada execução aceita pela fila vai também para o banco de
+# resultados.
+#
+# Os relógios das máquinas precisam estar sincronizados (NTP) dentro de uma
+# fração de EXPIRACAO_BATIMENTO.
+
+INTERVALO_BATIMENTO = 30  # s
+EXPIRACAO_BATIMENTO = 120  # s
+MAXIMO_TENTATIVAS = 3
+TIMEOUT_FILA = 60  # s de espera pelo lock do arquivo
+
+ESTADOS_CAMPANHA = ['pendente', 'executando', 'concluida', 'erro']
+
+
+def conectar_fila(caminho_fila):
+    # Autocommit: as transações são abertas explicitamente com BEGIN IMMEDIATE
+    conexao = sqlite3.connect(caminho_fila, timeout=TIMEOUT_FILA, isolation_level=None)
+    conexao.execute(f"PRAGMA busy_timeout = {TIMEOUT_FILA * 1000}")
+    return conexao
+
+
+def criar_fila(caminho_fila, pasta_instancias=PASTA_INSTANCIAS):
+    # Cria a fila (ou acrescenta a uma existente) com as instâncias da pasta.
+    # Os caminhos são absolutos e precisam ser os mesmos em todas as máquinas.
+
+    arquivos = [os.path.abspath(caminho) for caminho in listar_instancias(pasta_instancias)]
+
+    conexao = conectar_fila(caminho_fila)
+    try:
+        conexao.execute("BEGIN IMMEDIATE")
+        conexao.execute("""
+            CREATE TABLE IF NOT EXISTS trabalhos (
+                caminho TEXT PRIMARY KEY,
+                estado TEXT NOT NULL DEFAULT 'pendente',
+                trabalhador TEXT,
+                tentativas INTEGER NOT NULL DEFAULT 0,
+                batimento REAL,
+                inicio REAL,
+                fim REAL,
+                erro TEXT,
+                status INTEGER,
+                custo_total REAL,
+                gap_otimizacao REAL,
+                tempo_execucao REAL,
+                arquivo_resultados TEXT
+            )""")
+        conexao.execute("CREATE INDEX IF NOT EXISTS trabalhos_estado ON trabalhos (estado)")
+        conexao.executemany("INSERT OR IGNORE INTO trabalhos (caminho) VALUES (?)",
+                            [(caminho,) for caminho in arquivos])
+        conexao.execute("COMMIT")
+    finally:
+        conexao.close()
+
+    print(f"📋 Fila {caminho_fila}: {len(arquivos)} instâncias de {pasta_instancias}")
+    return len(arquivos)
+
+
+def reivindicar(conexao, trabalhador, expiracao=EXPIRACAO_BATIMENTO):
+    # Devolve à fila os trabalhos abandonados e reivindica o próximo
+    # pendente. Retorna o caminho ou None se não há nada pendente.
+
+    agora = time.time()
+    conexao.execute("BEGIN IMMEDIATE")
+    try:
+        conexao.execute("""
+            UPDATE trabalhos
+            SET estado = CASE WHEN tentativas >= ? THEN 'erro' ELSE 'pendente' END,
+                erro = 'batimento expirado em ' || trabalhador, trabalhador = NULL
+            WHERE estado = 'executando' AND batimento < ?""",
+                        (MAXIMO_TENTATIVAS, agora - expiracao))
+
+        linha = conexao.execute("""
+            SELECT caminho FROM trabalhos WHERE estado = 'pendente'
+            ORDER BY tentativas, caminho LIMIT 1""").fetchone()
+        if linha is not None:
+            conexao.execute("""
+                UPDATE trabalhos
+                SET estado = 'executando', trabalhador = ?, tentativas = tentativas + 1,
+                    batimento = ?, inicio = ?, erro = NULL
+                WHERE caminho = ?""", (trabalhador, agora, agora, linha[0]))
+        conexao.execute("COMMIT")
+    except Exception:
+        conexao.execute("ROLLBACK")
+        raise
+
+    return linha[0] if linha is not None else None
+
+
+def _bater(caminho_fila, trabalhador, parar, intervalo):
+    # Thread de batimento do trabalhador, com conexão própria (sqlite3 não
+    # compartilha conexões entre threads)
+    conexao = conectar_fila(caminho_fila)
+    try:
+        while not parar.wait(intervalo):
+            conexao.execute("""
+                UPDATE trabalhos SET batimento = ?
+                WHERE trabalhador = ? AND estado = 'executando'""", (time.time(), trabalhador))
+    finally:
+        conexao.close()
+
+
+def _reivindicadas(conexao, trabalhador, intervalo, expiracao):
+    # Caminhos reivindicados, um por vez, até não haver pendentes nem em
+    # execução (uma em execução ainda pode ser abandonada e voltar à fila)
+    while True:
+        caminho = reivindicar(conexao, trabalhador, expiracao)
+        if caminho is not None:
+            yield caminho
+            continue
+
+        em_execucao = conexao.execute(
+            "SELECT COUNT(*) FROM trabalhos WHERE estado = 'executando'").fetchone()[0]
+        if not em_execucao:
+            return
+        time.sleep(intervalo)
+
+
+def _finalizar(conexao, caminho, trabalhador, resultados, arquivo_resultados, erro):
+    # Só grava se o trabalho ainda é deste trabalhador: se o batimento expirou
+    # e outro o reivindicou, o resultado dele prevalece
+
+    estado = 'concluida' if resultados else 'erro'
+    resultados = resultados or {}
+    cursor = conexao.execute("""
+        UPDATE trabalhos
+        SET estado = ?, fim = ?, erro = ?, status = ?, custo_total = ?, gap_otimizacao = ?,
+            tempo_execucao = ?, arquivo_resultados = ?
+        WHERE caminho = ? AND trabalhador = ? AND estado = 'executando'""",
+                            (estado, time.time(), erro, resultados.get('status'),
+                             resultados.get('custo_total'), resultados.get('gap_otimizacao'),
+                             resultados.get('tempo_execucao'), arquivo_resultados,
+                             caminho, trabalhador))
+    return cursor.rowcount == 1
+
+
+def executar_trabalhador(caminho_fila, pasta_resultados=PASTA_RESULTADOS, metodo='mip',
+                         tempo_limite=TIMEOUT, threads=None, pasta_cache=None, preprocessar=True,
+                         formato_exportacao='csv', intervalo=INTERVALO_BATIMENTO,
+                         expiracao=EXPIRACAO_BATIMENTO, banco=None, carregamento='csv'):
+    # Um trabalhador: resolve instâncias da fila com resolver_lote (um
+    # ambiente do Gurobi para todas) até a fila esvaziar. Retorna quantas
+    # instâncias ele concluiu.
+
+    trabalhador = f"{socket.gethostname()}:{os.getpid()}"
+    campanha = f"campanha_{os.path.splitext(os.path.basename(caminho_fila))[0]}"
+    exportacao = f"{campanha}_{trabalhador.replace(':', '_')}"
+    os.makedirs(pasta_resultados, exist_ok=True)
+
+    conexao = conectar_fila(caminho_fila)
+    parar = threading.Event()
+    batimento = threading.Thread(target=_bater, args=(caminho_fila, trabalhador, parar, intervalo),
+                                 daemon=True)
+    batimento.start()
+
+    argumentos = (metodo, tempo_limite, threads, pasta_resultados, None, None, pasta_cache,
+                  preprocessar, carregamento)
+    parametros = parametros_execucao(metodo, tempo_limite, threads, preprocessar, pasta_cache)
+    concluidas = 0
+
+    try:
+        for caminho, resolvida in resolver_lote(
+                _reivindicadas(conexao, trabalhador, intervalo, expiracao), 1, argumentos):
+            resultados, arquivo_resultados, erro = None, None, None
+            try:
+                if isinstance(resolvida, Exception):
+                    raise resolvida
+
+                resultados, instancia, _ = resolvida
+                if resultados:
+                    try:
+                        exportar_resultados_incremental(resultados, instancia, pasta_resultados,
+                                                        exportacao, formato_exportacao)
+                    except Exception as e:
+                        print(f"⚠️ [{trabalhador}] falha na exportação incremental de "
+                              f"{nome_instancia(caminho)}: {e}")
+                    arquivo_resultados = salvar_resultados(resultados, instancia,
+                                                           pasta_resultados)
+                else:
+                    erro = 'falha na resolução'
+            except Exception as e:
+                resultados, erro = None, str(e)
+
+            if _finalizar(conexao, caminho, trabalhador, resultados, arquivo_resultados, erro):
+                concluidas += bool(resultados)
+                if banco and resultados:
+                    try:
+                        registrar_execucao(banco, resultados, instancia, parametros, campanha)
+                    except Exception as e:
+                        print(f"⚠️ [{trabalhador}] {nome_instancia(caminho)} não foi gravada "
+                              f"no banco: {e}")
+                print(f"{'✅' if resultados else '❌'} [{trabalhador}] {nome_instancia(caminho)}"
+                      f"{'' if resultados else f': {erro}'}")
+            else:
+                print(f"⚠️ [{trabalhador}] {nome_instancia(caminho)} foi reatribuída; "
+                      f"resultado descartado")
+    finally:
+        parar.set()
+        batimento.join()
+        conexao.close()
+
+    return concluidas
+
+
+def executar_trabalhadores(caminho_fila, processos=1, pasta_resultados=PASTA_RESULTADOS,
+                           metodo='mip', tempo_limite=TIMEOUT, threads=None, pasta_cache=None,
+                           preprocessar=True, formato_exportacao='csv',
+                           intervalo=INTERVALO_BATIMENTO, expiracao=EXPIRACAO_BATIMENTO,
+                           banco=None, carregamento='csv'):
+    # Vários trabalhadores nesta máquina; em cada máquina da campanha roda-se
+    # o mesmo comando apontando para a mesma fila
+
+    if processos > 1 and threads is None:
+        threads = max(1, (os.cpu_count() or 1) // processos)
+
+    inicio = time.perf_counter()
+    argumentos = (caminho_fila, pasta_resultados, metodo, tempo_limite, threads, pasta_cache,
+                  preprocessar, formato_exportacao, intervalo, expiracao, banco, carregamento)
+
+    if processos <= 1:
+        concluidas = executar_trabalhador(*argumentos)
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            futuros = [pool.submit(executar_trabalhador, *argumentos) for _ in range(processos)]
+            concluidas = sum(futuro.result() for futuro in futuros)
+
+    tempo = time.perf_counter() - inicio
+    print(f"\n🏁 {concluidas} instâncias concluídas nesta máquina em {tempo:.1f} s")
+    imprimir_estado_campanha(caminho_fila)
+
+    return concluidas
+
+
+def estado_campanha(caminho_fila):
+    conexao = conectar_fila(caminho_fila)
+    try:
+        contagens = dict(conexao.execute(
+            "SELECT estado, COUNT(*) FROM trabalhos GROUP BY estado").fetchall())
+        trabalhadores = dict(conexao.execute("""
+            SELECT trabalhador, COUNT(*) FROM trabalhos
+            WHERE estado = 'executando' GROUP BY trabalhador""").fetchall())
+        erros = conexao.execute(
+            "SELECT caminho, erro FROM trabalhos WHERE estado = 'erro' ORDER BY caminho").fetchall()
+    finally:
+        conexao.close()
+
+    return {
+        'contagens': {estado: contagens.get(estado, 0) for estado in ESTADOS_CAMPANHA},
+        'trabalhadores': trabalhadores,
+        'erros': erros,
+    }
+
+
+def imprimir_estado_campanha(caminho_fila):
+    estado = estado_campanha(caminho_fila)
+
+    print(f"\n{'='*80}")
+    print(f"📋 CAMPANHA: {caminho_fila}")
+    print(f"{'='*80}")
+    for nome, quantidade in estado['contagens'].items():
+        print(f"  {nome:<12} {quantidade:>6}")
+    for trabalhador, quantidade in estado['trabalhadores'].items():
+        print(f"  em execução por {trabalhador}: {quantidade}")
+    for caminho, erro in estado['erros']:
+        print(f"  ❌ {nome_instancia(caminho)}: {erro}")
+
+    return estado
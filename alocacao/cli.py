@@ -0,0 +1,380 @@
+import argparse
+import os
+import sys
+
+from . import config
+from .banco import NOME_BANCO
+from .io import MODOS_CARREGAMENTO
+from .campanha import EXPIRACAO_BATIMENTO, INTERVALO_BATIMENTO
+from .online import JANELA_MAXIMA, LIMIAR_DESPACHO, LOTE_CHEGADAS, TEMPO_LIMITE_DECISAO
+from .pareto import MEDIDAS_SERVICO, PONTOS_PARETO, TEMPO_LIMITE_PONTO
+from .perfil import PERFILADORES
+from .plots import DPI_VISUALIZACOES, GRAFICOS, PROCESSOS_VISUALIZACOES
+from .reotimizacao import TEMPO_LIMITE_REOTIMIZACAO
+from .sensibilidade import (BETAS, FATORES_CUSTO, FATORES_PENALIDADE, PROCESSOS_SENSIBILIDADE,
+                            TEMPO_LIMITE_CENARIO)
+from .servico import FILA_MAXIMA, HOST_SERVICO, PORTA_SERVICO, TRABALHADORES_SERVICO
+from .sweep import (AMOSTRAS_ALEATORIAS, GAP_ALVO, PROCESSOS_VARREDURA,
+                    TEMPO_LIMITE_VARREDURA)
+
+
+def _argumentos_saida(parser):
+    parser.add_argument('--pasta-resultados', default=config.PASTA_RESULTADOS)
+    parser.add_argument('--pasta-visualizacoes',
+                        default=config.PASTA_VISUALIZACOES)
+
+
+def _argumentos_solver(parser):
+    parser.add_argument('--tempo-limite', type=float, default=config.TIMEOUT,
+                        help='limite de tempo do Gurobi por instância (s)')
+    parser.add_argument('--threads', type=int,
+                        help='threads do Gurobi (padrão: todas)')
+    parser.add_argument('--perfilador', choices=PERFILADORES,
+                        help='grava o perfil de cada etapa em <pasta-resultados>/perfis')
+    parser.add_argument('--sem-preprocessamento', action='store_true',
+                        help='monta o modelo sem remover UMs e veículos inutilizáveis')
+    parser.add_argument('--cache-modelos', nargs='?', const=config.PASTA_CACHE_MODELOS,
+                        metavar='PASTA',
+                        help='reaproveita modelos já construídos (padrão da pasta: %(const)s)')
+    parser.add_argument('--metodo', choices=['mip', 'lagrangeano', 'colunas', 'espacial'],
+                        default='mip',
+                        help='modelo compacto no Gurobi, relaxação lagrangiana com reparo, '
+                             'geração de colunas com cargas por veículo ou decomposição '
+                             'espacial dos clientes em grupos resolvidos em paralelo')
+    parser.add_argument('--carregamento', choices=MODOS_CARREGAMENTO, default='csv',
+                        help='leitura linha a linha ou em blocos com arrays tipados e '
+                             'categorias internadas (instâncias grandes)')
+
+
+def _argumentos_banco(parser):
+    parser.add_argument('--banco', metavar='ARQUIVO',
+                        help=f'banco SQLite de resultados (padrão: <pasta-resultados>/{NOME_BANCO})')
+    parser.add_argument('--sem-banco', action='store_true',
+                        help='não grava as execuções no banco de resultados')
+
+
+def _caminho_banco(args):
+    if getattr(args, 'sem_banco', False):
+        return None
+    return args.banco or os.path.join(args.pasta_resultados, NOME_BANCO)
+
+
+def _argumentos_visualizacoes(parser):
+    parser.add_argument('--sem-visualizacoes', action='store_true',
+                        help='apenas resolve e salva os resultados')
+    parser.add_argument('--graficos', nargs='+', choices=GRAFICOS,
+                        help='subconjunto de gráficos a gerar')
+    parser.add_argument('--dpi', type=int, default=DPI_VISUALIZACOES)
+    parser.add_argument('--processos', type=int, default=PROCESSOS_VISUALIZACOES,
+                        help='processos para renderizar os gráficos')
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m alocacao', description='Alocação de cargas em veículos')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    solve = comandos.add_parser('solve', help='resolve um arquivo de instância')
+    solve.add_argument('arquivo')
+    _argumentos_saida(solve)
+    _argumentos_solver(solve)
+    _argumentos_visualizacoes(solve)
+    _argumentos_banco(solve)
+
+    batch = comandos.add_parser(
+        'batch', help='resolve todas as instâncias de uma pasta')
+    batch.add_argument('--pasta-instancias', default=config.PASTA_INSTANCIAS)
+    _argumentos_saida(batch)
+    _argumentos_solver(batch)
+    _argumentos_visualizacoes(batch)
+    batch.add_argument('--formato', choices=['csv', 'parquet'], default='csv',
+                       help='formato da exportação incremental por instância')
+    batch.add_argument('--trabalhadores', type=int, default=1,
+                       help='processos resolvendo instâncias, cada um com um ambiente do Gurobi')
+    _argumentos_banco(batch)
+
+    campanha = comandos.add_parser(
+        'campanha', help='campanha distribuída com uma fila SQLite em disco compartilhado')
+    campanha.add_argument('acao', choices=['criar', 'trabalhar', 'estado'],
+                          help='criar a fila, rodar trabalhadores nesta máquina ou ver o estado')
+    campanha.add_argument('fila', help='arquivo SQLite da fila')
+    campanha.add_argument('--pasta-instancias', default=config.PASTA_INSTANCIAS,
+                          help='instâncias colocadas na fila por criar')
+    campanha.add_argument('--pasta-resultados', default=config.PASTA_RESULTADOS,
+                          help='pasta compartilhada para os resultados')
+    _argumentos_solver(campanha)
+    campanha.add_argument('--formato', choices=['csv', 'parquet'], default='csv',
+                          help='formato da exportação incremental por trabalhador')
+    campanha.add_argument('--trabalhadores', type=int, default=1,
+                          help='processos trabalhadores nesta máquina')
+    campanha.add_argument('--intervalo-batimento', type=float, default=INTERVALO_BATIMENTO,
+                          help='s entre batimentos (e entre consultas com a fila vazia)')
+    campanha.add_argument('--expiracao-batimento', type=float, default=EXPIRACAO_BATIMENTO,
+                          help='s sem batimento para devolver uma instância à fila')
+    _argumentos_banco(campanha)
+
+    banco = comandos.add_parser(
+        'banco', help='importa resultados salvos e consulta o banco SQLite de resultados')
+    banco.add_argument('acao', choices=['importar', 'tempo', 'gap'],
+                       help='importar os JSONs salvos, tempo por família ou gap por método')
+    banco.add_argument('--banco', metavar='ARQUIVO',
+                       help=f'padrão: <pasta-resultados>/{NOME_BANCO}')
+    banco.add_argument('--pasta-resultados', default=config.PASTA_RESULTADOS)
+    banco.add_argument('--metodo', help='filtra a consulta tempo por método')
+    banco.add_argument('--familia', help='filtra a consulta gap por família de instâncias')
+
+    reotimizar = comandos.add_parser(
+        'reotimizar', help='resolve uma instância e reotimiza após cada grupo de alterações')
+    reotimizar.add_argument('arquivo')
+    reotimizar.add_argument('alteracoes',
+                            help='JSON com uma lista de grupos (listas) de alterações')
+    reotimizar.add_argument('--pasta-resultados', default=config.PASTA_RESULTADOS)
+    reotimizar.add_argument('--tempo-limite', type=float, default=config.TIMEOUT,
+                            help='limite de tempo da primeira otimização (s)')
+    reotimizar.add_argument('--tempo-limite-reotimizacao', type=float,
+                            default=TEMPO_LIMITE_REOTIMIZACAO,
+                            help='limite de tempo de cada reotimização (s)')
+    reotimizar.add_argument('--threads', type=int)
+
+    online = comandos.add_parser(
+        'online', help='aloca as UMs conforme chegam, em horizonte rolante')
+    online.add_argument('arquivo')
+    online.add_argument('--seguir', action='store_true',
+                        help='continua lendo o arquivo enquanto ele cresce')
+    online.add_argument('--limiar-despacho', type=float, default=LIMIAR_DESPACHO * 100,
+                        help='ocupação (%%) de peso ou volume que despacha um veículo')
+    online.add_argument('--janela-maxima', type=int, default=JANELA_MAXIMA,
+                        help='UMs em aberto no modelo')
+    online.add_argument('--lote', type=int, default=LOTE_CHEGADAS,
+                        help='UMs que chegam entre duas reotimizações')
+    online.add_argument('--tempo-limite-decisao', type=float, default=TEMPO_LIMITE_DECISAO,
+                        help='limite de tempo de cada reotimização (s)')
+    online.add_argument('--pasta-resultados', default=config.PASTA_RESULTADOS)
+    online.add_argument('--threads', type=int)
+
+    sensibilidade = comandos.add_parser(
+        'sensibilidade', help='reotimiza uma instância em uma grade de fatores de custo')
+    sensibilidade.add_argument('arquivo')
+    sensibilidade.add_argument('--fatores-penalidade', nargs='+', type=float,
+                               default=FATORES_PENALIDADE,
+                               help='multiplicadores da penalidade de todas as UMs')
+    sensibilidade.add_argument('--betas', nargs='+', type=float, default=BETAS,
+                               help='valores de beta_v (custo do kg de frete morto)')
+    sensibilidade.add_argument('--fatores-custo', nargs='+', type=float, default=FATORES_CUSTO,
+                               help='multiplicadores do custo de todos os veículos')
+    sensibilidade.add_argument('--tempo-limite', type=float, default=TEMPO_LIMITE_CENARIO,
+                               help='limite de tempo por cenário (s)')
+    sensibilidade.add_argument('--processos', type=int, default=PROCESSOS_SENSIBILIDADE,
+                               help='processos, cada um com um bloco de cenários e um modelo')
+    sensibilidade.add_argument('--threads', type=int,
+                               help='threads do Gurobi por processo (padrão: núcleos / processos)')
+    sensibilidade.add_argument('--pasta-resultados', default=config.PASTA_RESULTADOS)
+
+    pareto = comandos.add_parser(
+        'pareto', help='fronteira de Pareto entre custo e carga não alocada')
+    pareto.add_argument('arquivo')
+    pareto.add_argument('--pontos', type=int, default=PONTOS_PARETO,
+                        help='valores de epsilon entre os dois extremos')
+    pareto.add_argument('--medida', choices=MEDIDAS_SERVICO, default='peso',
+                        help='não alocado em peso (kg) ou em penalidade (peso * penalidade)')
+    pareto.add_argument('--tempo-limite', type=float, default=TEMPO_LIMITE_PONTO,
+                        help='limite de tempo por ponto (s)')
+    pareto.add_argument('--threads', type=int)
+    pareto.add_argument('--dpi', type=int, default=DPI_VISUALIZACOES)
+    _argumentos_saida(pareto)
+
+    servico = comandos.add_parser(
+        'servico', help='serviço local (HTTP) com fila de resoluções')
+    servico.add_argument('--host', default=HOST_SERVICO)
+    servico.add_argument('--porta', type=int, default=PORTA_SERVICO)
+    servico.add_argument('--socket', metavar='CAMINHO',
+                         help='escuta em um socket Unix em vez de TCP')
+    servico.add_argument('--trabalhadores', type=int, default=TRABALHADORES_SERVICO,
+                         help='resoluções simultâneas, cada uma com o seu ambiente do Gurobi')
+    servico.add_argument('--threads', type=int,
+                         help='threads do Gurobi por trabalhador (padrão: núcleos / trabalhadores)')
+    servico.add_argument('--fila-maxima', type=int, default=FILA_MAXIMA,
+                         help='trabalhos aguardando antes de recusar novos pedidos')
+    servico.add_argument('--pasta-resultados', default=config.PASTA_RESULTADOS)
+
+    render = comandos.add_parser(
+        'render', help='renderiza os gráficos de resultados já salvos')
+    _argumentos_saida(render)
+    render.add_argument('--graficos', nargs='+', choices=GRAFICOS)
+    render.add_argument('--dpi', type=int, default=DPI_VISUALIZACOES)
+    render.add_argument('--processos', type=int,
+                        default=PROCESSOS_VISUALIZACOES)
+
+    sweep = comandos.add_parser(
+        'sweep', help='compara conjuntos de parâmetros do Gurobi nas instâncias')
+    sweep.add_argument('--pasta-instancias', default=config.PASTA_INSTANCIAS)
+    sweep.add_argument('--pasta-resultados', default=config.PASTA_RESULTADOS)
+    sweep.add_argument('--cache-modelos', default=config.PASTA_CACHE_MODELOS,
+                       metavar='PASTA')
+    sweep.add_argument('--parametros', nargs='+', metavar='NOME=V1,V2',
+                       help='espaço de busca (padrão: MIPFocus, Presolve, Cuts e Heuristics)')
+    sweep.add_argument('--modo', choices=['grade', 'aleatorio'], default='grade')
+    sweep.add_argument('--amostras', type=int, default=AMOSTRAS_ALEATORIAS,
+                       help='configurações sorteadas no modo aleatorio')
+    sweep.add_argument('--semente', type=int)
+    sweep.add_argument('--tempo-limite', type=float, default=TEMPO_LIMITE_VARREDURA,
+                       help='limite de tempo por rodada (s)')
+    sweep.add_argument('--gap-alvo', type=float, default=GAP_ALVO * 100,
+                       help='gap (%%) cujo tempo para ser atingido é comparado')
+    sweep.add_argument('--processos', type=int, default=PROCESSOS_VARREDURA,
+                       help='rodadas simultâneas')
+    sweep.add_argument('--threads', type=int,
+                       help='threads do Gurobi por rodada (padrão: núcleos / processos)')
+
+    generate = comandos.add_parser('generate', help='gera as instâncias')
+    generate.add_argument(
+        '--pasta-saida', default=config.PASTA_INSTANCIAS_GERADAS)
+    generate.add_argument('--semente', type=int)
+
+    bench = comandos.add_parser('bench', help='executa os benchmarks')
+    bench.add_argument('benchmarks', nargs='*',
+                       help='benchmarks a executar (padrão: todos)')
+    bench.add_argument('--tamanhos', nargs='+', choices=['mini', '300', '400', '500'],
+                       help='tamanhos de instância dos benchmarks pipeline e mochila')
+    bench.add_argument('--repeticoes', type=int, default=3)
+    bench.add_argument('--referencia', default=config.ARQUIVO_REFERENCIA_BENCH,
+                       help='medições de referência para detectar regressões')
+    bench.add_argument('--salvar-referencia', action='store_true',
+                       help='grava as medições do pipeline como nova referência')
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+
+    if args.comando == 'solve':
+        from .solve import resolver_arquivo
+
+        resolver_arquivo(args.arquivo, args.pasta_resultados, args.pasta_visualizacoes,
+                         args.tempo_limite, args.threads, not args.sem_visualizacoes,
+                         args.graficos, args.dpi, args.perfilador,
+                         args.cache_modelos, not args.sem_preprocessamento, args.metodo,
+                         _caminho_banco(args), args.carregamento)
+
+    elif args.comando == 'batch':
+        from .solve import executar_todas_instancias_geradas
+
+        executar_todas_instancias_geradas(
+            args.pasta_instancias, args.pasta_resultados, args.pasta_visualizacoes,
+            args.tempo_limite, args.threads, not args.sem_visualizacoes,
+            args.graficos, args.dpi, args.processos, args.formato, args.perfilador,
+            args.cache_modelos, not args.sem_preprocessamento, args.metodo, args.trabalhadores,
+            _caminho_banco(args), args.carregamento)
+
+    elif args.comando == 'campanha':
+        from .campanha import criar_fila, executar_trabalhadores, imprimir_estado_campanha
+
+        if args.acao == 'criar':
+            criar_fila(args.fila, args.pasta_instancias)
+        elif args.acao == 'trabalhar':
+            executar_trabalhadores(
+                args.fila, args.trabalhadores, args.pasta_resultados, args.metodo,
+                args.tempo_limite, args.threads, args.cache_modelos,
+                not args.sem_preprocessamento, args.formato, args.intervalo_batimento,
+                args.expiracao_batimento, _caminho_banco(args), args.carregamento)
+        else:
+            imprimir_estado_campanha(args.fila)
+
+    elif args.comando == 'banco':
+        from .banco import (gap_por_metodo, importar_resultados_salvos, imprimir_consulta,
+                            tempo_por_familia)
+
+        caminho = _caminho_banco(args)
+        if args.acao == 'importar':
+            importar_resultados_salvos(caminho, args.pasta_resultados)
+        elif args.acao == 'tempo':
+            imprimir_consulta(tempo_por_familia(caminho, args.metodo),
+                              'TEMPO DE RESOLUÇÃO POR FAMÍLIA')
+        else:
+            imprimir_consulta(gap_por_metodo(caminho, args.familia), 'GAP POR FORMULAÇÃO')
+
+    elif args.comando == 'reotimizar':
+        from .reotimizacao import executar_reotimizacao
+
+        executar_reotimizacao(args.arquivo, args.alteracoes, args.tempo_limite,
+                              args.tempo_limite_reotimizacao, args.threads, args.pasta_resultados)
+
+    elif args.comando == 'online':
+        from .online import executar_online_arquivo
+
+        executar_online_arquivo(args.arquivo, args.seguir, args.limiar_despacho / 100,
+                                args.janela_maxima, args.lote, args.tempo_limite_decisao,
+                                args.threads, args.pasta_resultados)
+
+    elif args.comando == 'sensibilidade':
+        from .sensibilidade import executar_sensibilidade, gerar_cenarios
+
+        cenarios = gerar_cenarios(args.fatores_penalidade, args.betas, args.fatores_custo)
+        executar_sensibilidade(args.arquivo, cenarios, args.tempo_limite, args.processos,
+                               args.threads, args.pasta_resultados)
+
+    elif args.comando == 'pareto':
+        from .pareto import executar_pareto
+
+        executar_pareto(args.arquivo, args.pontos, args.medida, args.tempo_limite, args.threads,
+                        args.pasta_resultados, args.pasta_visualizacoes, args.dpi)
+
+    elif args.comando == 'servico':
+        from .servico import executar_servico
+
+        executar_servico(args.host, args.porta, args.socket, args.trabalhadores,
+                         args.threads, args.fila_maxima, args.pasta_resultados)
+
+    elif args.comando == 'render':
+        from .plots import renderizar_resultados_salvos
+
+        renderizar_resultados_salvos(args.pasta_resultados, args.pasta_visualizacoes,
+                                     args.graficos, args.dpi, args.processos)
+
+    elif args.comando == 'sweep':
+        from .sweep import executar_varredura, gerar_configuracoes, interpretar_parametros
+
+        espaco = interpretar_parametros(args.parametros) if args.parametros else None
+        configuracoes = gerar_configuracoes(
+            espaco, args.modo, args.amostras, args.semente)
+
+        executar_varredura(args.pasta_instancias, args.pasta_resultados, configuracoes,
+                           args.tempo_limite, args.gap_alvo / 100, args.processos,
+                           args.threads, args.cache_modelos)
+
+    elif args.comando == 'generate':
+        from .gerador import gerar_todas_instancias
+
+        gerar_todas_instancias(args.pasta_saida, args.semente)
+
+    elif args.comando == 'bench':
+        from .bench import BENCHMARKS
+
+        nomes = args.benchmarks or list(BENCHMARKS)
+        desconhecidos = [nome for nome in nomes if nome not in BENCHMARKS]
+        if desconhecidos:
+            print(f"❌ Benchmarks desconhecidos: {', '.join(desconhecidos)}")
+            return 2
+
+        opcoes = {'pipeline': {
+            'tamanhos': args.tamanhos,
+            'repeticoes': args.repeticoes,
+            'referencia': args.referencia,
+            'salvar_referencia': args.referencia if args.salvar_referencia else None,
+        }, 'mochila': {
+            'tamanhos': args.tamanhos,
+        }}
+
+        ok = True
+        for nome in nomes:
+            print(f"\n{'='*80}\n⏱️ BENCHMARK: {nome}\n{'='*80}")
+            ok = BENCHMARKS[nome](**opcoes.get(nome, {})) is not False and ok
+
+        return 0 if ok else 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,473 @@
+import time
+
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+from .heuristics import custo_atribuicao, heuristica_gulosa
+from .lagrangian import (dados_relaxacao, limite_mochila_fracionaria, reparar,
+                         resolver_lagrangeano, sem_alocacao)
+from .mochila import mochila_veiculo, resolver_mochila
+from .preprocess import preprocessar_instancia
+
+# Geração de colunas: cada coluna é uma carga viável de um veículo (UMs
+# elegíveis, dentro das capacidades e com a carga mínima). O mestre escolhe
+# no máximo uma carga por veículo e cobre cada UM no máximo uma vez,
+#
+#   min constante + soma_p (custo_ativacao_v - soma_{i em p} lucro_i) * lambda_p
+#
+# com lucro_i = peso_i * (penalidade_i + 1), o mesmo objetivo de
+# criar_modelo escrito por carga. O pricing de cada veículo é a mochila de
+# mochila.py com lucro_i + pi_i (pi_i <= 0 é o dual da cobertura da UM).
+#
+# Veículos idênticos no modelo (mesmas capacidades, carga mínima, custo e
+# UMs elegíveis; a região só importa por ter ou não clientes) formam um
+# grupo com uma linha "no máximo |grupo| cargas" e um único pricing, o que
+# elimina a simetria entre eles.
+#
+# Os duais oscilam muito entre iterações (o mestre é degenerado), então o
+# pricing usa a média ponderada dos duais atuais com os do melhor limite
+# (suavização de Wentges) e só volta aos duais atuais quando a média não
+# gera coluna de custo reduzido negativo.
+#
+# O limite inferior é o lagrangeano dos duais de cobertura, que vale para
+# qualquer pi <= 0,
+#
+#   constante + soma_i pi_i + soma_g |g| * min(0, custo_ativacao_g - mochila_g(lucro + pi)),
+#
+# com um limite superior da mochila (Dantzig a cada iteração e a
+# programação dinâmica relaxada no fim). A solução inteira vem do mestre
+# restrito às colunas geradas com lambda binário (price-and-branch) e, a
+# partir dela, do modelo compacto restrito aos pares UM-veículo dessas
+# colunas, que recombina UMs de cargas diferentes. A relaxação lagrangiana
+# roda antes, com parte do tempo: a solução dela entra como colunas e o
+# limite dela vale também para o mestre.
+
+ITERACOES_COLUNAS = 200
+TEMPO_LIMITE_COLUNAS = 600
+FRACAO_LAGRANGEANO = 0.25  # do tempo limite, para a relaxação lagrangiana inicial
+TOLERANCIA_CUSTO_REDUZIDO = 1e-6
+TOLERANCIA_GAP = 1e-4
+ALFA_SUAVIZACAO = 0.7  # peso dos duais do melhor limite no pricing
+
+
+def grupos_veiculos(dados):
+    # Listas de índices de veículos idênticos para o modelo
+    grupos = {}
+    for j in range(len(dados['cap_peso'])):
+        chave = (dados['cap_peso'][j], dados['cap_volume'][j], dados['carga_minima'][j],
+                 dados['custo_ativacao'][j], dados['elegivel'][:, j].tobytes())
+        grupos.setdefault(chave, []).append(j)
+
+    return list(grupos.values())
+
+
+def _limites_dantzig(dados, representantes, lucro):
+    # Limite superior da mochila de cada grupo para o lucro dado
+    elegivel = dados['elegivel'][:, representantes]
+    valor_peso, _ = limite_mochila_fracionaria(
+        lucro, dados['peso'], elegivel, dados['cap_peso'][representantes])
+    valor_volume, _ = limite_mochila_fracionaria(
+        lucro, dados['volume'], elegivel, dados['cap_volume'][representantes])
+    return np.minimum(valor_peso, valor_volume)
+
+
+def _limites_programacao_dinamica(dados, representantes, lucro):
+    limites = np.empty(len(representantes))
+    for g, j in enumerate(representantes):
+        itens = dados['elegivel'][:, j]
+        limites[g] = resolver_mochila(
+            lucro[itens], dados['peso'][itens], dados['volume'][itens],
+            dados['cap_peso'][j], dados['cap_volume'][j],
+            metodo='exato', arredondamento='relaxado')['valor']
+    return limites
+
+
+def limite_dual(dados, grupos, pi, limites_mochila):
+    representantes = [grupo[0] for grupo in grupos]
+    tamanhos = np.array([len(grupo) for grupo in grupos])
+    custo_reduzido = dados['custo_ativacao'][representantes] - limites_mochila
+    return dados['constante'] + pi.sum() + (tamanhos * np.minimum(custo_reduzido, 0.0)).sum()
+
+
+def _atribuicao_para_colunas(instancia, grupos, atribuicao):
+    # {UM: veículo} -> lista de (grupo, índices das UMs)
+    indice_um = {um["id"]: k for k, um in enumerate(instancia["ums"])}
+    grupo_veiculo = {instancia["veiculos"][j]["id"]: g
+                     for g, grupo in enumerate(grupos) for j in grupo}
+
+    cargas = {}
+    for um_id, v_id in atribuicao.items():
+        cargas.setdefault(v_id, []).append(indice_um[um_id])
+
+    return [(grupo_veiculo[v_id], np.array(sorted(itens), dtype=int))
+            for v_id, itens in cargas.items()]
+
+
+def criar_mestre(dados, grupos, threads=None, env=None):
+    # Mestre restrito no Gurobi. As restrições começam vazias e cada coluna
+    # entra com coeficiente 1 na cobertura das suas UMs e na linha do seu
+    # grupo de veículos. env: ambiente já iniciado, como em criar_modelo.
+
+    modelo = gp.Model("MestreColunas", env=env)
+    modelo.Params.OutputFlag = 0
+    if threads is not None:
+        modelo.Params.Threads = threads
+    modelo.ObjCon = dados['constante']
+
+    return {
+        'modelo': modelo,
+        'grupos': grupos,
+        'cobertura': [modelo.addConstr(gp.LinExpr() <= 1, name=f"cobertura_{k}")
+                      for k in range(len(dados['peso']))],
+        'grupo': [modelo.addConstr(gp.LinExpr() <= len(grupo), name=f"grupo_{g}")
+                  for g, grupo in enumerate(grupos)],
+        'colunas': [],
+        'custos': [],
+        'variaveis': [],
+        'conhecidas': {},  # (grupo, UMs) -> índice da coluna
+    }
+
+
+def adicionar_coluna(mestre, dados, g, itens):
+    chave = (g, tuple(sorted(int(k) for k in itens)))
+    if not len(itens) or chave in mestre['conhecidas']:
+        return False
+    mestre['conhecidas'][chave] = len(mestre['colunas'])
+
+    j = mestre['grupos'][g][0]
+    custo = dados['custo_ativacao'][j] - dados['lucro'][itens].sum()
+    restricoes = [mestre['cobertura'][k] for k in itens] + [mestre['grupo'][g]]
+    variavel = mestre['modelo'].addVar(
+        lb=0.0, obj=custo, column=gp.Column([1.0] * len(restricoes), restricoes),
+        name=f"carga_{len(mestre['colunas'])}")
+
+    mestre['colunas'].append((g, np.array(itens, dtype=int)))
+    mestre['custos'].append(custo)
+    mestre['variaveis'].append(variavel)
+    return True
+
+
+def resolver_mestre_relaxado(mestre):
+    modelo = mestre['modelo']
+    modelo.optimize()
+    pi = np.array(modelo.getAttr('Pi', mestre['cobertura']))
+    sigma = np.array(modelo.getAttr('Pi', mestre['grupo']))
+    return modelo.ObjVal, pi, sigma
+
+
+def mergulho(mestre):
+    # Arredondamento do mestre relaxado: fixa em 1 a carga de maior lambda,
+    # zera as cargas que dividem UMs com ela e resolve de novo, até a
+    # solução ser inteira. Restaura os limites no fim e retorna os índices
+    # das cargas escolhidas.
+
+    modelo = mestre['modelo']
+    variaveis = mestre['variaveis']
+    colunas = mestre['colunas']
+
+    cargas_da_um = {}
+    for c, (_, itens) in enumerate(colunas):
+        for k in itens:
+            cargas_da_um.setdefault(int(k), []).append(c)
+
+    fixadas = set()
+    zeradas = set()
+    while True:
+        modelo.optimize()
+        if modelo.status != GRB.OPTIMAL:
+            break
+
+        valores = modelo.getAttr('X', variaveis)
+        livres = [c for c in range(len(variaveis)) if c not in fixadas and valores[c] > 1e-6]
+        if not livres:
+            break
+
+        c = max(livres, key=lambda c: valores[c])
+        fixadas.add(c)
+        variaveis[c].LB = 1.0
+        for k in colunas[c][1]:
+            for outra in cargas_da_um[int(k)]:
+                if outra != c and outra not in zeradas:
+                    zeradas.add(outra)
+                    variaveis[outra].UB = 0.0
+
+    for c in fixadas:
+        variaveis[c].LB = 0.0
+    for c in zeradas:
+        variaveis[c].UB = GRB.INFINITY
+
+    return sorted(fixadas)
+
+
+def resolver_mestre_inteiro(mestre, tempo_limite, inicial=None, cancelar=None):
+    # Price-and-branch: as colunas geradas com lambda binário (uma carga com
+    # UMs não pode se repetir, pois cada UM é coberta no máximo uma vez),
+    # partindo da melhor entre a solução do mergulho e as cargas dadas em
+    # inicial (índices de colunas). cancelar interrompe o Gurobi por callback.
+    modelo = mestre['modelo']
+    variaveis = mestre['variaveis']
+
+    inicio = time.perf_counter()
+    candidatas = [mergulho(mestre)] + ([inicial] if inicial else [])
+    escolhidas = set(min(candidatas, key=lambda c: sum(mestre['custos'][k] for k in c)))
+
+    modelo.setAttr('VType', variaveis, [GRB.BINARY] * len(variaveis))
+    modelo.setAttr('Start', variaveis, [1.0 if c in escolhidas else 0.0
+                                        for c in range(len(variaveis))])
+    modelo.Params.TimeLimit = max(tempo_limite - (time.perf_counter() - inicio), 1)
+
+    def interromper(modelo, onde):
+        if cancelar():
+            modelo.terminate()
+
+    modelo.optimize(interromper if cancelar is not None else None)
+    mestre['status_inteiro'] = modelo.status
+
+    if modelo.SolCount == 0:
+        return [mestre['colunas'][c] for c in sorted(escolhidas)]
+
+    valores = modelo.getAttr('X', variaveis)
+    return [coluna for coluna, valor in zip(mestre['colunas'], valores) if valor > 0.5]
+
+
+def resolver_compacto_restrito(dados, grupos, colunas, escolhidas, tempo_limite, threads=None,
+                               cancelar=None, env=None):
+    # O modelo de criar_modelo por veículo, sem o índice de cliente (a região
+    # já está em elegivel), só com os pares UM-veículo que aparecem em alguma
+    # coluna gerada do grupo do veículo. Parte das cargas escolhidas pelo
+    # mestre inteiro e retorna o status do Gurobi e as cargas da melhor
+    # solução, no formato de resolver_mestre_inteiro (None sem solução).
+
+    modelo = gp.Model("CompactoRestrito", env=env)
+    modelo.Params.OutputFlag = 0
+    if threads is not None:
+        modelo.Params.Threads = threads
+    modelo.Params.TimeLimit = max(tempo_limite, 1)
+
+    itens_grupo = [set() for _ in grupos]
+    for g, itens in colunas:
+        itens_grupo[g].update(int(k) for k in itens)
+
+    u, alpha = {}, {}
+    for g, grupo in enumerate(grupos):
+        for j in grupo:
+            alpha[j] = modelo.addVar(vtype=GRB.BINARY, obj=dados['custo_ativacao'][j],
+                                     name=f"alpha_{j}")
+            for k in itens_grupo[g]:
+                u[(k, j)] = modelo.addVar(vtype=GRB.BINARY, obj=-dados['lucro'][k],
+                                          name=f"u_{k}_{j}")
+    modelo.ObjCon = dados['constante']
+
+    por_um, por_veiculo = {}, {}
+    for (k, j), variavel in u.items():
+        por_um.setdefault(k, []).append(variavel)
+        por_veiculo.setdefault(j, []).append((k, variavel))
+
+    for j, pares in por_veiculo.items():
+        carga_peso = gp.quicksum(dados['peso'][k] * variavel for k, variavel in pares)
+        carga_volume = gp.quicksum(dados['volume'][k] * variavel for k, variavel in pares)
+        modelo.addConstr(carga_peso <= dados['cap_peso'][j] * alpha[j], name=f"cap_peso_{j}")
+        modelo.addConstr(carga_volume <= dados['cap_volume'][j] * alpha[j], name=f"cap_vol_{j}")
+        modelo.addConstr(carga_peso >= dados['carga_minima'][j] * alpha[j],
+                         name=f"frete_morto_minimo_{j}")
+    for k, variaveis in por_um.items():
+        modelo.addConstr(gp.quicksum(variaveis) <= 1, name=f"alocacao_unica_{k}")
+
+    # Veículos idênticos usados em ordem, como na atribuição das cargas
+    # do mestre (e sem simetria entre eles)
+    for grupo in grupos:
+        for j, proximo in zip(grupo, grupo[1:]):
+            modelo.addConstr(alpha[j] >= alpha[proximo], name=f"simetria_{proximo}")
+
+    livres = [list(grupo) for grupo in grupos]
+    for g, itens in escolhidas:
+        j = livres[g].pop(0)
+        alpha[j].Start = 1.0
+        for k in itens:
+            u[(int(k), j)].Start = 1.0
+
+    def interromper(modelo, onde):
+        if cancelar():
+            modelo.terminate()
+
+    try:
+        modelo.optimize(interromper if cancelar is not None else None)
+        if modelo.SolCount == 0:
+            return modelo.status, None
+
+        grupo_veiculo = {j: g for g, grupo in enumerate(grupos) for j in grupo}
+        cargas = {}
+        for (k, j), valor in zip(u, modelo.getAttr('X', list(u.values()))):
+            if valor > 0.5:
+                cargas.setdefault(j, []).append(k)
+        return modelo.status, [(grupo_veiculo[j], np.array(sorted(itens), dtype=int))
+                               for j, itens in cargas.items()]
+    finally:
+        modelo.dispose()
+
+
+def precificar(dados, grupos, pi, sigma, pi_pricing, metodo):
+    # Uma carga por grupo, a melhor para os duais pi_pricing, mantida se
+    # tem custo reduzido negativo para os duais atuais (pi, sigma)
+    lucro_pricing = dados['lucro'] + pi_pricing
+    lucro_atual = dados['lucro'] + pi
+
+    novas = []
+    for g, grupo in enumerate(grupos):
+        j = grupo[0]
+        itens, _ = mochila_veiculo(dados, j, lucro_pricing, metodo=metodo)
+        if not len(itens):
+            continue
+        ganho = lucro_atual[itens].sum() - dados['custo_ativacao'][j] + sigma[g]
+        if ganho > TOLERANCIA_CUSTO_REDUZIDO:
+            novas.append((g, itens))
+    return novas
+
+
+def resolver_colunas(instancia, iteracoes=ITERACOES_COLUNAS, tempo_limite=TEMPO_LIMITE_COLUNAS,
+                     threads=None, tolerancia_gap=TOLERANCIA_GAP, cancelar=None, env=None):
+    # Retorna o melhor limite inferior, a atribuição {UM: veículo} da solução
+    # inteira e o custo dela no objetivo de criar_modelo. parada é o motivo
+    # do fim: 'relaxacao' (mestre relaxado resolvido, sem colunas novas),
+    # 'tempo' (geração de colunas ou mestre inteiro no limite de tempo),
+    # 'iteracoes' ou 'cancelada' (cancelar, se dado, é consultado a cada
+    # iteração e nos modelos inteiros, que então devolvem a melhor solução
+    # que têm). env é o ambiente do Gurobi dos modelos; sem ele cada modelo
+    # abre o seu.
+
+    inicio = time.perf_counter()
+
+    reduzida, preprocessamento = preprocessar_instancia(instancia)
+    if not reduzida["ums"] or not reduzida["veiculos"]:
+        solucao = sem_alocacao(instancia, preprocessamento, inicio)
+        solucao.update({'valor_relaxado': solucao['custo'], 'colunas': 0})
+        return solucao
+
+    lagrangeano = resolver_lagrangeano(instancia, tempo_limite=tempo_limite * FRACAO_LAGRANGEANO,
+                                       cancelar=cancelar)
+
+    dados = dados_relaxacao(reduzida)
+    custo_fixo = preprocessamento['custo_fixo']
+
+    grupos = grupos_veiculos(dados)
+    representantes = [grupo[0] for grupo in grupos]
+
+    mestre = criar_mestre(dados, grupos, threads, env)
+
+    # Soluções inteiras (heurística gulosa, relaxação lagrangiana e reparo
+    # lagrangeano com os duais de cobertura como multiplicadores) entram como colunas; a melhor é o
+    # ponto de partida do mestre inteiro
+    melhor_inteira = [np.inf, None]
+
+    def adicionar_solucao(atribuicao):
+        indices = []
+        for g, itens in _atribuicao_para_colunas(reduzida, grupos, atribuicao):
+            adicionar_coluna(mestre, dados, g, itens)
+            indices.append(mestre['conhecidas'][(g, tuple(int(k) for k in itens))])
+        custo = sum(mestre['custos'][c] for c in indices)
+        if custo < melhor_inteira[0]:
+            melhor_inteira[:] = [custo, indices]
+
+    adicionar_solucao(heuristica_gulosa(reduzida))
+    adicionar_solucao(lagrangeano['atribuicao'])
+
+    melhor_limite = -np.inf
+    centro = None
+    iteracao = 0
+    parada = None
+
+    def atualizar_limite(pi_limite):
+        nonlocal melhor_limite, centro
+        limite = limite_dual(dados, grupos, pi_limite,
+                             _limites_dantzig(dados, representantes, dados['lucro'] + pi_limite))
+        if limite > melhor_limite:
+            melhor_limite, centro = limite, pi_limite
+
+    try:
+        for iteracao in range(1, iteracoes + 1):
+            if cancelar is not None and cancelar():
+                parada = 'cancelada'
+                break
+
+            valor_mestre, pi, sigma = resolver_mestre_relaxado(mestre)
+            atualizar_limite(pi)
+            adicionar_solucao(reparar(reduzida, dados, -pi))
+
+            if valor_mestre - melhor_limite <= tolerancia_gap * max(abs(valor_mestre), 1e-9):
+                parada = 'relaxacao'
+                break
+
+            # Duais suavizados; sem coluna, os atuais; sem coluna pela mochila
+            # aproximada, a programação dinâmica
+            pi_suave = ALFA_SUAVIZACAO * centro + (1 - ALFA_SUAVIZACAO) * pi
+            atualizar_limite(pi_suave)
+
+            novas = precificar(dados, grupos, pi, sigma, pi_suave, 'aproximado')
+            for metodo in ('aproximado', 'exato'):
+                if novas:
+                    break
+                novas = precificar(dados, grupos, pi, sigma, pi, metodo)
+
+            if not sum(adicionar_coluna(mestre, dados, g, itens) for g, itens in novas):
+                parada = 'relaxacao'
+                break
+
+            if time.perf_counter() - inicio > tempo_limite / 2:
+                parada = 'tempo'
+                break
+
+        # Limite final com a mochila relaxada por programação dinâmica, mais
+        # justo que o de Dantzig
+        valor_mestre, pi, _ = resolver_mestre_relaxado(mestre)
+        limites = np.minimum(_limites_dantzig(dados, representantes, dados['lucro'] + pi),
+                             _limites_programacao_dinamica(dados, representantes, dados['lucro'] + pi))
+        melhor_limite = max(melhor_limite, limite_dual(dados, grupos, pi, limites))
+
+        # Metade do tempo restante para o mestre inteiro e o resto para o
+        # modelo compacto restrito, que parte das cargas dele
+        escolhidas = resolver_mestre_inteiro(
+            mestre, (tempo_limite - (time.perf_counter() - inicio)) / 2, melhor_inteira[1], cancelar)
+        status_inteiro = mestre['status_inteiro']
+
+        if status_inteiro != GRB.INTERRUPTED:
+            try:
+                status_inteiro, recombinadas = resolver_compacto_restrito(
+                    dados, grupos, mestre['colunas'], escolhidas,
+                    tempo_limite - (time.perf_counter() - inicio), threads, cancelar, env)
+            except gp.GurobiError as e:
+                print(f"⚠️ Modelo compacto restrito não resolvido: {e}")
+            else:
+                if recombinadas is not None:
+                    escolhidas = recombinadas
+    finally:
+        mestre['modelo'].dispose()
+
+    if status_inteiro == GRB.TIME_LIMIT:
+        parada = 'tempo'
+    elif status_inteiro == GRB.INTERRUPTED or lagrangeano['parada'] == 'cancelada':
+        parada = 'cancelada'
+
+    # As cargas de cada grupo vão para veículos distintos do grupo
+    livres = [list(grupo) for grupo in grupos]
+    atribuicao = {}
+    for g, itens in escolhidas:
+        j = livres[g].pop(0)
+        for k in itens:
+            atribuicao[reduzida["ums"][k]["id"]] = reduzida["veiculos"][j]["id"]
+
+    custo = custo_atribuicao(instancia, atribuicao)
+    melhor_limite = max(melhor_limite + custo_fixo, lagrangeano['limite_inferior'])
+
+    return {
+        'limite_inferior': float(melhor_limite),
+        'valor_relaxado': float(valor_mestre + custo_fixo),
+        'custo': float(custo),
+        'atribuicao': atribuicao,
+        'gap': float((custo - melhor_limite) / abs(custo)) if custo else 0.0,
+        'iteracoes': iteracao,
+        'parada': parada or 'iteracoes',
+        'colunas': len(mestre['colunas']),
+        'tempo': time.perf_counter() - inicio,
+        'preprocessamento': preprocessamento,
+    }
@@ -0,0 +1,14 @@
+import os
+
+# Pastas padrão relativas à raiz do repositório, como no script original;
+# todas podem ser trocadas pela linha de comando.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASTA_INSTANCIAS = os.path.join(RAIZ, 'OtimizacaoQualif')
+PASTA_RESULTADOS = os.path.join(PASTA_INSTANCIAS, 'Resultados')
+PASTA_VISUALIZACOES = os.path.join(PASTA_INSTANCIAS, 'Visualizacoes')
+PASTA_CACHE_MODELOS = os.path.join(PASTA_INSTANCIAS, 'CacheModelos')
+PASTA_INSTANCIAS_GERADAS = os.path.join(RAIZ, 'Instancias_Penalidade')
+ARQUIVO_REFERENCIA_BENCH = os.path.join(RAIZ, 'bench_referencia.json')
+
+TIMEOUT = 3600
@@ -0,0 +1,194 @@
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .colunas import resolver_colunas
+from .heuristics import custo_atribuicao
+from .lagrangian import resolver_lagrangeano
+from .model import criar_modelo
+from .preprocess import preprocessar_instancia
+
+# Decomposição espacial: os clientes são divididos pelas coordenadas em
+# grupos com número parecido de UMs e cada grupo vira uma instância menor,
+# com as UMs dos seus clientes e parte da frota, resolvida em paralelo. A
+# divisão é uma bissecção recursiva por coordenada (como na construção de
+# uma KD-tree): o conjunto é cortado no eixo de maior extensão, na posição
+# em que a soma de UMs dos dois lados fica proporcional ao número de grupos
+# de cada lado. Com isso instâncias com clientes concentrados em um canto
+# ainda geram grupos de tamanho parecido, o que as quatro regiões fixas de
+# definir_regioes não garantem. Um cliente não é dividido entre grupos.
+#
+# Cada veículo vai para um único grupo: o que tem clientes da região do
+# veículo (sem eles destino_ zera todas as suas x) e mais demanda dessa
+# região ainda descoberta pela frota já distribuída. Como UMs e veículos não
+# se repetem entre grupos, a união das soluções é viável na instância
+# completa. Não há limite inferior: a decomposição restringe o problema.
+
+ALVO_UMS_GRUPO = 25
+PROCESSOS_ESPACIAL = 2
+TEMPO_LIMITE_GRUPO = 60
+TEMPO_LIMITE_ESPACIAL = 600
+
+
+def _bissecao(indices, coordenadas, pesos, partes):
+    if partes == 1 or len(indices) <= 1:
+        return [indices]
+
+    extensao = coordenadas[indices].max(axis=0) - coordenadas[indices].min(axis=0)
+    eixo = int(np.argmax(extensao))
+    ordem = indices[np.argsort(coordenadas[indices, eixo], kind='stable')]
+
+    partes_esquerda = partes // 2
+    acumulado = np.cumsum(pesos[ordem])
+    corte = int(np.searchsorted(acumulado, acumulado[-1] * partes_esquerda / partes)) + 1
+    corte = min(max(corte, 1), len(ordem) - 1)
+
+    return (_bissecao(ordem[:corte], coordenadas, pesos, partes_esquerda)
+            + _bissecao(ordem[corte:], coordenadas, pesos, partes - partes_esquerda))
+
+
+def agrupar_clientes(instancia, alvo_ums=ALVO_UMS_GRUPO):
+    # Lista de grupos de ids de clientes, com cerca de alvo_ums UMs cada. Não
+    # há mais grupos que veículos, senão algum grupo ficaria sem frota.
+
+    clientes = instancia["clientes"]
+    if any(c.get("x") is None or c.get("y") is None for c in clientes):
+        raise ValueError("A decomposição espacial precisa das coordenadas x e y dos clientes")
+
+    posicao = {c["id"]: k for k, c in enumerate(clientes)}
+    pesos = np.zeros(len(clientes))
+    for um in instancia["ums"]:
+        if um["cliente"] in posicao:
+            pesos[posicao[um["cliente"]]] += 1
+
+    coordenadas = np.array([[c["x"], c["y"]] for c in clientes], dtype=float)
+    partes = max(1, min(len(clientes), len(instancia["veiculos"]),
+                        math.ceil(len(instancia["ums"]) / alvo_ums)))
+
+    grupos = _bissecao(np.arange(len(clientes)), coordenadas, pesos, partes)
+
+    return [[clientes[k]["id"] for k in grupo] for grupo in grupos]
+
+
+def dividir_instancia(instancia, alvo_ums=ALVO_UMS_GRUPO):
+    # Uma subinstância por grupo de clientes. UMs de cliente ausente do
+    # arquivo ficam com o grupo de menos UMs.
+
+    grupos = agrupar_clientes(instancia, alvo_ums)
+    grupo_cliente = {c_id: g for g, grupo in enumerate(grupos) for c_id in grupo}
+    por_id = {c["id"]: c for c in instancia["clientes"]}
+
+    ums = [[] for _ in grupos]
+    sem_cliente = []
+    for um in instancia["ums"]:
+        if um["cliente"] in grupo_cliente:
+            ums[grupo_cliente[um["cliente"]]].append(um)
+        else:
+            sem_cliente.append(um)
+    if sem_cliente:
+        min(ums, key=len).extend(sem_cliente)
+
+    # Demanda (peso) de cada grupo por região dos clientes das UMs
+    demanda = [{} for _ in grupos]
+    for g, ums_grupo in enumerate(ums):
+        for um in ums_grupo:
+            demanda[g][um["destino"]] = demanda[g].get(um["destino"], 0.0) + um["peso"]
+    regioes = [{por_id[c_id]["destino"] for c_id in grupo} for grupo in grupos]
+
+    veiculos = [[] for _ in grupos]
+    for v in sorted(instancia["veiculos"], key=lambda v: -v["capacidade_peso"]):
+        candidatos = [g for g in range(len(grupos)) if v["destino"] in regioes[g]]
+        if not candidatos:
+            continue
+        g = max(candidatos, key=lambda g: (demanda[g].get(v["destino"], 0.0), -len(veiculos[g])))
+        veiculos[g].append(v)
+        demanda[g][v["destino"]] = demanda[g].get(v["destino"], 0.0) - v["capacidade_peso"]
+
+    return [dict(instancia, clientes=[por_id[c_id] for c_id in grupo], ums=ums[g],
+                 veiculos=veiculos[g])
+            for g, grupo in enumerate(grupos)]
+
+
+def _resolver_mip(subinstancia, tempo_limite, threads):
+    from .solve import criar_ambiente  # solve importa este módulo
+
+    reduzida, _ = preprocessar_instancia(subinstancia)
+    if not reduzida["ums"] or not reduzida["veiculos"]:
+        return {}
+
+    env = criar_ambiente(tempo_limite, threads, console=False)
+    modelo = None
+    try:
+        modelo, x, _, _ = criar_modelo(reduzida, env)
+        modelo.optimize()
+        if modelo.SolCount == 0:
+            return {}
+        return {chave[0]: chave[1] for chave, valor in modelo.getAttr('X', x).items()
+                if valor > 0.5}
+    finally:
+        if modelo is not None:
+            modelo.dispose()
+        env.dispose()
+
+
+def resolver_grupo(subinstancia, metodo='mip', tempo_limite=TEMPO_LIMITE_GRUPO, threads=None):
+    # Atribuição {UM: veículo} de uma subinstância; grupos sem veículo (todos
+    # foram para grupos com mais demanda na região) ficam sem alocação
+
+    if not subinstancia["ums"] or not subinstancia["veiculos"]:
+        return {}
+    if metodo == 'lagrangeano':
+        return resolver_lagrangeano(subinstancia, tempo_limite=tempo_limite)['atribuicao']
+    if metodo == 'colunas':
+        return resolver_colunas(subinstancia, tempo_limite=tempo_limite,
+                                threads=threads)['atribuicao']
+
+    return _resolver_mip(subinstancia, tempo_limite, threads)
+
+
+def resolver_espacial(instancia, alvo_ums=ALVO_UMS_GRUPO, processos=PROCESSOS_ESPACIAL,
+                      metodo='mip', tempo_limite=TEMPO_LIMITE_ESPACIAL, threads=None):
+    # Mesmo formato de resolver_lagrangeano, sem limite inferior. tempo_limite
+    # é o da instância inteira: cada grupo, ao entrar no pool, recebe o tempo
+    # que resta dividido pelas rodadas de grupos que faltam (os que esperam e
+    # os que estão rodando, processos por rodada), então grupos que terminam
+    # cedo deixam tempo para os seguintes.
+
+    inicio = time.perf_counter()
+
+    subinstancias = dividir_instancia(instancia, alvo_ums)
+    pendentes = [sub for sub in subinstancias if sub["ums"] and sub["veiculos"]]
+    processos = max(1, min(processos, len(pendentes)))
+    if threads is None:
+        threads = max(1, (os.cpu_count() or 1) // processos)
+
+    atribuicao = {}
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        rodando = set()
+        while pendentes or rodando:
+            while pendentes and len(rodando) < processos:
+                rodadas = math.ceil((len(pendentes) + len(rodando)) / processos)
+                restante = tempo_limite - (time.perf_counter() - inicio)
+                rodando.add(pool.submit(resolver_grupo, pendentes.pop(0), metodo,
+                                        max(restante / rodadas, 1), threads))
+            feitos, rodando = wait(rodando, return_when=FIRST_COMPLETED)
+            for futuro in feitos:
+                atribuicao.update(futuro.result())
+
+    _, preprocessamento = preprocessar_instancia(instancia)
+
+    return {
+        'limite_inferior': None,
+        'custo': float(custo_atribuicao(instancia, atribuicao)),
+        'atribuicao': atribuicao,
+        'gap': None,
+        'iteracoes': len(subinstancias),
+        'parada': 'decomposicao',
+        'grupos': [{'clientes': len(sub["clientes"]), 'ums': len(sub["ums"]),
+                    'veiculos': len(sub["veiculos"])} for sub in subinstancias],
+        'tempo': time.perf_counter() - inicio,
+        'preprocessamento': preprocessamento,
+    }
@@ -0,0 +1,108 @@
+from collections import defaultdict
+
+from .io import matriz_compatibilidade
+
+
+def heuristica_gulosa(instancia):
+    # Solução construtiva: veículos em ordem de custo por kg de capacidade
+    # (custo + frete morto total), cada um enchido com as UMs compatíveis da
+    # sua região de maior penalidade por kg. Um veículo só fica ativo se
+    # atinge a carga mínima e se a penalidade evitada paga o seu custo.
+    # Retorna {id da UM: id do veículo} apenas com as UMs alocadas.
+
+    ums = instancia["ums"]
+    veiculos = instancia["veiculos"]
+    beta_v = 1
+
+    compativel = matriz_compatibilidade(ums, veiculos)
+
+    ums_por_destino = defaultdict(list)
+    for k, um in enumerate(ums):
+        ums_por_destino[um["destino"]].append(k)
+
+    for destino in ums_por_destino:
+        ums_por_destino[destino].sort(key=lambda k: -ums[k]["penalidade"])
+
+    ordem_veiculos = sorted(
+        (j for j, v in enumerate(veiculos) if v["capacidade_peso"] > 0),
+        key=lambda j: (veiculos[j]["custo"] + beta_v * veiculos[j]["capacidade_peso"])
+        / veiculos[j]["capacidade_peso"])
+
+    atribuicao = {}
+    for j in ordem_veiculos:
+        v = veiculos[j]
+        peso = 0.0
+        volume = 0.0
+        ganho = 0.0
+        carga = []
+
+        for k in ums_por_destino.get(v["destino"], []):
+            um = ums[k]
+            if um["id"] in atribuicao or not compativel[k, j]:
+                continue
+            if peso + um["peso"] > v["capacidade_peso"] or volume + um["volume"] > v["capacidade_volume"]:
+                continue
+
+            carga.append(um["id"])
+            peso += um["peso"]
+            volume += um["volume"]
+            ganho += um["peso"] * (um["penalidade"] + beta_v)
+
+        custo_ativacao = v["custo"] + beta_v * v["capacidade_peso"]
+        if carga and peso >= v["carga_minima"] and ganho > custo_ativacao:
+            for um_id in carga:
+                atribuicao[um_id] = v["id"]
+
+    return atribuicao
+
+
+def atribuicao_para_valores(instancia, atribuicao):
+    # Converte {UM: veículo} nos valores de x e alpha do modelo. Cada UM usa o
+    # próprio cliente quando ele está na região do veículo; senão, o primeiro
+    # cliente dessa região (o modelo só exige algum cliente da região).
+
+    clientes_por_destino = defaultdict(list)
+    for c in instancia["clientes"]:
+        clientes_por_destino[c["destino"]].append(c["id"])
+
+    destino_veiculo = {v["id"]: v["destino"] for v in instancia["veiculos"]}
+    destino_cliente = {c["id"]: c["destino"] for c in instancia["clientes"]}
+
+    x_val = {(i["id"], v["id"], c["id"]): 0.0
+             for i in instancia["ums"]
+             for v in instancia["veiculos"]
+             for c in instancia["clientes"]}
+    alpha_val = {v["id"]: 0.0 for v in instancia["veiculos"]}
+
+    for um in instancia["ums"]:
+        v_id = atribuicao.get(um["id"])
+        if v_id is None:
+            continue
+
+        if destino_cliente.get(um["cliente"]) == destino_veiculo[v_id]:
+            c_id = um["cliente"]
+        else:
+            c_id = clientes_por_destino[destino_veiculo[v_id]][0]
+
+        x_val[(um["id"], v_id, c_id)] = 1.0
+        alpha_val[v_id] = 1.0
+
+    return x_val, alpha_val
+
+
+def custo_atribuicao(instancia, atribuicao):
+    # Valor da função objetivo de criar_modelo para a atribuição
+
+    beta_v = 1
+    carga = defaultdict(float)
+    for um in instancia["ums"]:
+        v_id = atribuicao.get(um["id"])
+        if v_id is not None:
+            carga[v_id] += um["peso"]
+
+    custo_nao_alocacao = sum(um["peso"] * um["penalidade"]
+                             for um in instancia["ums"] if um["id"] not in atribuicao)
+    custo_veiculos = sum(v["custo"] + beta_v * (v["capacidade_peso"] - carga[v["id"]])
+                         for v in instancia["veiculos"] if v["id"] in carga)
+
+    return custo_nao_alocacao + custo_veiculos
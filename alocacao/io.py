@@ -0,0 +1,365 @@
+import csv
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+
+def carregar_dados(caminho_arquivo):
+
+    dados = {
+        'parametros': {},
+        'veiculos': [],
+        'ums': [],
+        'clientes': [],
+        'raiz': None
+    }
+
+    with open(caminho_arquivo, mode='r', encoding='utf-8') as file:
+
+        reader = csv.DictReader(file, delimiter=';')
+        for row in reader:
+            tipo = row['tipo']
+
+            if tipo == 'parametro':
+                dados['parametros'][row['descricao']] = float(row['valor'])
+
+            elif tipo == 'no':
+                # Posição do nó raiz no grid do gerador (CENTRO ou CANTO)
+                dados['raiz'] = row['destino']
+
+            elif tipo == 'cliente':
+                dados['clientes'].append(cliente_da_linha(row))
+
+            elif tipo == 'veiculo':
+                dados['veiculos'].append(veiculo_da_linha(row))
+
+            elif tipo == 'um':
+                dados['ums'].append(um_da_linha(row, dados['clientes'], dados['veiculos']))
+
+    return dados
+
+
+def coordenada(valor):
+    # x e y dos clientes; vazios em arquivos sem coordenadas
+    return float(valor) if valor else None
+
+
+def cliente_da_linha(row):
+    return {
+        'id': int(row['id']),
+        'nome': row['descricao'],
+        'destino': row['destino'],
+        'x': coordenada(row.get('x')),
+        'y': coordenada(row.get('y'))
+    }
+
+
+def veiculo_da_linha(row):
+    return {
+        'id': int(row['id']),
+        'tipo': row['descricao'].replace('Veiculo_', ''),
+        'capacidade_peso': float(row['capacidade_peso']),
+        'capacidade_volume': float(row['capacidade_vol']),
+        'custo': float(row['custo']),
+        'carga_minima': float(row['carga_minima']),
+        'destino': row['destino'] if 'destino' in row else None
+    }
+
+
+def um_da_linha(row, clientes, veiculos):
+    # Linha 'um' do CSV -> dicionário da UM. O destino vem do cliente, que
+    # precisa ter aparecido antes no arquivo.
+
+    cliente_id = int(row['cliente'])
+
+    destino = next(
+        (c['destino'] for c in clientes if c['id'] == cliente_id), '')
+
+    return {
+        'id': int(row['id']),
+        'tipo': row['descricao'],
+        'peso': float(row['peso']),
+        'volume': float(row['volume']),
+        'destino': destino,
+        'cliente': cliente_id,
+        'compatibilidade': row['compatibilidade'] or ",".join(str(v['tipo']) for v in veiculos),
+        'restricao': row['restricao'],
+        'penalidade': float(row['penalidade'])
+    }
+
+
+TAMANHO_BLOCO_LEITURA = 10000
+MODOS_CARREGAMENTO = ['csv', 'streaming']
+
+
+def _contar_linhas(caminho_arquivo):
+
+    linhas = 0
+    with open(caminho_arquivo, mode='rb') as file:
+        for bloco in iter(lambda: file.read(1 << 20), b''):
+            linhas += bloco.count(b'\n')
+
+    return linhas + 1
+
+
+def codificar_categorias(tabela, valores):
+
+    for valor in set(valores).difference(tabela):
+        tabela[sys.intern(valor)] = len(tabela)
+
+    return [tabela[valor] for valor in valores]
+
+
+def carregar_dados_streaming(caminho_arquivo, tamanho_bloco=TAMANHO_BLOCO_LEITURA):
+    # Lê o arquivo em blocos e preenche arrays tipados pré-alocados com as UMs.
+    # Strings repetidas (tipo, restrição, compatibilidade) viram códigos inteiros
+    # apontando para tabelas de categorias internadas.
+
+    capacidade = _contar_linhas(caminho_arquivo)
+
+    ums = {
+        'id': np.empty(capacidade, dtype=np.int64),
+        'peso': np.empty(capacidade, dtype=np.float64),
+        'volume': np.empty(capacidade, dtype=np.float64),
+        'cliente': np.empty(capacidade, dtype=np.int64),
+        'penalidade': np.empty(capacidade, dtype=np.float64),
+        'tipo': np.empty(capacidade, dtype=np.int32),
+        'restricao': np.empty(capacidade, dtype=np.int32),
+        'compatibilidade': np.empty(capacidade, dtype=np.int32),
+    }
+    tabelas = {'tipo': {}, 'restricao': {}, 'compatibilidade': {}}
+
+    dados = {
+        'parametros': {},
+        'veiculos': [],
+        'ums': ums,
+        'clientes': [],
+        'raiz': None
+    }
+
+    n = 0
+    with open(caminho_arquivo, mode='r', encoding='utf-8', newline='') as file:
+
+        reader = csv.reader(file, delimiter=';')
+        coluna = {nome: i for i, nome in enumerate(next(reader))}
+
+        c_tipo = coluna['tipo']
+        c_id = coluna['id']
+        c_descricao = coluna['descricao']
+        c_peso = coluna['peso']
+        c_volume = coluna['volume']
+        c_cliente = coluna['cliente']
+        c_compat = coluna['compatibilidade']
+        c_restricao = coluna['restricao']
+        c_penalidade = coluna['penalidade']
+        c_destino = coluna.get('destino')
+        c_x = coluna.get('x')
+        c_y = coluna.get('y')
+
+        while True:
+            bloco = list(itertools.islice(reader, tamanho_bloco))
+            if not bloco:
+                break
+
+            linhas_um = []
+            for row in bloco:
+                tipo = row[c_tipo]
+
+                if tipo == 'um':
+                    linhas_um.append(row)
+
+                elif tipo == 'parametro':
+                    dados['parametros'][row[c_descricao]] = float(
+                        row[coluna['valor']])
+
+                elif tipo == 'no':
+                    dados['raiz'] = row[c_destino]
+
+                elif tipo == 'cliente':
+                    dados['clientes'].append({
+                        'id': int(row[c_id]),
+                        'nome': row[c_descricao],
+                        'destino': sys.intern(row[c_destino]),
+                        'x': coordenada(row[c_x]) if c_x is not None else None,
+                        'y': coordenada(row[c_y]) if c_y is not None else None
+                    })
+
+                elif tipo == 'veiculo':
+                    dados['veiculos'].append({
+                        'id': int(row[c_id]),
+                        'tipo': sys.intern(row[c_descricao].replace('Veiculo_', '')),
+                        'capacidade_peso': float(row[coluna['capacidade_peso']]),
+                        'capacidade_volume': float(row[coluna['capacidade_vol']]),
+                        'custo': float(row[coluna['custo']]),
+                        'carga_minima': float(row[coluna['carga_minima']]),
+                        'destino': sys.intern(row[c_destino]) if c_destino is not None else None
+                    })
+
+            if not linhas_um:
+                continue
+
+            fim = n + len(linhas_um)
+            colunas = list(zip(*linhas_um))
+
+            ums['id'][n:fim] = np.asarray(colunas[c_id], dtype=np.int64)
+            ums['peso'][n:fim] = np.asarray(colunas[c_peso], dtype=np.float64)
+            ums['volume'][n:fim] = np.asarray(
+                colunas[c_volume], dtype=np.float64)
+            ums['cliente'][n:fim] = np.asarray(
+                colunas[c_cliente], dtype=np.int64)
+            ums['penalidade'][n:fim] = np.asarray(
+                colunas[c_penalidade], dtype=np.float64)
+            ums['tipo'][n:fim] = codificar_categorias(
+                tabelas['tipo'], colunas[c_descricao])
+            ums['restricao'][n:fim] = codificar_categorias(
+                tabelas['restricao'], colunas[c_restricao])
+            ums['compatibilidade'][n:fim] = codificar_categorias(
+                tabelas['compatibilidade'], [v.strip() for v in colunas[c_compat]])
+            n = fim
+
+    for campo in list(ums):
+        ums[campo] = ums[campo][:n].copy()
+
+    # Compatibilidade vazia significa "qualquer veículo", como em carregar_dados
+    todos_tipos = ",".join(str(v['tipo']) for v in dados['veiculos'])
+    categorias_compat = list(tabelas['compatibilidade'])
+    if '' in tabelas['compatibilidade']:
+        categorias_compat[tabelas['compatibilidade']['']] = todos_tipos
+
+    ids_clientes = np.array([c['id'] for c in dados['clientes']], dtype=np.int64)
+    destinos = sorted(set(c['destino'] for c in dados['clientes']))
+    codigo_destino = {d: i for i, d in enumerate(destinos)}
+    destino_clientes = np.array([codigo_destino[c['destino']]
+                                 for c in dados['clientes']], dtype=np.int32)
+
+    ums['destino'] = np.full(n, len(destinos), dtype=np.int32)
+    if len(ids_clientes):
+        ordem = np.argsort(ids_clientes)
+        pos = np.searchsorted(ids_clientes, ums['cliente'], sorter=ordem)
+        pos = np.minimum(pos, len(ids_clientes) - 1)
+        encontrado = ids_clientes[ordem[pos]] == ums['cliente']
+        ums['destino'][encontrado] = destino_clientes[ordem[pos[encontrado]]]
+
+    ums['n'] = n
+    ums['categorias'] = {
+        'tipo': list(tabelas['tipo']),
+        'restricao': list(tabelas['restricao']),
+        'compatibilidade': categorias_compat,
+        # Destino de UM cujo cliente não existe no arquivo fica vazio
+        'destino': destinos + [''],
+    }
+
+    return dados
+
+
+def expandir_ums(ums):
+    # Converte as UMs em arrays para o formato de lista de dicionários usado
+    # por criar_modelo; as strings continuam compartilhadas entre as UMs.
+
+    categorias = ums['categorias']
+
+    return [{
+        'id': int(ums['id'][k]),
+        'tipo': categorias['tipo'][ums['tipo'][k]],
+        'peso': float(ums['peso'][k]),
+        'volume': float(ums['volume'][k]),
+        'destino': categorias['destino'][ums['destino'][k]],
+        'cliente': int(ums['cliente'][k]),
+        'compatibilidade': categorias['compatibilidade'][ums['compatibilidade'][k]],
+        'restricao': categorias['restricao'][ums['restricao'][k]],
+        'penalidade': float(ums['penalidade'][k])
+    } for k in range(ums['n'])]
+
+
+def matriz_compatibilidade(ums, veiculos):
+    # Matriz booleana UMs x veículos calculada uma vez por conjunto distinto de
+    # compatibilidade, e não uma vez por par UM/veículo. Aceita tanto as UMs em
+    # arrays de carregar_dados_streaming quanto a lista de dicionários.
+
+    if isinstance(ums, dict):
+        categorias = ums['categorias']['compatibilidade']
+        codigos = ums['compatibilidade']
+    else:
+        tabela = {}
+        codigos = np.array(codificar_categorias(
+            tabela, [um['compatibilidade'] for um in ums]), dtype=np.int32)
+        categorias = list(tabela)
+
+    por_categoria = np.array([
+        [v['tipo'] in {t.strip() for t in compat.split(',')}
+         for v in veiculos]
+        for compat in categorias
+    ], dtype=bool).reshape(len(categorias), len(veiculos))
+
+    return por_categoria[codigos]
+
+
+def criar_instancia(tipo_instancia):
+
+    dados = carregar_dados(tipo_instancia)
+
+    return {
+        "veiculos": dados['veiculos'],
+        "ums": dados['ums'],
+        "clientes": dados['clientes'],
+
+    }
+
+
+def carregar_instancia(caminho_arquivo, carregamento='csv'):
+    # carregamento='streaming' lê o arquivo em blocos com carregar_dados_streaming
+    # e só então expande as UMs para a lista de dicionários do modelo, com as
+    # strings das categorias compartilhadas entre as UMs
+
+    if carregamento == 'streaming':
+        dados = carregar_dados_streaming(caminho_arquivo)
+        ums = expandir_ums(dados['ums'])
+    elif carregamento == 'csv':
+        dados = carregar_dados(caminho_arquivo)
+        ums = dados['ums']
+    else:
+        raise ValueError(f"Modo de carregamento desconhecido: {carregamento}")
+
+    return {
+        "veiculos": dados['veiculos'],
+        "ums": ums,
+        "clientes": dados['clientes'],
+        "penalidade": dados['parametros']['Penalidade por não alocação'],
+        "raiz": dados['raiz']
+    }
+
+
+def listar_instancias(pasta_instancias):
+
+    return sorted(os.path.join(pasta_instancias, f) for f in os.listdir(pasta_instancias)
+                  if f.endswith('.csv') and not f.startswith('00_'))
+
+
+def nome_instancia(caminho_arquivo):
+    return os.path.basename(caminho_arquivo).replace('.csv', '')
+
+
+def salvar_resultados(resultados, instancia, pasta_resultados):
+    # Persiste a solução antes de qualquer gráfico, para que a renderização
+    # possa acontecer depois, em outro processo ou sob demanda.
+
+    os.makedirs(pasta_resultados, exist_ok=True)
+    caminho = os.path.join(
+        pasta_resultados, f"{resultados['tipo_instancia']}_resultados.json")
+
+    with open(caminho, mode='w', encoding='utf-8') as file:
+        json.dump({'resultados': resultados, 'instancia': instancia},
+                  file, ensure_ascii=False)
+
+    return caminho
+
+
+def carregar_resultados(caminho):
+
+    with open(caminho, mode='r', encoding='utf-8') as file:
+        salvo = json.load(file)
+
+    return salvo['resultados'], salvo['instancia']
@@ -0,0 +1,414 @@
+import time
+
+import numpy as np
+
+from .heuristics import custo_atribuicao
+from .io import matriz_compatibilidade
+from .mochila import mochila_veiculo
+from .preprocess import preprocessar_instancia
+
+# Relaxação lagrangiana de alocacao_unica_: com os multiplicadores lambda_i
+# o modelo de criar_modelo se separa em um problema por veículo,
+#
+#   min (capacidade + custo) * alpha - soma_i (peso_i * (penalidade_i + 1) - lambda_i) * z_i
+#
+# com z_i <= alpha, capacidades de peso e volume e carga mínima. Cada
+# subproblema vale 0 (veículo inativo) ou (capacidade + custo) menos uma
+# mochila. O limite usa, para a mochila, o limite de Dantzig da restrição
+# substituta
+#
+#   theta_v * peso / capacidade_peso + (1 - theta_v) * volume / capacidade_volume <= 1
+#
+# (ignorando a carga mínima), que continua sendo um limite superior da
+# mochila e, portanto, mantém o limite inferior válido. Com theta fixo a
+# função dual é côncava em lambda; com o menor dos limites por peso e por
+# volume não é, e o subgradiente parava no lado do peso quando quem limita
+# os veículos é o volume. theta começa na dimensão que as UMs elegíveis mais
+# ocupam e, a cada redução do passo, é reajustado nos melhores
+# multiplicadores para a mochila mais justa.
+
+ITERACOES_LAGRANGEANO = None  # sem limite: param o tempo, o gap ou as duas fases
+TEMPO_LIMITE_LAGRANGEANO = 60
+PASSO_INICIAL = 2.0
+PACIENCIA_PASSO = 20  # iterações sem melhorar o limite antes de reduzir o passo
+PASSO_MINIMO = 1e-4
+FOLGA_ALVO = 0.05  # alvo de Polyak: melhor limite + FOLGA_ALVO * gap
+REPARO_A_CADA = 10
+PASSOS_THETA = 20
+TOLERANCIA_GAP = 1e-4
+
+
+def dados_relaxacao(instancia):
+    # Arrays da instância usados pelo limite e pelo reparo
+
+    ums = instancia["ums"]
+    veiculos = instancia["veiculos"]
+
+    peso = np.array([um["peso"] for um in ums], dtype=float)
+    volume = np.array([um["volume"] for um in ums], dtype=float)
+    penalidade = np.array([um["penalidade"] for um in ums], dtype=float)
+    cap_peso = np.array([v["capacidade_peso"] for v in veiculos], dtype=float)
+    cap_volume = np.array([v["capacidade_volume"] for v in veiculos], dtype=float)
+
+    regioes_com_clientes = {c["destino"] for c in instancia["clientes"]}
+    com_clientes = np.array([v["destino"] in regioes_com_clientes for v in veiculos],
+                            dtype=bool)
+
+    elegivel = (matriz_compatibilidade(ums, veiculos)
+                & (peso[:, None] <= cap_peso[None, :])
+                & (volume[:, None] <= cap_volume[None, :])
+                & com_clientes[None, :])
+
+    beta_v = 1
+    return {
+        'peso': peso,
+        'volume': volume,
+        'lucro': peso * (penalidade + beta_v),
+        'constante': float(np.sum(peso * penalidade)),
+        'cap_peso': cap_peso,
+        'cap_volume': cap_volume,
+        'carga_minima': np.array([v["carga_minima"] for v in veiculos], dtype=float),
+        'custo_ativacao': np.array([v["custo"] + beta_v * v["capacidade_peso"]
+                                    for v in veiculos], dtype=float),
+        'elegivel': elegivel,
+    }
+
+
+def sem_alocacao(instancia, preprocessamento, inicio):
+    # Instância reduzida sem UMs ou sem veículos: não alocar nada é ótimo e o
+    # custo dessa solução é também o limite inferior
+    custo = custo_atribuicao(instancia, {})
+    return {
+        'limite_inferior': float(custo),
+        'custo': float(custo),
+        'atribuicao': {},
+        'gap': 0.0,
+        'iteracoes': 0,
+        'parada': 'gap',
+        'tempo': time.perf_counter() - inicio,
+        'preprocessamento': preprocessamento,
+    }
+
+
+def limite_mochila_fracionaria(lucro, tamanho, elegivel, capacidade):
+    # Limite de Dantzig de todas as mochilas de uma vez: como o lucro de um
+    # item não depende do veículo, a ordem por lucro/tamanho é a mesma em
+    # todas; cada coluna de elegivel é uma mochila. Retorna o valor de cada
+    # mochila e a fração de cada item em cada uma.
+
+    razao = np.divide(lucro, tamanho, out=np.full_like(lucro, np.inf), where=tamanho > 0)
+    ordem = np.argsort(-razao, kind='stable')
+
+    usar = elegivel[ordem] & (lucro[ordem] > 0)[:, None]
+    ocupado = np.where(usar, tamanho[ordem][:, None], 0.0)
+    antes = np.cumsum(ocupado, axis=0) - ocupado
+
+    fracao = np.where(ocupado > 0,
+                      np.clip((capacidade[None, :] - antes) / np.where(ocupado > 0, ocupado, 1), 0, 1),
+                      1.0) * usar
+
+    valor = fracao.T @ lucro[ordem]
+
+    z = np.empty_like(fracao)
+    z[ordem] = fracao
+
+    return valor, z
+
+
+def limite_mochila_substituta(dados, lucro, theta):
+    # Limite de Dantzig de cada veículo para a restrição substituta de peso
+    # e volume com o seu theta: o tamanho de um item muda de veículo para
+    # veículo, então cada coluna tem a sua ordem
+
+    tamanho = (theta[None, :] * dados['peso'][:, None] / np.maximum(dados['cap_peso'], 1e-9)
+               + (1 - theta[None, :]) * dados['volume'][:, None]
+               / np.maximum(dados['cap_volume'], 1e-9))
+
+    usar = dados['elegivel'] & (lucro > 0)[:, None]
+    razao = np.where(usar, lucro[:, None] / np.maximum(tamanho, 1e-12), -np.inf)
+    ordem = np.argsort(-razao, axis=0, kind='stable')
+
+    usar = np.take_along_axis(usar, ordem, axis=0)
+    ocupado = np.where(usar, np.take_along_axis(tamanho, ordem, axis=0), 0.0)
+    antes = np.cumsum(ocupado, axis=0) - ocupado
+
+    fracao = np.where(ocupado > 0,
+                      np.clip((1 - antes) / np.where(ocupado > 0, ocupado, 1), 0, 1),
+                      1.0) * usar
+
+    valor = (fracao * lucro[ordem]).sum(axis=0)
+
+    z = np.empty_like(fracao)
+    np.put_along_axis(z, ordem, fracao, axis=0)
+
+    return valor, z
+
+
+def theta_inicial(dados):
+    # 1 (peso) ou 0 (volume): a dimensão que as UMs elegíveis mais ocupam
+    # em relação à capacidade de cada veículo
+    peso = dados['peso'] @ dados['elegivel'] / np.maximum(dados['cap_peso'], 1e-9)
+    volume = dados['volume'] @ dados['elegivel'] / np.maximum(dados['cap_volume'], 1e-9)
+    return (peso > volume).astype(float)
+
+
+def ajustar_theta(dados, lucro, theta):
+    # Seção áurea em theta, por veículo, da mochila substituta (o limite é
+    # quase-convexo em theta); fica o theta atual onde ele já é melhor
+
+    razao = (np.sqrt(5) - 1) / 2
+    a, b = np.zeros_like(theta), np.ones_like(theta)
+    c, d = b - razao * (b - a), a + razao * (b - a)
+    valor_c, _ = limite_mochila_substituta(dados, lucro, c)
+    valor_d, _ = limite_mochila_substituta(dados, lucro, d)
+
+    for _ in range(PASSOS_THETA):
+        esquerda = valor_c < valor_d
+        a, b = np.where(esquerda, a, c), np.where(esquerda, d, b)
+        c, d = b - razao * (b - a), a + razao * (b - a)
+        valor_c, _ = limite_mochila_substituta(dados, lucro, c)
+        valor_d, _ = limite_mochila_substituta(dados, lucro, d)
+
+    novo = (a + b) / 2
+    valor_novo, _ = limite_mochila_substituta(dados, lucro, novo)
+    valor_atual, _ = limite_mochila_substituta(dados, lucro, theta)
+    return np.where(valor_novo < valor_atual, novo, theta)
+
+
+def limite_lagrangeano(dados, multiplicadores, theta):
+    # Valor da função dual em lambda e um subgradiente
+
+    lucro = dados['lucro'] - multiplicadores
+    mochila, z = limite_mochila_substituta(dados, lucro, theta)
+
+    ativo = mochila > dados['custo_ativacao']
+    limite = (dados['constante'] - multiplicadores.sum()
+              + np.sum(np.where(ativo, dados['custo_ativacao'] - mochila, 0.0)))
+
+    subgradiente = (z * ativo[None, :]).sum(axis=1) - 1
+
+    return limite, subgradiente
+
+
+def _prefixo_que_cabe(ordem, peso, volume, cap_peso, cap_volume):
+    # Maior prefixo de ordem que cabe em peso e volume
+    cabe = ((np.cumsum(peso[ordem]) <= cap_peso)
+            & (np.cumsum(volume[ordem]) <= cap_volume))
+    return ordem[:np.argmin(cabe)] if not cabe.all() else ordem
+
+
+def _encher_veiculo(dados, j, ordens, livre):
+    # Enche o veículo j com as UMs livres e elegíveis em cada uma das ordens
+    # de lucro dadas e fica com a de maior ganho real. Cada ordem é percorrida
+    # em duas passadas vetorizadas: o maior prefixo que cabe e, no espaço que
+    # sobra, o maior prefixo das UMs restantes que ainda cabem sozinhas.
+
+    peso, volume = dados['peso'], dados['volume']
+    cap_peso, cap_volume = dados['cap_peso'][j], dados['cap_volume'][j]
+
+    melhor_carga, melhor_ganho = [], -np.inf
+    for ordem in ordens:
+        ordem = ordem[dados['elegivel'][ordem, j] & livre[ordem]]
+
+        carga = _prefixo_que_cabe(ordem, peso, volume, cap_peso, cap_volume)
+        resto = ordem[len(carga):]
+        sobra_peso = cap_peso - peso[carga].sum()
+        sobra_volume = cap_volume - volume[carga].sum()
+        resto = resto[(peso[resto] <= sobra_peso) & (volume[resto] <= sobra_volume)]
+        carga = np.concatenate([carga, _prefixo_que_cabe(
+            resto, peso, volume, sobra_peso, sobra_volume)])
+
+        if len(carga) and peso[carga].sum() >= dados['carga_minima'][j]:
+            ganho = dados['lucro'][carga].sum() - dados['custo_ativacao'][j]
+            if ganho > melhor_ganho:
+                melhor_carga, melhor_ganho = carga, ganho
+
+    return melhor_carga, melhor_ganho
+
+
+def reparar(instancia, dados, multiplicadores):
+    # Solução viável guiada pelos multiplicadores: cada veículo é enchido com
+    # as UMs livres de maior lucro ajustado (peso * (penalidade + 1) - lambda)
+    # e, a cada passo, ativa-se o veículo de maior ganho real (penalidade e
+    # frete morto evitados menos a ativação), enquanto houver ganho positivo
+    # com a carga mínima atendida.
+    #
+    # As ordens são por lucro por kg (igual para todos os veículos) e por
+    # lucro por ocupação relativa de peso + volume, que considera a dimensão
+    # que de fato limita o veículo e só depende do par de capacidades.
+
+    ums = instancia["ums"]
+    veiculos = instancia["veiculos"]
+    peso, volume = dados['peso'], dados['volume']
+
+    lucro = dados['lucro'] - multiplicadores
+    por_kg = np.argsort(-lucro / np.maximum(peso, 1e-9), kind='stable')
+
+    por_ocupacao = {}
+    for j in range(len(veiculos)):
+        capacidades = (dados['cap_peso'][j], dados['cap_volume'][j])
+        if capacidades not in por_ocupacao:
+            ocupacao = (peso / max(capacidades[0], 1e-9)
+                        + volume / max(capacidades[1], 1e-9))
+            por_ocupacao[capacidades] = np.argsort(
+                -lucro / np.maximum(ocupacao, 1e-9), kind='stable')
+
+    livre = np.ones(len(ums), dtype=bool)
+    disponiveis = set(range(len(veiculos)))
+
+    atribuicao = {}
+    while disponiveis:
+        melhor_ganho, melhor_j, melhor_carga = 0.0, None, None
+        for j in disponiveis:
+            ordens = (por_kg, por_ocupacao[(dados['cap_peso'][j], dados['cap_volume'][j])])
+            carga, ganho = _encher_veiculo(dados, j, ordens, livre)
+            if ganho > melhor_ganho:
+                melhor_ganho, melhor_j, melhor_carga = ganho, j, carga
+
+        if melhor_j is None:
+            break
+
+        # A carga do veículo escolhido é refeita pela mochila com núcleo
+        # exato (no lucro real) e fica a melhor das duas. Só ele: fazer isso
+        # para todos a cada passo custaria O(veículos²) mochilas
+        carga, ganho = mochila_veiculo(dados, melhor_j, livre=livre, metodo='aproximado')
+        if ganho > melhor_ganho:
+            melhor_carga = carga
+
+        disponiveis.remove(melhor_j)
+        livre[melhor_carga] = False
+        for k in melhor_carga:
+            atribuicao[ums[k]["id"]] = veiculos[melhor_j]["id"]
+
+    return atribuicao
+
+
+def resolver_lagrangeano(instancia, iteracoes=ITERACOES_LAGRANGEANO,
+                         tempo_limite=TEMPO_LIMITE_LAGRANGEANO, tolerancia_gap=TOLERANCIA_GAP,
+                         cancelar=None):
+    # Subgradiente com passo de Polyak em duas fases, cada uma a partir do
+    # meio do lucro de cada UM:
+    #
+    #   limite  restrição substituta, com theta reajustado a cada redução do
+    #           passo; um reparo no fim, nos melhores multiplicadores
+    #   reparo  só peso (theta = 1), com reparo a cada REPARO_A_CADA
+    #           iterações: o frete morto cobra a capacidade de peso não
+    #           usada, e esses multiplicadores guiam melhor o reparo que os
+    #           do limite, em que o volume é que limita a mochila
+    #
+    # O alvo do passo fica FOLGA_ALVO do gap acima do melhor valor da fase;
+    # depois de PACIENCIA_PASSO iterações sem melhora, o passo cai à metade
+    # e a busca volta aos melhores multiplicadores da fase. Uma fase termina
+    # com o passo abaixo de PASSO_MINIMO ou o subgradiente nulo. Retorna o
+    # melhor limite inferior das duas fases, a melhor atribuição
+    # {UM: veículo} encontrada e o custo dela no objetivo de criar_modelo.
+    # parada é o motivo do fim: 'gap', 'norma' (subgradiente nulo), 'passo'
+    # (passo abaixo de PASSO_MINIMO), 'tempo', 'iteracoes' (só com um número
+    # de iterações dado) ou 'cancelada' (cancelar, se dado, é consultado a
+    # cada iteração).
+
+    inicio = time.perf_counter()
+
+    reduzida, preprocessamento = preprocessar_instancia(instancia)
+    if not reduzida["ums"] or not reduzida["veiculos"]:
+        return sem_alocacao(instancia, preprocessamento, inicio)
+
+    dados = dados_relaxacao(reduzida)
+    custo_fixo = preprocessamento['custo_fixo']
+
+    # (theta inicial, reajustar theta, reparar a cada)
+    fases = [
+        (theta_inicial(dados), True, None),
+        (np.ones(len(reduzida["veiculos"])), False, REPARO_A_CADA),
+    ]
+
+    melhor_limite = -np.inf
+    melhor_atribuicao = {}
+    melhor_custo = custo_atribuicao(instancia, melhor_atribuicao)
+
+    def tentar_reparo(multiplicadores):
+        nonlocal melhor_custo, melhor_atribuicao
+        atribuicao = reparar(reduzida, dados, multiplicadores)
+        custo = custo_atribuicao(instancia, atribuicao)
+        if custo < melhor_custo:
+            melhor_custo = custo
+            melhor_atribuicao = atribuicao
+
+    iteracao = 0
+    parada = None
+
+    for theta, reajustar, reparo_a_cada in fases:
+        # Começar do meio do lucro de cada UM converge mais rápido que do
+        # zero, em que todo veículo quer todas as UMs
+        multiplicadores = dados['lucro'] / 2
+        melhores_multiplicadores = multiplicadores
+        melhor_fase = -np.inf
+        passo = PASSO_INICIAL
+        sem_melhora = 0
+        iteracao_fase = 0
+
+        while True:
+            iteracao += 1
+            iteracao_fase += 1
+            limite, subgradiente = limite_lagrangeano(dados, multiplicadores, theta)
+            limite += custo_fixo
+
+            if limite > melhor_fase + 1e-9:
+                melhor_fase = limite
+                melhores_multiplicadores = multiplicadores
+                sem_melhora = 0
+            else:
+                sem_melhora += 1
+                if sem_melhora >= PACIENCIA_PASSO:
+                    passo /= 2
+                    sem_melhora = 0
+                    multiplicadores = melhores_multiplicadores
+                    if reajustar:
+                        theta = ajustar_theta(dados, dados['lucro'] - multiplicadores, theta)
+                    limite, subgradiente = limite_lagrangeano(dados, multiplicadores, theta)
+                    limite += custo_fixo
+                    melhor_fase = max(melhor_fase, limite)
+            melhor_limite = max(melhor_limite, melhor_fase)
+
+            if reparo_a_cada and (iteracao_fase == 1 or iteracao_fase % reparo_a_cada == 0):
+                tentar_reparo(multiplicadores)
+
+            # lambda >= 0: componentes presas em zero com subgradiente
+            # negativo não se movem e ficam fora da norma do passo
+            direcao = np.where((multiplicadores <= 0) & (subgradiente < 0), 0.0, subgradiente)
+            norma = direcao @ direcao
+
+            if melhor_custo - melhor_limite <= tolerancia_gap * max(abs(melhor_custo), 1e-9):
+                parada = 'gap'
+            elif time.perf_counter() - inicio > tempo_limite:
+                parada = 'tempo'
+            elif cancelar is not None and cancelar():
+                parada = 'cancelada'
+            elif iteracoes is not None and iteracao >= iteracoes:
+                parada = 'iteracoes'
+            if parada:
+                break
+
+            if norma == 0 or passo < PASSO_MINIMO:
+                parada_fase = 'norma' if norma == 0 else 'passo'
+                break
+
+            alvo = melhor_fase + FOLGA_ALVO * (melhor_custo - melhor_fase)
+            multiplicadores = np.maximum(
+                0.0, multiplicadores + passo * (alvo - limite) / norma * direcao)
+
+        if not reparo_a_cada:
+            tentar_reparo(melhores_multiplicadores)
+        if parada:
+            break
+
+    return {
+        'limite_inferior': float(melhor_limite),
+        'custo': float(melhor_custo),
+        'atribuicao': melhor_atribuicao,
+        'gap': float((melhor_custo - melhor_limite) / abs(melhor_custo)) if melhor_custo else 0.0,
+        'iteracoes': iteracao,
+        'parada': parada or parada_fase,
+        'tempo': time.perf_counter() - inicio,
+        'preprocessamento': preprocessamento,
+    }
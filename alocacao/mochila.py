@@ -0,0 +1,284 @@
+import math
+
+import numpy as np
+
+# Mochila com duas restrições (peso e volume) e carga mínima: quais UMs vão
+# em um veículo. É o núcleo do subproblema de cada veículo na relaxação
+# lagrangiana e no reparo, e serve a qualquer heurística que encha veículos.
+#
+# - exato: programação dinâmica sobre a tabela peso x volume. Com
+#   capacidades grandes os tamanhos são escalados para a tabela caber em
+#   CELULAS_DP; arredondando os tamanhos para cima e as capacidades para
+#   baixo toda solução da tabela é viável (e é ótima quando a escala não
+#   arredonda nada). Com arredondamento='relaxado' é o contrário (tamanhos
+#   para baixo, capacidades para cima) e o valor é um limite superior.
+# - aproximado: ordem gulosa da restrição substituta; as UMs antes
+#   do núcleo em volta do item de quebra ficam fixas e o núcleo é resolvido
+#   pela programação dinâmica com a capacidade que sobra.
+# - auto: exato quando itens x células cabem em OPERACOES_DP_AUTO.
+
+CELULAS_DP = 250_000
+CELULAS_NUCLEO = 60_000
+ITENS_NUCLEO = 20  # de cada lado do item de quebra
+OPERACOES_DP_AUTO = 50_000_000
+TENTATIVAS_CARGA_MINIMA = 100
+LINHAS_MINIMAS = 200
+PONTOS_SUBSTITUTA = 11  # valores de theta testados na ordem gulosa
+
+
+def _escalas(cap_peso, cap_volume, celulas):
+    # Unidade de cada dimensão da tabela, nunca menor que 1 kg / 0,1 m³, a
+    # resolução dos dados. A dimensão que precisa de menos posições (o
+    # volume, nas instâncias do gerador) fica sem arredondamento enquanto
+    # sobrarem ao menos LINHAS_MINIMAS posições para a outra, que leva o
+    # restante das células.
+    minimas = [1.0, 0.1]
+    capacidades = [max(cap_peso, 0.0), max(cap_volume, 0.0)]
+    necessarias = [c / u + 1 for c, u in zip(capacidades, minimas)]
+
+    if necessarias[0] * necessarias[1] <= celulas:
+        return minimas[0], minimas[1]
+
+    menor = 0 if necessarias[0] < necessarias[1] else 1
+    linhas = [0.0, 0.0]
+    linhas[menor] = min(necessarias[menor], max(celulas / LINHAS_MINIMAS, math.sqrt(celulas)))
+    linhas[1 - menor] = celulas / linhas[menor]
+
+    return tuple(max(u, c / max(n - 1, 1)) for u, c, n in zip(minimas, capacidades, linhas))
+
+
+def _programacao_dinamica(lucro, peso, volume, cap_peso, cap_volume, carga_minima,
+                          celulas, arredondamento):
+
+    unidade_peso, unidade_volume = _escalas(cap_peso, cap_volume, celulas)
+
+    # Relaxar também a carga mínima mantém o valor um limite superior
+    if arredondamento == 'relaxado':
+        carga_minima = 0.0
+
+    if arredondamento == 'relaxado':
+        tam_peso = np.floor(peso / unidade_peso + 1e-9).astype(int)
+        tam_volume = np.floor(volume / unidade_volume + 1e-9).astype(int)
+        linhas = int(math.ceil(cap_peso / unidade_peso - 1e-9)) + 1
+        colunas = int(math.ceil(cap_volume / unidade_volume - 1e-9)) + 1
+    else:
+        tam_peso = np.ceil(peso / unidade_peso - 1e-9).astype(int)
+        tam_volume = np.ceil(volume / unidade_volume - 1e-9).astype(int)
+        linhas = int(math.floor(cap_peso / unidade_peso + 1e-9)) + 1
+        colunas = int(math.floor(cap_volume / unidade_volume + 1e-9)) + 1
+
+    exato = (np.allclose(tam_peso * unidade_peso, peso)
+             and np.allclose(tam_volume * unidade_volume, volume))
+
+    # Itens de lucro não positivo só servem para alcançar a carga mínima,
+    # itens que não cabem nem sozinhos nunca entram e itens de tamanho zero
+    # entram sempre que têm lucro
+    uteis = (lucro > 0) | (carga_minima > 0)
+    cabe = uteis & (tam_peso < linhas) & (tam_volume < colunas)
+    tamanho_zero = (tam_peso == 0) & (tam_volume == 0)
+    gratis = cabe & tamanho_zero & (lucro > 0)
+    itens = np.flatnonzero(cabe & ~tamanho_zero)
+
+    # melhor[w, v]: maior lucro com tamanhos somando exatamente (w, v); a
+    # decisão de cada item fica compactada em bits para a reconstrução
+    melhor = np.full((linhas, colunas), -np.inf)
+    melhor[0, 0] = 0.0
+    decisoes = []
+    for k in itens:
+        pw, pv = tam_peso[k], tam_volume[k]
+        candidato = melhor[:linhas - pw, :colunas - pv] + lucro[k]
+        pega = candidato > melhor[pw:, pv:]
+        melhor[pw:, pv:] = np.where(pega, candidato, melhor[pw:, pv:])
+        decisoes.append((pw, pv, np.packbits(pega, axis=None)))
+
+    def reconstruir(w, v):
+        selecionados = []
+        for k, (pw, pv, bits) in zip(itens[::-1], decisoes[::-1]):
+            if w < pw or v < pv:
+                continue
+            posicao = (w - pw) * (colunas - pv) + (v - pv)
+            if bits[posicao >> 3] >> (7 - (posicao & 7)) & 1:
+                selecionados.append(k)
+                w -= pw
+                v -= pv
+        return selecionados
+
+    # Com tamanhos arredondados para cima o peso real de uma célula nunca
+    # passa de linha * unidade, então as linhas abaixo da carga mínima não
+    # servem (sem arredondamento a linha é o próprio peso). A folga real que
+    # sobra é completada com as UMs que ainda cabem e a carga mínima é
+    # conferida com os pesos reais, da melhor célula para a pior.
+    base = np.flatnonzero(gratis)
+    ordem_itens = _ordem_eficiencia(lucro, peso, volume, cap_peso, cap_volume)
+    melhor[:max(0, int(math.ceil(carga_minima / unidade_peso - 1e-9)))] = -np.inf
+    ordem = np.argsort(-melhor, axis=None, kind='stable')
+    for posicao in ordem[:TENTATIVAS_CARGA_MINIMA]:
+        w, v = divmod(int(posicao), colunas)
+        if melhor[w, v] == -np.inf:
+            break
+        selecionados = np.concatenate([base, np.array(reconstruir(w, v), dtype=int)])
+        if not exato and arredondamento != 'relaxado':
+            selecionados = _completar(lucro, peso, volume, cap_peso, cap_volume,
+                                      selecionados, ordem_itens)
+            selecionados = _completar_carga_minima(lucro, peso, volume, cap_peso, cap_volume,
+                                                   carga_minima, selecionados)
+        if peso[selecionados].sum() >= carga_minima:
+            return selecionados.astype(int), exato
+
+    return np.array([], dtype=int), exato
+
+
+def _ordem_eficiencia(lucro, peso, volume, cap_peso, cap_volume):
+    # UMs de lucro positivo por lucro por ocupação da restrição substituta
+    # theta * peso / cap_peso + (1 - theta) * volume / cap_volume <= 1. O
+    # theta da grade é o de menor limite de Dantzig, ou seja, o que melhor
+    # representa qual das duas capacidades de fato limita a carga.
+    positivas = np.flatnonzero(lucro > 0)
+    ocupacao_peso = peso[positivas] / max(cap_peso, 1e-9)
+    ocupacao_volume = volume[positivas] / max(cap_volume, 1e-9)
+
+    melhor_limite, melhor_ordem = np.inf, positivas
+    for theta in np.linspace(0, 1, PONTOS_SUBSTITUTA):
+        ocupacao = np.maximum(theta * ocupacao_peso + (1 - theta) * ocupacao_volume, 1e-12)
+        ordem = np.argsort(-lucro[positivas] / ocupacao, kind='stable')
+
+        acumulada = np.cumsum(ocupacao[ordem])
+        cheios = int(np.searchsorted(acumulada, 1.0, side='right'))
+        limite = lucro[positivas][ordem[:cheios]].sum()
+        if cheios < len(ordem):
+            sobra = 1.0 - (acumulada[cheios - 1] if cheios else 0.0)
+            limite += lucro[positivas][ordem[cheios]] * sobra / ocupacao[ordem[cheios]]
+
+        if limite < melhor_limite:
+            melhor_limite, melhor_ordem = limite, positivas[ordem]
+
+    return melhor_ordem
+
+
+def _completar(lucro, peso, volume, cap_peso, cap_volume, selecionados, ordem):
+    # Acrescenta, na ordem dada, toda UM ainda não escolhida que cabe
+    escolhida = np.zeros(len(lucro), dtype=bool)
+    escolhida[selecionados] = True
+    livre_peso = cap_peso - peso[selecionados].sum()
+    livre_volume = cap_volume - volume[selecionados].sum()
+
+    # Só as que cabem sozinhas na folga são candidatas
+    ordem = ordem[~escolhida[ordem] & (peso[ordem] <= livre_peso)
+                  & (volume[ordem] <= livre_volume)]
+
+    extras = []
+    for k in ordem:
+        if peso[k] <= livre_peso and volume[k] <= livre_volume:
+            extras.append(k)
+            livre_peso -= peso[k]
+            livre_volume -= volume[k]
+
+    return np.concatenate([selecionados, np.array(extras, dtype=int)]).astype(int)
+
+
+def _completar_carga_minima(lucro, peso, volume, cap_peso, cap_volume, carga_minima,
+                            selecionados):
+    # Se a carga ficou abaixo da mínima, acrescenta UMs de lucro não
+    # positivo, das que menos perdem por kg, enquanto couberem
+    if peso[selecionados].sum() >= carga_minima:
+        return selecionados
+
+    escolhida = np.zeros(len(lucro), dtype=bool)
+    escolhida[selecionados] = True
+    restantes = np.flatnonzero(~escolhida & (lucro <= 0) & (peso > 0))
+    ordem = restantes[np.argsort(-lucro[restantes] / peso[restantes], kind='stable')]
+
+    extras = []
+    carga = peso[selecionados].sum()
+    livre_peso, livre_volume = cap_peso - carga, cap_volume - volume[selecionados].sum()
+    for k in ordem:
+        if carga >= carga_minima:
+            break
+        if peso[k] <= livre_peso and volume[k] <= livre_volume:
+            extras.append(k)
+            carga += peso[k]
+            livre_peso -= peso[k]
+            livre_volume -= volume[k]
+
+    return np.concatenate([selecionados, np.array(extras, dtype=int)]).astype(int)
+
+
+def _aproximada(lucro, peso, volume, cap_peso, cap_volume, carga_minima):
+    ordem = _ordem_eficiencia(lucro, peso, volume, cap_peso, cap_volume)
+
+    cabe = ((np.cumsum(peso[ordem]) <= cap_peso)
+            & (np.cumsum(volume[ordem]) <= cap_volume))
+    quebra = len(ordem) if cabe.all() else int(np.argmin(cabe))
+
+    fixos = ordem[:max(0, quebra - ITENS_NUCLEO)]
+    nucleo = ordem[len(fixos):quebra + ITENS_NUCLEO]
+
+    candidatos = [_completar(lucro, peso, volume, cap_peso, cap_volume,
+                             np.array([], dtype=int), ordem)]
+
+    livre_peso = cap_peso - peso[fixos].sum()
+    livre_volume = cap_volume - volume[fixos].sum()
+    escolhidos, _ = _programacao_dinamica(
+        lucro[nucleo], peso[nucleo], volume[nucleo], livre_peso, livre_volume,
+        carga_minima - peso[fixos].sum(), CELULAS_NUCLEO, 'viavel')
+    candidatos.append(_completar(lucro, peso, volume, cap_peso, cap_volume,
+                                 np.concatenate([fixos, nucleo[escolhidos]]), ordem))
+
+    candidatos = [_completar_carga_minima(lucro, peso, volume, cap_peso, cap_volume,
+                                          carga_minima, c) for c in candidatos]
+    viaveis = [c for c in candidatos if peso[c].sum() >= carga_minima]
+    if not viaveis:
+        return np.array([], dtype=int)
+    return max(viaveis, key=lambda c: lucro[c].sum())
+
+
+def resolver_mochila(lucro, peso, volume, cap_peso, cap_volume, carga_minima=0.0,
+                     metodo='auto', arredondamento='viavel'):
+    # Maximiza a soma de lucro das UMs escolhidas com peso e volume dentro
+    # das capacidades e peso total >= carga_minima. Retorna {'itens': índices
+    # escolhidos, 'valor': soma do lucro, 'exato': se o valor é o ótimo}.
+    # Sem carga viável, itens vem vazio e valor é 0.
+
+    lucro = np.asarray(lucro, dtype=float)
+    peso = np.asarray(peso, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+
+    if metodo == 'auto':
+        unidade_peso, unidade_volume = _escalas(cap_peso, cap_volume, CELULAS_DP)
+        celulas = (cap_peso / unidade_peso + 1) * (cap_volume / unidade_volume + 1)
+        itens = len(lucro) if carga_minima > 0 else np.count_nonzero(lucro > 0)
+        metodo = ('exato' if itens * celulas <= OPERACOES_DP_AUTO
+                  else 'aproximado')
+
+    if metodo == 'exato':
+        itens, exato = _programacao_dinamica(lucro, peso, volume, cap_peso, cap_volume,
+                                             carga_minima, CELULAS_DP, arredondamento)
+    elif metodo == 'aproximado':
+        itens, exato = _aproximada(lucro, peso, volume, cap_peso, cap_volume, carga_minima), False
+    else:
+        raise ValueError(f"Método de mochila desconhecido: {metodo}")
+
+    return {'itens': itens, 'valor': float(lucro[itens].sum()), 'exato': exato}
+
+
+def mochila_veiculo(dados, j, lucro=None, livre=None, metodo='auto'):
+    # Subproblema do veículo j sobre os arrays de dados_relaxacao (ou de
+    # qualquer dicionário com as mesmas chaves): só UMs elegíveis e livres,
+    # com o lucro dado (padrão: peso * (penalidade + 1)). Retorna os índices
+    # das UMs na instância e o ganho de ativar o veículo com elas.
+
+    lucro = dados['lucro'] if lucro is None else lucro
+    candidatas = dados['elegivel'][:, j]
+    if livre is not None:
+        candidatas = candidatas & livre
+    candidatas = np.flatnonzero(candidatas)
+
+    resultado = resolver_mochila(
+        lucro[candidatas], dados['peso'][candidatas], dados['volume'][candidatas],
+        dados['cap_peso'][j], dados['cap_volume'][j], dados['carga_minima'][j], metodo)
+
+    itens = candidatas[resultado['itens']]
+    if not len(itens):
+        return itens, -np.inf
+
+    return itens, resultado['valor'] - dados['custo_ativacao'][j]
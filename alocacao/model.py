@@ -0,0 +1,141 @@
+from collections import defaultdict
+
+import gurobipy as gp
+from gurobipy import GRB
+
+# Incrementar a cada mudança na formulação: invalida os modelos em cache
+VERSAO_FORMULACAO = 1
+
+
+def criar_modelo(instancia, env=None):
+    # env: ambiente do Gurobi já iniciado, para não abrir um por modelo
+
+    model = gp.Model("AlocacaoCargas", env=env)
+
+    veiculos = instancia["veiculos"]
+    ums = instancia["ums"]
+    clientes = instancia["clientes"]
+
+    destino_para_clientes = defaultdict(list)
+    for cliente in clientes:
+        destino_para_clientes[cliente['destino']].append(cliente['nome'])
+
+    delta = {}
+    for v in veiculos:
+        for c in clientes:
+
+            delta[(c['id'], v['id'])] = 1 if v['destino'] == c['destino'] else 0
+
+    x = {}
+    y = {}
+    alpha = {}
+
+    beta_v = 1
+
+    frete_morto_por_veiculo = {}
+
+    for i in ums:
+        for v in veiculos:
+            for c in clientes:
+                x[(i["id"], v["id"], c["id"])] = model.addVar(vtype=GRB.BINARY,
+
+                                                              name=f"x_{i['id']}_{v['id']}_{c['id']}")
+
+    for v in veiculos:
+
+        alpha[v["id"]] = model.addVar(
+            vtype=GRB.BINARY, name=f"alpha_{v['id']}")
+
+        for c in clientes:
+
+            y[(v["id"], c["id"])] = model.addVar(
+                vtype=GRB.BINARY, name=f"y_{v['id']}_{c['id']}")
+
+    custo_nao_alocacao = gp.quicksum(
+
+        i["peso"] * i["penalidade"] *
+
+        (1 - gp.quicksum(x[(i["id"], v["id"], c["id"])]
+         for v in veiculos for c in clientes))
+        for i in ums
+    )
+
+    custo_frete_morto = gp.quicksum(beta_v * (v["capacidade_peso"] * alpha[v["id"]] -
+                                              gp.quicksum(i["peso"] * x[(i["id"], v["id"], c["id"])]
+                                                          for i in ums for c in clientes))
+                                    for v in veiculos
+                                    )
+
+    custo_transporte = gp.quicksum(
+        v["custo"] * alpha[v["id"]]
+        for v in veiculos
+    )
+
+    model.setObjective(custo_nao_alocacao +
+                       custo_frete_morto + custo_transporte, GRB.MINIMIZE)
+
+    for v in veiculos:
+
+        model.addConstr(
+            gp.quicksum(i["peso"] * x[(i["id"], v["id"], c["id"])]
+                        for i in ums for c in clientes) <= v["capacidade_peso"],
+            name=f"cap_peso_{v['id']}"
+        )
+
+        model.addConstr(
+            gp.quicksum(i["volume"] * x[(i["id"], v["id"], c["id"])]
+                        for i in ums for c in clientes) <= v["capacidade_volume"],
+            name=f"cap_vol_{v['id']}"
+        )
+
+        model.addConstr(gp.quicksum(i["peso"] * x[(i["id"], v["id"], c["id"])]
+                                    for i in ums for c in clientes) >= alpha[v["id"]] * v["carga_minima"],
+                        name=f"frete_morto_minimo_{v['id']}"
+                        )
+
+        for c in clientes:
+            model.addConstr(
+                alpha[v["id"]] >= y[(v["id"], c["id"])],
+                name=f"ativacao_{v['id']}_{c['id']}"
+            )
+
+    for i in ums:
+
+        model.addConstr(
+            gp.quicksum(x[(i["id"], v["id"], c["id"])]
+                        for v in veiculos for c in clientes) <= 1,
+            name=f"alocacao_unica_{i['id']}"
+        )
+
+        for v in veiculos:
+            for c in clientes:
+
+                veiculos_compatíveis = [vc.strip()
+                                        for vc in i['compatibilidade'].split(',')]
+
+                gamma = 1 if v['tipo'] in veiculos_compatíveis else 0
+                model.addConstr(
+                    x[(i["id"], v["id"], c["id"])] <= gamma,
+                    name=f"compat_{i['id']}_{v['id']}_{c['id']}"
+                )
+
+                model.addConstr(
+                    x[(i["id"], v["id"], c["id"])] <= y[(
+                        v["id"], c["id"])],
+                    name=f"aloc_uso_{i['id']}_{v['id']}_{c['id']}"
+                )
+
+                model.addConstr(
+                    x[(i["id"], v["id"], c["id"])] <= delta.get(
+                        (c["id"], v["id"]), 0),
+                    name=f"destino_{i['id']}_{v['id']}_{c['id']}"
+                )
+
+            for v in veiculos:
+                model.addConstr(
+                    alpha[v["id"]] <= gp.quicksum(
+                        y[(v["id"], c["id"])] for c in clientes),
+                    name=f"ativacao_max_{v['id']}"
+                )
+
+    return model, x, y, alpha
@@ -0,0 +1,230 @@
+import csv
+import time
+from collections import deque
+
+from .config import PASTA_RESULTADOS
+from .heuristics import atribuicao_para_valores, custo_atribuicao
+from .io import cliente_da_linha, um_da_linha, veiculo_da_linha
+from .reotimizacao import (adicionar_um, criar_sessao, desativar_veiculo, encerrar_sessao,
+                           remover_um, reotimizar)
+from .solve import extrair_resultados
+
+# Alocação em horizonte rolante: as UMs chegam ao longo do dia e só a janela
+# aberta (UMs que chegaram e ainda não saíram em um veículo) está no modelo,
+# que é o mesmo de criar_modelo mantido por uma sessão de reotimização. A
+# cada lote de chegadas a janela é reotimizada a quente e os veículos cuja
+# carga na solução atinge o limiar de despacho são confirmados: suas UMs
+# saem do modelo e o veículo é desativado. O tamanho do modelo depende só da
+# janela e da frota, não de quantas UMs já chegaram no total, e cada decisão
+# tem limite de tempo próprio.
+
+LIMIAR_DESPACHO = 0.9  # fração da capacidade de peso ou de volume
+JANELA_MAXIMA = 60  # UMs em aberto no modelo
+LOTE_CHEGADAS = 5  # UMs entre duas reotimizações
+TEMPO_LIMITE_DECISAO = 5
+INTERVALO_LEITURA = 1.0  # s entre leituras de um arquivo que ainda cresce
+ESPERA_MAXIMA_LEITURA = 30.0  # s sem linhas novas para encerrar o fluxo
+
+
+def _linhas(file, seguir, intervalo, espera_maxima):
+    # Linhas completas do arquivo; com seguir, espera novas linhas no fim do
+    # arquivo (como tail -f) até espera_maxima sem novidade
+    parcial = ''
+    ultima_linha = time.monotonic()
+    while True:
+        linha = file.readline()
+        if linha:
+            parcial += linha
+            if parcial.endswith('\n'):
+                yield parcial
+                parcial = ''
+                ultima_linha = time.monotonic()
+            continue
+
+        if not seguir or time.monotonic() - ultima_linha > espera_maxima:
+            if parcial:
+                yield parcial
+            return
+        time.sleep(intervalo)
+
+
+def abrir_fluxo(caminho_arquivo, seguir=False, intervalo=INTERVALO_LEITURA,
+                espera_maxima=ESPERA_MAXIMA_LEITURA):
+    # Lê parâmetros, clientes e veículos (que vêm antes das UMs no CSV de
+    # carregar_dados) e retorna a instância sem UMs e um gerador das UMs,
+    # que continua lendo o arquivo conforme é consumido
+
+    file = open(caminho_arquivo, mode='r', encoding='utf-8')
+    linhas = _linhas(file, seguir, intervalo, espera_maxima)
+    cabecalho = next(csv.reader([next(linhas)], delimiter=';'))
+
+    instancia = {'veiculos': [], 'ums': [], 'clientes': [], 'penalidade': None}
+    primeira_um = None
+
+    for linha in linhas:
+        row = dict(zip(cabecalho, next(csv.reader([linha], delimiter=';'))))
+        tipo = row['tipo']
+
+        if tipo == 'parametro' and row['descricao'] == 'Penalidade por não alocação':
+            instancia['penalidade'] = float(row['valor'])
+        elif tipo == 'cliente':
+            instancia['clientes'].append(cliente_da_linha(row))
+        elif tipo == 'veiculo':
+            instancia['veiculos'].append(veiculo_da_linha(row))
+        elif tipo == 'um':
+            primeira_um = row
+            break
+
+    def ums():
+        try:
+            if primeira_um is not None:
+                yield um_da_linha(primeira_um, instancia['clientes'], instancia['veiculos'])
+            for linha in linhas:
+                row = dict(zip(cabecalho, next(csv.reader([linha], delimiter=';'))))
+                if row['tipo'] == 'um':
+                    yield um_da_linha(row, instancia['clientes'], instancia['veiculos'])
+        finally:
+            file.close()
+
+    return instancia, ums()
+
+
+def _despachar(sessao, estado, forcar):
+    # Reotimiza a janela e confirma os veículos ativos que atingiram o
+    # limiar (todos, com forcar)
+
+    inicio = time.perf_counter()
+    resultados = reotimizar(sessao)
+
+    despachados = []
+    if sessao['solucao'] is not None:
+        x_val, alpha_val = sessao['solucao']['x'], sessao['solucao']['alpha']
+        por_id = {um['id']: um for um in sessao['instancia']['ums']}
+
+        for v in sessao['instancia']['veiculos']:
+            if alpha_val[v['id']] < 0.5:
+                continue
+
+            carga = sorted({chave[0] for chave, valor in x_val.items()
+                            if chave[1] == v['id'] and valor > 0.5})
+            peso = sum(por_id[um_id]['peso'] for um_id in carga)
+            volume = sum(por_id[um_id]['volume'] for um_id in carga)
+
+            if not carga or not (forcar or peso >= estado['limiar'] * v['capacidade_peso']
+                                 or volume >= estado['limiar'] * v['capacidade_volume']):
+                continue
+
+            despachados.append({'veiculo_id': v['id'], 'cargas': carga,
+                                'peso_total': peso, 'volume_total': volume,
+                                'ums_chegadas': len(estado['chegadas'])})
+
+        for despacho in despachados:
+            for um_id in despacho['cargas']:
+                estado['atribuicao'][um_id] = despacho['veiculo_id']
+                estado['abertas'].remove(um_id)
+                remover_um(sessao, um_id)
+            desativar_veiculo(sessao, despacho['veiculo_id'])
+
+    estado['despachos'].extend(despachados)
+    estado['decisoes'].append({
+        'ums_chegadas': len(estado['chegadas']),
+        'janela': len(sessao['instancia']['ums']) + sum(len(d['cargas']) for d in despachados),
+        'veiculos_despachados': len(despachados),
+        'latencia': time.perf_counter() - inicio,
+        'gap': resultados['gap_otimizacao'],
+    })
+
+
+def executar_online(instancia_base, ums, limiar=LIMIAR_DESPACHO, janela_maxima=JANELA_MAXIMA,
+                    lote=LOTE_CHEGADAS, tempo_limite_decisao=TEMPO_LIMITE_DECISAO, threads=None,
+                    pasta_logs=PASTA_RESULTADOS):
+    # instancia_base traz veículos e clientes; ums é qualquer iterável de
+    # UMs no formato de carregar_dados. Quando a janela passa de
+    # janela_maxima, todos os veículos ativos na solução são despachados e,
+    # se ainda assim não couber, as UMs mais antigas saem como não alocadas.
+    # No fim do fluxo todos os veículos ativos são despachados.
+
+    sessao = criar_sessao({**instancia_base, 'ums': []}, 'online', tempo_limite_decisao,
+                          threads, pasta_logs)
+    sessao['modelo'].Params.LogToConsole = 0
+
+    estado = {
+        'limiar': limiar,
+        'chegadas': [],
+        'abertas': deque(),
+        'atribuicao': {},
+        'descartadas': [],
+        'despachos': [],
+        'decisoes': [],
+    }
+
+    try:
+        pendentes = 0
+        for um in ums:
+            estado['chegadas'].append(um)
+            estado['abertas'].append(um['id'])
+            adicionar_um(sessao, um)
+            pendentes += 1
+
+            if len(estado['abertas']) > janela_maxima:
+                _despachar(sessao, estado, forcar=True)
+                pendentes = 0
+                while len(estado['abertas']) > janela_maxima:
+                    um_id = estado['abertas'].popleft()
+                    remover_um(sessao, um_id)
+                    estado['descartadas'].append(um_id)
+
+            elif pendentes >= lote:
+                _despachar(sessao, estado, forcar=False)
+                pendentes = 0
+
+        if estado['abertas']:
+            _despachar(sessao, estado, forcar=True)
+    finally:
+        encerrar_sessao(sessao)
+
+    instancia = {**instancia_base, 'ums': estado['chegadas']}
+    x_val, alpha_val = atribuicao_para_valores(instancia, estado['atribuicao'])
+
+    resultados = extrair_resultados(instancia, x_val, alpha_val)
+    resultados.update({
+        'custo_total': custo_atribuicao(instancia, estado['atribuicao']),
+        'atribuicao': estado['atribuicao'],
+        'despachos': estado['despachos'],
+        'decisoes': estado['decisoes'],
+        'ums_descartadas': estado['descartadas'],
+    })
+
+    return resultados
+
+
+def executar_online_arquivo(caminho_arquivo, seguir=False, limiar=LIMIAR_DESPACHO,
+                            janela_maxima=JANELA_MAXIMA, lote=LOTE_CHEGADAS,
+                            tempo_limite_decisao=TEMPO_LIMITE_DECISAO, threads=None,
+                            pasta_logs=PASTA_RESULTADOS):
+
+    instancia_base, ums = abrir_fluxo(caminho_arquivo, seguir)
+    resultados = executar_online(instancia_base, ums, limiar, janela_maxima, lote,
+                                 tempo_limite_decisao, threads, pasta_logs)
+    imprimir_online(resultados)
+
+    return resultados
+
+
+def imprimir_online(resultados):
+    latencias = [d['latencia'] for d in resultados['decisoes']]
+
+    print(f"\n{'='*80}")
+    print("🚚 ALOCAÇÃO ONLINE")
+    print(f"{'='*80}")
+    for despacho in resultados['despachos']:
+        print(f"  após {despacho['ums_chegadas']:>5} UMs: veículo {despacho['veiculo_id']} "
+              f"com {len(despacho['cargas'])} UMs ({despacho['peso_total']:.0f} kg, "
+              f"{despacho['volume_total']:.1f} m³)")
+    print(f"  UMs alocadas: {resultados['ums_alocadas']}, não alocadas: "
+          f"{resultados['ums_nao_alocadas']} ({len(resultados['ums_descartadas'])} "
+          f"por limite da janela)")
+    print(f"  Custo total: R${resultados['custo_total']:.2f}")
+    if latencias:
+        print(f"  Decisões: {len(latencias)}, latência média {sum(latencias)/len(latencias):.3f} s, "
+              f"máxima {max(latencias):.3f} s")
@@ -0,0 +1,213 @@
+import csv
+import os
+import time
+from datetime import datetime
+
+import gurobipy as gp
+from gurobipy import GRB
+
+from .config import PASTA_RESULTADOS, PASTA_VISUALIZACOES
+from .io import carregar_instancia, nome_instancia
+from .model import criar_modelo
+from .plots import DPI_VISUALIZACOES, plot_fronteira_pareto
+from .preprocess import preprocessar_instancia
+from .solve import criar_ambiente
+
+# Fronteira de Pareto entre custo (transporte + frete morto) e nível de
+# serviço (peso ou penalidade não alocados) pelo método epsilon-restrição.
+# O modelo de criar_modelo é montado uma vez; a soma ponderada do objetivo
+# dá lugar a dois objetivos hierárquicos do Gurobi e a uma restrição
+#
+#   epsilon_servico:  soma_i w_i * x_i >= soma_i w_i - epsilon
+#
+# (w_i é o peso ou peso * penalidade da UM). Os extremos vêm de minimizar um
+# objetivo e desempatar pelo outro; entre eles, epsilon sobe do menor para o
+# maior não alocado, então a solução do ponto anterior continua viável e é o
+# MIP start do próximo. Só o lado direito da restrição muda entre os pontos.
+
+PONTOS_PARETO = 10
+TEMPO_LIMITE_PONTO = 60
+MEDIDAS_SERVICO = ('peso', 'penalidade')
+
+COLUNAS_PARETO = [
+    'ponto', 'epsilon', 'custo', 'custo_transporte', 'frete_morto', 'nao_alocado',
+    'peso_nao_alocado', 'custo_nao_alocacao', 'ums_alocadas', 'veiculos_ativos',
+    'status', 'tempo'
+]
+
+
+def _expressoes(instancia, x, alpha, medida):
+    # Custo, quantidade alocada na medida de serviço e peso alocado
+    beta_v = 1
+
+    por_um = {}
+    for (um_id, _, _), var in x.items():
+        por_um.setdefault(um_id, []).append(var)
+
+    pesos = {um["id"]: um["peso"] for um in instancia["ums"]}
+    fatores = {um["id"]: um["peso"] * (um["penalidade"] if medida == 'penalidade' else 1)
+               for um in instancia["ums"]}
+
+    peso_alocado = gp.quicksum(pesos[um_id] * var for um_id, vars_um in por_um.items()
+                               for var in vars_um)
+    servico = gp.quicksum(fatores[um_id] * var for um_id, vars_um in por_um.items()
+                          for var in vars_um)
+
+    transporte = gp.quicksum(v["custo"] * alpha[v["id"]] for v in instancia["veiculos"])
+    frete_morto = beta_v * (gp.quicksum(v["capacidade_peso"] * alpha[v["id"]]
+                                        for v in instancia["veiculos"]) - peso_alocado)
+
+    return transporte, frete_morto, servico, sum(fatores.values())
+
+
+def _prioridades(modelo, custo, servico, custo_primeiro):
+    modelo.setObjectiveN(custo, index=0, priority=2 if custo_primeiro else 1, name='custo')
+    modelo.setObjectiveN(-servico, index=1, priority=1 if custo_primeiro else 2, name='servico')
+
+
+def _ponto(modelo, x, alpha, expressoes, total_servico, fixo, instancia):
+    transporte, frete_morto, servico, _ = expressoes
+
+    inicio = time.perf_counter()
+    modelo.optimize()
+    tempo = time.perf_counter() - inicio
+
+    ponto = {'status': modelo.status, 'tempo': tempo}
+    if modelo.SolCount == 0:
+        return ponto
+
+    alocadas = {chave[0] for chave, valor in modelo.getAttr('X', x).items() if valor > 0.5}
+    peso_nao_alocado = sum(um["peso"] for um in instancia["ums"] if um["id"] not in alocadas)
+    custo_nao_alocacao = sum(um["peso"] * um["penalidade"] for um in instancia["ums"]
+                             if um["id"] not in alocadas)
+
+    ponto.update({
+        'custo_transporte': transporte.getValue(),
+        'frete_morto': frete_morto.getValue(),
+        'nao_alocado': total_servico - servico.getValue() + fixo['servico'],
+        'peso_nao_alocado': peso_nao_alocado + fixo['peso'],
+        'custo_nao_alocacao': custo_nao_alocacao + fixo['penalidade'],
+        'ums_alocadas': len(alocadas),
+        'veiculos_ativos': sum(valor > 0.5 for valor in modelo.getAttr('X', alpha).values()),
+    })
+    ponto['custo'] = ponto['custo_transporte'] + ponto['frete_morto']
+
+    variaveis = modelo.getVars()
+    modelo.setAttr('Start', variaveis, modelo.getAttr('X', variaveis))
+
+    return ponto
+
+
+def calcular_fronteira(instancia, pontos=PONTOS_PARETO, medida='peso',
+                       tempo_limite=TEMPO_LIMITE_PONTO, threads=None):
+    # Retorna os pontos da fronteira em ordem crescente de não alocado, sem
+    # repetições (epsilons vizinhos podem levar à mesma solução)
+
+    original = instancia
+    instancia, preprocessamento = preprocessar_instancia(instancia)
+
+    removidas = {um["id"] for um in preprocessamento['ums_removidas']}
+    peso_removido = sum(um["peso"] for um in original["ums"] if um["id"] in removidas)
+    fixo = {
+        'peso': peso_removido,
+        'penalidade': preprocessamento['custo_fixo'],
+        'servico': preprocessamento['custo_fixo'] if medida == 'penalidade' else peso_removido,
+    }
+
+    env = criar_ambiente(tempo_limite, threads, console=False)
+    modelo = None
+    fronteira = []
+
+    try:
+        modelo, x, _, alpha = criar_modelo(instancia, env)
+        expressoes = _expressoes(instancia, x, alpha, medida)
+        transporte, frete_morto, servico, total_servico = expressoes
+        custo = transporte + frete_morto
+
+        restricao = modelo.addConstr(servico >= total_servico, name='epsilon_servico')
+        restricao.RHS = -GRB.INFINITY
+
+        # Extremos: menor custo (desempate pelo serviço) e melhor serviço
+        # (desempate pelo custo)
+        _prioridades(modelo, custo, servico, custo_primeiro=True)
+        menor_custo = _ponto(modelo, x, alpha, expressoes, total_servico, fixo, instancia)
+
+        _prioridades(modelo, custo, servico, custo_primeiro=False)
+        melhor_servico = _ponto(modelo, x, alpha, expressoes, total_servico, fixo, instancia)
+
+        if 'nao_alocado' not in menor_custo or 'nao_alocado' not in melhor_servico:
+            return fronteira
+
+        minimo, maximo = melhor_servico['nao_alocado'], menor_custo['nao_alocado']
+        passos = max(pontos - 1, 1)
+
+        _prioridades(modelo, custo, servico, custo_primeiro=True)
+        for k in range(pontos):
+            epsilon = minimo + (maximo - minimo) * k / passos
+            restricao.RHS = total_servico + fixo['servico'] - epsilon
+
+            ponto = _ponto(modelo, x, alpha, expressoes, total_servico, fixo, instancia)
+            ponto['epsilon'] = epsilon
+
+            if 'custo' not in ponto:
+                continue
+            if fronteira and (abs(ponto['custo'] - fronteira[-1]['custo']) < 1e-6
+                              and abs(ponto['nao_alocado'] - fronteira[-1]['nao_alocado']) < 1e-6):
+                continue
+
+            ponto['ponto'] = len(fronteira)
+            fronteira.append(ponto)
+    finally:
+        if modelo is not None:
+            modelo.dispose()
+        env.dispose()
+
+    return fronteira
+
+
+def executar_pareto(caminho, pontos=PONTOS_PARETO, medida='peso', tempo_limite=TEMPO_LIMITE_PONTO,
+                    threads=None, pasta_resultados=PASTA_RESULTADOS,
+                    pasta_visualizacoes=PASTA_VISUALIZACOES, dpi=DPI_VISUALIZACOES):
+
+    nome = nome_instancia(caminho)
+    print(f"📐 Fronteira de Pareto de {nome}: {pontos} pontos, não alocado em {medida}")
+
+    fronteira = calcular_fronteira(carregar_instancia(caminho), pontos, medida,
+                                   tempo_limite, threads)
+    if not fronteira:
+        print("\n⚠️ Nenhum ponto da fronteira foi encontrado!")
+        return None
+
+    os.makedirs(pasta_resultados, exist_ok=True)
+    arquivo = os.path.join(
+        pasta_resultados, f"pareto_{nome}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    with open(arquivo, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=COLUNAS_PARETO, delimiter=';',
+                                extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(fronteira)
+
+    os.makedirs(pasta_visualizacoes, exist_ok=True)
+    plot_fronteira_pareto(fronteira, medida, pasta_visualizacoes, nome, dpi)
+
+    imprimir_pareto(fronteira, medida)
+    print(f"\n✅ Fronteira salva em: {arquivo}")
+
+    return fronteira
+
+
+def imprimir_pareto(fronteira, medida):
+    rotulo = 'Peso n. aloc.' if medida == 'peso' else 'Penal. n. aloc.'
+
+    print(f"\n{'='*80}")
+    print("📐 FRONTEIRA CUSTO x SERVIÇO")
+    print(f"{'='*80}")
+    print(f"{'Ponto':>6} {'Custo':>12} {'Transporte':>12} {'Frete morto':>12} "
+          f"{rotulo:>16} {'UMs aloc.':>10} {'Veíc.':>6} {'Tempo (s)':>10}")
+
+    for ponto in fronteira:
+        status = '' if ponto['status'] == GRB.OPTIMAL else f" (status {ponto['status']})"
+        print(f"{ponto['ponto']:>6} {ponto['custo']:>12.2f} {ponto['custo_transporte']:>12.2f} "
+              f"{ponto['frete_morto']:>12.2f} {ponto['nao_alocado']:>16.2f} "
+              f"{ponto['ums_alocadas']:>10} {ponto['veiculos_ativos']:>6} "
+              f"{ponto['tempo']:>10.2f}{status}")
@@ -0,0 +1,111 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ETAPAS = ['carregamento', 'construcao_modelo', 'otimizacao', 'extracao', 'verificacao',
+          'exportacao', 'visualizacoes']
+PERFILADORES = ['cprofile', 'pyinstrument']
+
+
+def _reiniciar_pico_memoria():
+    # No Linux, escrever 5 em clear_refs zera o pico de RSS (VmHWM) do
+    # processo, o que permite medir o pico de cada etapa separadamente.
+    try:
+        with open('/proc/self/clear_refs', 'w') as arquivo:
+            arquivo.write('5')
+    except OSError:
+        pass
+
+
+def pico_memoria_mb():
+    try:
+        with open('/proc/self/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith('VmHWM:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+
+    # Sem /proc, o pico é o do processo inteiro até aqui (ru_maxrss vem em
+    # kB no Linux e em bytes no macOS)
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def _iniciar_perfilador(perfilador):
+    if perfilador == 'cprofile':
+        import cProfile
+
+        perfil = cProfile.Profile()
+        perfil.enable()
+        return perfil
+
+    if perfilador == 'pyinstrument':
+        from pyinstrument import Profiler
+
+        perfil = Profiler()
+        perfil.start()
+        return perfil
+
+    raise ValueError(f"Perfilador desconhecido: {perfilador}")
+
+
+def _salvar_perfil(perfilador, perfil, caminho_base):
+    if perfilador == 'cprofile':
+        perfil.disable()
+        perfil.dump_stats(f"{caminho_base}.prof")
+    else:
+        perfil.stop()
+        with open(f"{caminho_base}.html", 'w', encoding='utf-8') as arquivo:
+            arquivo.write(perfil.output_html())
+
+
+@contextmanager
+def medir_etapa(etapas, nome, perfilador=None, pasta_perfis=None, prefixo=''):
+    # Registra em etapas[nome] o tempo de parede, o tempo de CPU do processo
+    # (inclui as threads do Gurobi) e o pico de RSS durante a etapa. Com um
+    # perfilador, grava também o perfil da etapa em
+    # pasta_perfis/<prefixo>_<nome>.prof (cProfile) ou .html (pyinstrument).
+
+    perfil = None
+    if perfilador:
+        os.makedirs(pasta_perfis, exist_ok=True)
+        perfil = _iniciar_perfilador(perfilador)
+
+    _reiniciar_pico_memoria()
+    inicio = time.perf_counter()
+    inicio_cpu = time.process_time()
+
+    try:
+        yield
+    finally:
+        etapas[nome] = {
+            'tempo': time.perf_counter() - inicio,
+            'tempo_cpu': time.process_time() - inicio_cpu,
+            'pico_memoria_mb': pico_memoria_mb(),
+        }
+
+        if perfil is not None:
+            caminho_base = os.path.join(
+                pasta_perfis, f"{prefixo}_{nome}" if prefixo else nome)
+            _salvar_perfil(perfilador, perfil, caminho_base)
+
+
+def imprimir_etapas(etapas):
+    if not etapas:
+        return
+
+    print(f"\n⏱️ ETAPAS:")
+    print(f"  {'Etapa':<20} {'Tempo (s)':>10} {'CPU (s)':>10} {'Pico (MiB)':>11}")
+    for nome, medicao in etapas.items():
+        pico = medicao.get('pico_memoria_mb')
+        print(f"  {nome:<20} {medicao['tempo']:>10.3f} {medicao['tempo_cpu']:>10.3f} "
+              f"{pico if pico is not None else float('nan'):>11.1f}")
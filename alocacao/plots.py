@@ -0,0 +1,665 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .config import TIMEOUT
+from .io import carregar_resultados, codificar_categorias, matriz_compatibilidade, salvar_resultados
+from .perfil import medir_etapa
+from .report import ROTULOS_STATUS
+
+# pandas, matplotlib e seaborn são importados dentro das funções que os usam:
+# carregar uma instância, resolver ou exportar CSV não paga o custo de
+# importação da pilha de gráficos.
+
+DPI_VISUALIZACOES = 300
+PROCESSOS_VISUALIZACOES = 2
+VEICULOS_POR_PAGINA = 30
+UMS_NAO_ALOCADAS_POR_PAGINA = 240
+LIMITE_ROTULOS_UM = 500
+LIMITE_LINHAS_HEATMAP = 500
+LIMITE_COLUNAS_HEATMAP = 60
+
+
+GRAFICOS = [
+    'tempo_execucao', 'gap_otimizacao', 'status_solucao',
+    'utilizacao_veiculos', 'distribuicao_utilizacao', 'ums_por_veiculo',
+    'distribuicao_alocacao',
+    'composicao_custos', 'custo_por_componente', 'penalidades_nao_alocacao',
+    'heatmap_compatibilidade', 'distribuicao_ums_nao_alocadas'
+]
+
+
+def gerar_visualizacoes(resultados, instancia, pasta_saida, graficos=None, dpi=DPI_VISUALIZACOES):
+
+    selecionados = set(GRAFICOS if graficos is None else graficos)
+    desconhecidos = selecionados - set(GRAFICOS)
+    if desconhecidos:
+        raise ValueError(
+            f"Gráficos desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    nome_base = resultados['tipo_instancia']
+
+    if 'tempo_execucao' in selecionados:
+        plot_tempo_execucao(resultados, pasta_saida, nome_base, dpi)
+    if 'gap_otimizacao' in selecionados:
+        plot_gap_otimizacao(resultados, pasta_saida, nome_base, dpi)
+    if 'status_solucao' in selecionados:
+        plot_status_solucao(resultados, pasta_saida, nome_base, dpi)
+
+    if 'utilizacao_veiculos' in selecionados:
+        plot_utilizacao_veiculos(resultados, pasta_saida, nome_base, dpi)
+    if 'distribuicao_utilizacao' in selecionados:
+        plot_distribuicao_utilizacao(resultados, pasta_saida, nome_base, dpi)
+    if 'ums_por_veiculo' in selecionados:
+        plot_ums_por_veiculo(resultados, pasta_saida, nome_base, dpi)
+
+    if 'distribuicao_alocacao' in selecionados:
+        plot_distribuicao_alocacao(
+            resultados, instancia, pasta_saida, nome_base, dpi)
+
+    if 'composicao_custos' in selecionados:
+        plot_composicao_custos(resultados, pasta_saida, nome_base, dpi)
+    if 'custo_por_componente' in selecionados:
+        plot_custo_por_componente(resultados, pasta_saida, nome_base, dpi)
+    if 'penalidades_nao_alocacao' in selecionados:
+        plot_penalidades_nao_alocacao(resultados, pasta_saida, nome_base, dpi)
+
+    if resultados['ums_nao_alocadas'] > 0:
+        if 'heatmap_compatibilidade' in selecionados:
+            plot_heatmap_compatibilidade(instancia, pasta_saida, nome_base, dpi)
+        if 'distribuicao_ums_nao_alocadas' in selecionados:
+            plot_distribuicao_ums_nao_alocadas(
+                instancia, resultados, pasta_saida, nome_base, dpi)
+
+
+def _inicializar_processo_visualizacao():
+    import matplotlib.pyplot as plt
+
+    plt.switch_backend('Agg')
+
+
+def renderizar_arquivo(caminho, pasta_saida, graficos, dpi, perfilador=None, pasta_perfis=None):
+    # O tempo da renderização é gravado de volta no JSON salvo: no lote, o
+    # relatório final só lê os resultados depois que os gráficos terminam.
+
+    resultados, instancia = carregar_resultados(caminho)
+
+    etapas = resultados.setdefault('etapas', {})
+    with medir_etapa(etapas, 'visualizacoes', perfilador, pasta_perfis,
+                     resultados['tipo_instancia']):
+        gerar_visualizacoes(resultados, instancia, pasta_saida, graficos, dpi)
+
+    salvar_resultados(resultados, instancia, os.path.dirname(caminho))
+
+    return resultados['tipo_instancia']
+
+
+def criar_pool_visualizacoes(processos=PROCESSOS_VISUALIZACOES):
+    return ProcessPoolExecutor(max_workers=processos,
+                               initializer=_inicializar_processo_visualizacao)
+
+
+def renderizar_visualizacoes(caminhos, pasta_saida, graficos=None, dpi=DPI_VISUALIZACOES,
+                             processos=PROCESSOS_VISUALIZACOES):
+    # Renderiza, em um pool de processos, os gráficos de resultados já salvos
+    # por salvar_resultados.
+
+    with criar_pool_visualizacoes(processos) as pool:
+        futuros = [pool.submit(renderizar_arquivo, caminho, pasta_saida, graficos, dpi)
+                   for caminho in caminhos]
+        return aguardar_visualizacoes(futuros)
+
+
+def renderizar_resultados_salvos(pasta_resultados, pasta_saida, graficos=None, dpi=DPI_VISUALIZACOES,
+                                 processos=PROCESSOS_VISUALIZACOES):
+
+    caminhos = sorted(os.path.join(pasta_resultados, f) for f in os.listdir(pasta_resultados)
+                      if f.endswith('_resultados.json'))
+
+    if not caminhos:
+        print("❌ Nenhum resultado salvo encontrado!")
+        return []
+
+    concluidas = renderizar_visualizacoes(
+        caminhos, pasta_saida, graficos, dpi, processos)
+    print(f"\n✅ Visualizações geradas para {len(concluidas)} instâncias")
+
+    return concluidas
+
+
+def aguardar_visualizacoes(futuros):
+
+    concluidas = []
+    for futuro in futuros:
+        try:
+            concluidas.append(futuro.result())
+        except Exception as e:
+            print(f"❌ Erro ao gerar visualizações: {str(e)}")
+
+    return concluidas
+
+
+def _vertices_retangulos(x, y, largura, altura):
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    return np.stack([
+        np.column_stack([x, y]),
+        np.column_stack([x + largura, y]),
+        np.column_stack([x + largura, y + altura]),
+        np.column_stack([x, y + altura])
+    ], axis=1)
+
+
+def plot_distribuicao_alocacao(resultados, instancia, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES,
+                               veiculos_por_pagina=VEICULOS_POR_PAGINA, limite_rotulos=LIMITE_ROTULOS_UM,
+                               nao_alocadas_por_pagina=UMS_NAO_ALOCADAS_POR_PAGINA):
+    import matplotlib.pyplot as plt
+
+    # Os retângulos de cada página são desenhados em duas PolyCollection
+    # (veículos e UMs), os rótulos por UM só aparecem até limite_rotulos UMs
+    # na página e os veículos são paginados em várias figuras. As UMs não
+    # alocadas também: o primeiro bloco vai na última página de veículos e
+    # os demais em páginas próprias.
+
+    cores_veiculos = plt.cm.tab20.colors
+    cores_ums = plt.cm.Set3.colors
+
+    tipos_veiculos = sorted(
+        list(set(v['tipo'] for v in instancia['veiculos'])))
+    tipos_ums = sorted(list(set(um['tipo'] for um in instancia['ums'])))
+
+    cor_veiculo = {tipo: cores_veiculos[i % len(cores_veiculos)]
+                   for i, tipo in enumerate(tipos_veiculos)}
+    cor_um = {tipo: cores_ums[i % len(cores_ums)]
+              for i, tipo in enumerate(tipos_ums)}
+
+    ums_alocadas = set()
+    for aloc in resultados['alocacoes']:
+        ums_alocadas.update(aloc['cargas'])
+
+    ums_nao_alocadas = [um for um in instancia['ums']
+                        if um['id'] not in ums_alocadas]
+
+    alocacoes = resultados['alocacoes']
+    paginas = [[alocacoes[k:k + veiculos_por_pagina], []]
+               for k in range(0, len(alocacoes), veiculos_por_pagina)]
+
+    blocos_nao_alocadas = [ums_nao_alocadas[k:k + nao_alocadas_por_pagina]
+                           for k in range(0, len(ums_nao_alocadas), nao_alocadas_por_pagina)]
+    if blocos_nao_alocadas and paginas:
+        paginas[-1][1] = blocos_nao_alocadas.pop(0)
+    paginas += [[[], bloco] for bloco in blocos_nao_alocadas]
+    paginas = paginas or [[[], []]]
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    caminhos = []
+
+    for num_pagina, (alocacoes_pagina, nao_alocadas_pagina) in enumerate(paginas, 1):
+        if len(paginas) == 1:
+            titulo = f'Distribuição de Cargas - {nome_base}\n'
+            caminho = os.path.join(
+                pasta_saida, f"{nome_base}_alocacao_organizada.png")
+        else:
+            titulo = f'Distribuição de Cargas - {nome_base} (página {num_pagina}/{len(paginas)})\n'
+            caminho = os.path.join(
+                pasta_saida, f"{nome_base}_alocacao_organizada_p{num_pagina}.png")
+
+        _plot_pagina_alocacao(alocacoes_pagina, nao_alocadas_pagina, cor_veiculo, cor_um, titulo,
+                              caminho, dpi, limite_rotulos, len(ums_nao_alocadas))
+        caminhos.append(caminho)
+
+    return caminhos
+
+
+def _plot_pagina_alocacao(alocacoes, ums_nao_alocadas, cor_veiculo, cor_um, titulo, caminho,
+                          dpi, limite_rotulos, total_nao_alocadas=None):
+    import matplotlib.pyplot as plt
+    import matplotlib.colors as mcolors
+    import matplotlib.patches as patches
+    from matplotlib.collections import PolyCollection
+
+    plt.figure(figsize=(16, 12))
+    ax = plt.gca()
+
+    um_width = 0.8
+    um_height = 0.9
+    espacamento_vertical = 1.2
+    margin_left = 2.0
+    ums_por_linha = 8
+    altura_por_linha = 1.2
+
+    total_ums = sum(len(aloc['cargas'])
+                    for aloc in alocacoes) + len(ums_nao_alocadas)
+    com_rotulos = total_ums <= limite_rotulos
+    borda_um = 0.8 if com_rotulos else 0.1
+
+    veiculos_vertices = []
+    veiculos_cores = []
+    ums_x = []
+    ums_y = []
+    ums_cores = []
+    ums_rotulos = []
+
+    y_pos = 0
+
+    for aloc in alocacoes:
+        veic_id = aloc['veiculo_id']
+        veic_tipo = aloc['veiculo_tipo']
+        ums = aloc['cargas']
+
+        num_linhas = (len(ums) + ums_por_linha - 1) // ums_por_linha
+        altura_veiculo = 1.0 + (num_linhas * altura_por_linha)
+
+        veiculos_vertices.append(_vertices_retangulos(
+            [margin_left], [y_pos - altura_veiculo/2], ums_por_linha, altura_veiculo)[0])
+        veiculos_cores.append(mcolors.to_rgba(cor_veiculo[veic_tipo], 0.2))
+
+        ax.text(margin_left - 0.5, y_pos,
+                f'V{veic_id} ({veic_tipo})\n{len(ums)} UMs',
+                ha='right', va='center', fontsize=10)
+
+        posicoes = np.arange(len(ums))
+        ums_x.append(margin_left + posicoes % ums_por_linha)
+        ums_y.append(y_pos - altura_veiculo/2 +
+                     (posicoes // ums_por_linha + 0.7) * altura_por_linha)
+        ums_cores.extend(cor_um[um_tipo] for um_tipo in aloc['tipos_um'])
+        ums_rotulos.extend(ums)
+
+        y_pos -= (altura_veiculo + espacamento_vertical)
+
+    if veiculos_vertices:
+        ax.add_collection(PolyCollection(
+            veiculos_vertices, facecolors=veiculos_cores,
+            edgecolors='black', linewidths=1.5))
+
+    if ums_x:
+        ums_x = np.concatenate(ums_x)
+        ums_y = np.concatenate(ums_y)
+        ax.add_collection(PolyCollection(
+            _vertices_retangulos(ums_x, ums_y, um_width, um_height),
+            facecolors=ums_cores, edgecolors='black', linewidths=borda_um))
+
+        if com_rotulos:
+            for x_pos, y_um, um_id in zip(ums_x, ums_y, ums_rotulos):
+                ax.text(x_pos + um_width/2, y_um + um_height/2,
+                        f'UM{um_id}',
+                        ha='center', va='center', fontsize=6)
+
+    if ums_nao_alocadas:
+        y_pos -= espacamento_vertical
+        total_nao_alocadas = total_nao_alocadas or len(ums_nao_alocadas)
+        rotulo = (f'{len(ums_nao_alocadas)} de {total_nao_alocadas}'
+                  if total_nao_alocadas > len(ums_nao_alocadas) else f'{total_nao_alocadas}')
+        ax.text(margin_left - 0.5, y_pos,
+                f'UMs Não Alocadas: {rotulo}',
+                ha='right', va='center', fontsize=10)
+
+        num_linhas_na = (len(ums_nao_alocadas) +
+                         ums_por_linha - 1) // ums_por_linha
+
+        posicoes = np.arange(len(ums_nao_alocadas))
+        na_x = margin_left + posicoes % ums_por_linha
+        na_y = y_pos - (posicoes // ums_por_linha) * (um_height + 0.2)
+
+        ax.add_collection(PolyCollection(
+            _vertices_retangulos(na_x, na_y, um_width, um_height),
+            facecolors=[cor_um[um['tipo']] for um in ums_nao_alocadas],
+            edgecolors='black', linestyles='dashed', linewidths=borda_um))
+
+        if com_rotulos:
+            for x_pos, y_um, um in zip(na_x, na_y, ums_nao_alocadas):
+                ax.text(x_pos + um_width/2, y_um + um_height/2,
+                        f'UM{um["id"]}',
+                        ha='center', va='center', fontsize=6)
+
+        y_min = y_pos - (num_linhas_na * (um_height + 0.2)) - \
+            espacamento_vertical
+    else:
+        y_min = y_pos
+
+    ax.set_xlim(0, margin_left + ums_por_linha + 1)
+    ax.set_ylim(y_min, 2)
+    ax.axis('off')
+
+    legend_elements = []
+    for tipo, cor in cor_veiculo.items():
+        legend_elements.append(patches.Patch(
+            facecolor=cor, alpha=0.2, edgecolor='black',
+            label=f'Veículo {tipo}'))
+
+    for tipo, cor in cor_um.items():
+        legend_elements.append(patches.Patch(
+            facecolor=cor, edgecolor='black',
+            label=f'UM {tipo}'))
+
+    ax.legend(handles=legend_elements,
+              loc='center left',
+              bbox_to_anchor=(1.02, 0.5),
+              fontsize=9)
+
+    plt.title(titulo, fontsize=12)
+    plt.tight_layout()
+
+    plt.savefig(caminho, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+def plot_tempo_execucao(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    plt.bar(nome_base, resultados['tempo_execucao'], color='skyblue')
+    plt.axhline(y=resultados.get('tempo_limite', TIMEOUT), color='r', linestyle='--', label='Timeout')
+    plt.ylabel('Tempo (segundos)')
+    plt.title('Tempo de Execução')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_tempo_execucao.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_gap_otimizacao(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+
+    if resultados['gap_otimizacao'] is not None:
+        plt.figure(figsize=(8, 5))
+        plt.bar(nome_base, resultados['gap_otimizacao'], color='orange')
+        plt.ylabel('GAP (%)')
+        plt.title('GAP de Otimização')
+        plt.tight_layout()
+        plt.savefig(os.path.join(
+            pasta_saida, f"{nome_base}_gap_otimizacao.png"), dpi=dpi)
+        plt.close()
+
+
+def plot_status_solucao(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+
+    status = ROTULOS_STATUS.get(resultados['status'], "Desconhecido")
+
+    plt.figure(figsize=(6, 6))
+    plt.pie([1], labels=[status], autopct='%1.0f%%', colors=['lightgreen'])
+    plt.title('Status da Solução')
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_status_solucao.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_utilizacao_veiculos(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    if not resultados['alocacoes']:
+        return
+
+    df = pd.DataFrame(resultados['alocacoes'])
+    df = df.sort_values('veiculo_id')
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bar_width = 0.35
+    x = np.arange(len(df))
+
+    bars1 = ax.bar(x - bar_width/2,
+                   df['peso_total'], bar_width, label='Peso Real')
+    bars2 = ax.bar(x + bar_width/2,
+                   df['peso_minimo'], bar_width, label='Peso Mínimo')
+
+    ax.set_xlabel('Veículos')
+    ax.set_ylabel('Peso (kg)')
+    ax.set_title('Comparação: Peso Real vs Peso Mínimo')
+    ax.set_xticks(x)
+    ax.set_xticklabels(df['veiculo_id'])
+    ax.legend()
+
+    for i, cap in enumerate(df['capacidade_peso']):
+        ax.axhline(y=cap, xmin=(i - 0.5)/len(x), xmax=(i + 0.5)/len(x),
+                   color='r', linestyle='--')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_utilizacao_veiculos.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_distribuicao_utilizacao(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import pandas as pd
+
+    if not resultados['alocacoes']:
+        return
+
+    df = pd.DataFrame(resultados['alocacoes'])
+
+    plt.figure(figsize=(12, 6))
+    sns.histplot(data=df, x='taxa_utilizacao_peso',
+                 bins=10, kde=True, color='skyblue')
+    plt.xlabel('Taxa de Utilização de Peso (%)')
+    plt.ylabel('Número de Veículos')
+    plt.title('Distribuição das Taxas de Utilização de Peso')
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_distribuicao_utilizacao.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_ums_por_veiculo(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import pandas as pd
+
+    if not resultados['alocacoes']:
+        return
+
+    df = pd.DataFrame(resultados['alocacoes'])
+    df['num_cargas'] = df['cargas'].apply(len)
+
+    plt.figure(figsize=(12, 6))
+    sns.barplot(data=df, x='veiculo_id', y='num_cargas', hue='veiculo_tipo', dodge=False)
+    plt.xlabel('ID do Veículo')
+    plt.ylabel('Número de UMs Transportadas')
+    plt.title('Distribuição de UMs por Veículo')
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_ums_por_veiculo.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_composicao_custos(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+
+    componentes = ['Transporte', 'Frete Morto', 'Não Alocação']
+    valores = [
+        resultados['custo_transporte'],
+        resultados['frete_morto_total'],
+        resultados['custo_nao_alocacao']
+    ]
+
+    plt.figure(figsize=(8, 8))
+    plt.pie(valores, labels=componentes, autopct='%1.1f%%', colors=['#66b3ff', '#ff9999', '#99ff99'])
+    plt.title('Composição do Custo Total')
+    plt.tight_layout()
+    plt.savefig(os.path.join(pasta_saida, f"{nome_base}_composicao_custos.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_fronteira_pareto(fronteira, medida, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    # Pontos de pareto.calcular_fronteira: custo (transporte + frete morto)
+    # contra o não alocado, com a composição do custo em cada ponto
+    import matplotlib.pyplot as plt
+
+    nao_alocado = [p['nao_alocado'] for p in fronteira]
+    transporte = [p['custo_transporte'] for p in fronteira]
+    custo = [p['custo'] for p in fronteira]
+
+    plt.figure(figsize=(10, 6))
+    plt.fill_between(nao_alocado, 0, transporte, step='post', color='#66b3ff', alpha=0.5,
+                     label='Transporte')
+    plt.fill_between(nao_alocado, transporte, custo, step='post', color='#ff9999', alpha=0.5,
+                     label='Frete Morto')
+    plt.step(nao_alocado, custo, where='post', color='black')
+    plt.scatter(nao_alocado, custo, color='black', zorder=3)
+
+    for p in fronteira:
+        plt.annotate(f"{p['ums_alocadas']} UMs", (p['nao_alocado'], p['custo']),
+                     textcoords='offset points', xytext=(5, 5), fontsize=8)
+
+    plt.xlabel('Peso não alocado (kg)' if medida == 'peso' else 'Penalidade de não alocação (R$)')
+    plt.ylabel('Custo de transporte + frete morto (R$)')
+    plt.title('Fronteira de Pareto: Custo x Nível de Serviço')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(os.path.join(pasta_saida, f"{nome_base}_fronteira_pareto.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_custo_por_componente(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+
+    componentes = ['Transporte', 'Frete Morto', 'Não Alocação']
+    valores = [
+        resultados['custo_transporte'],
+        resultados['frete_morto_total'],
+        resultados['custo_nao_alocacao']
+    ]
+
+    plt.figure(figsize=(10, 6))
+    bars = plt.bar(componentes, valores, color=['blue', 'red', 'green'])
+    plt.ylabel('Custo (R$)')
+    plt.title('Custo por Componente')
+
+    for bar in bars:
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height,
+                 f'R${height:,.2f}',
+                 ha='center', va='bottom')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_custo_por_componente.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_penalidades_nao_alocacao(resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+
+    if resultados['ums_nao_alocadas'] == 0:
+        return
+
+    dados = {
+        'Peso Não Alocado': resultados['peso_nao_alocado'],
+        'Volume Não Alocado': resultados['volume_nao_alocado']
+    }
+
+    plt.figure(figsize=(10, 6))
+    bars = plt.bar(dados.keys(), dados.values(), color=['orange', 'purple'])
+    plt.ylabel('Valor Total')
+    plt.title('Recursos Não Alocados')
+
+    for bar in bars:
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{height:,.2f}',
+                 ha='center', va='bottom')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_penalidades_nao_alocacao.png"), dpi=dpi)
+    plt.close()
+
+
+def _agrupar_media(matriz, rotulos, eixo):
+    # Média da matriz por grupo de rótulos ao longo do eixo indicado
+
+    tabela = {}
+    codigos = np.array(codificar_categorias(tabela, rotulos), dtype=np.int32)
+    contagem = np.bincount(codigos, minlength=len(tabela))
+
+    if eixo == 0:
+        soma = np.zeros((len(tabela), matriz.shape[1]))
+        np.add.at(soma, codigos, matriz)
+        return soma / contagem[:, None], list(tabela)
+
+    soma = np.zeros((matriz.shape[0], len(tabela)))
+    np.add.at(soma.T, codigos, matriz.T)
+    return soma / contagem[None, :], list(tabela)
+
+
+def plot_heatmap_compatibilidade(instancia, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES,
+                                 limite_linhas=LIMITE_LINHAS_HEATMAP,
+                                 limite_colunas=LIMITE_COLUNAS_HEATMAP):
+    import matplotlib.pyplot as plt
+
+    # Acima de limite_linhas UMs as linhas são agregadas por tipo de UM, e acima
+    # de limite_colunas veículos as colunas por tipo de veículo; nesse caso as
+    # células mostram a fração de pares compatíveis.
+
+    matriz = matriz_compatibilidade(instancia['ums'], instancia['veiculos']).astype(float)
+    rotulos_linhas = [f"UM_{um['id']}" for um in instancia['ums']] \
+        if len(instancia['ums']) <= limite_linhas else None
+    rotulos_colunas = [f"V_{v['id']}({v['tipo']})" for v in instancia['veiculos']] \
+        if len(instancia['veiculos']) <= limite_colunas else None
+
+    if rotulos_linhas is None:
+        matriz, rotulos_linhas = _agrupar_media(
+            matriz, [um['tipo'] for um in instancia['ums']], eixo=0)
+        rotulos_linhas = [f"UMs {tipo}" for tipo in rotulos_linhas]
+
+    if rotulos_colunas is None:
+        matriz, rotulos_colunas = _agrupar_media(
+            matriz, [v['tipo'] for v in instancia['veiculos']], eixo=1)
+
+    plt.figure(figsize=(12, 8))
+    ax = plt.gca()
+    ax.imshow(matriz, cmap="Blues", vmin=0, vmax=1,
+              aspect='auto', interpolation='nearest')
+
+    # Com muitas linhas os rótulos ficam ilegíveis; mostra só alguns
+    passo_linhas = max(1, len(rotulos_linhas) // 50)
+    ax.set_yticks(np.arange(0, len(rotulos_linhas), passo_linhas))
+    ax.set_yticklabels(rotulos_linhas[::passo_linhas], fontsize=7)
+    ax.set_xticks(np.arange(len(rotulos_colunas)))
+    ax.set_xticklabels(rotulos_colunas, rotation=90, fontsize=7)
+
+    plt.title('Matriz de Compatibilidade UMs x Veículos')
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_heatmap_compatibilidade.png"), dpi=dpi)
+    plt.close()
+
+
+def plot_distribuicao_ums_nao_alocadas(instancia, resultados, pasta_saida, nome_base, dpi=DPI_VISUALIZACOES):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import pandas as pd
+
+    alocados_ids = set()
+    for aloc in resultados['alocacoes']:
+        alocados_ids.update(aloc['cargas'])
+
+    ums_nao_alocadas = [um for um in instancia['ums']
+                        if um['id'] not in alocados_ids]
+
+    if not ums_nao_alocadas:
+        return
+
+    df = pd.DataFrame(ums_nao_alocadas)
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+
+    sns.boxplot(data=df, y='peso', ax=axes[0])
+    axes[0].set_title('Distribuição de Peso das UMs Não Alocadas')
+
+    sns.boxplot(data=df, y='volume', ax=axes[1])
+    axes[1].set_title('Distribuição de Volume das UMs Não Alocadas')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(
+        pasta_saida, f"{nome_base}_distribuicao_ums_nao_alocadas.png"), dpi=dpi)
+    plt.close()
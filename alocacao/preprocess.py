@@ -0,0 +1,113 @@
+import numpy as np
+
+from .io import matriz_compatibilidade
+
+MOTIVO_INCOMPATIBILIDADE = "Incompatibilidade"
+MOTIVO_CAPACIDADE = "Excede capacidade dos veículos compatíveis"
+MOTIVO_SEM_VEICULO = "Nenhum veículo compatível pode ser ativado"
+
+MOTIVO_SEM_CLIENTES = "Sem clientes na região"
+MOTIVO_CARGA_MINIMA = "Carga mínima acima da capacidade"
+MOTIVO_DEMANDA = "Demanda compatível abaixo da carga mínima"
+
+
+def preprocessar_instancia(instancia):
+    # Remove, antes de montar o modelo, o que não pode aparecer em nenhuma
+    # solução viável de criar_modelo:
+    # - veículos sem cliente na sua região (destino_ zera todas as suas x),
+    #   com carga mínima acima da capacidade ou cuja demanda possível (soma
+    #   dos pesos das UMs que ele pode levar) não alcança a carga mínima:
+    #   frete_morto_minimo_ obriga alpha = 0 e, com isso, x = 0
+    # - UMs sem nenhum veículo restante compatível em que caibam sozinhas
+    #   por peso e volume: ficam fixas como não alocadas
+    # Remover um veículo pode deixar UMs sem opção e remover UMs reduz a
+    # demanda dos veículos, então as regras são aplicadas até nada mudar.
+    #
+    # Retorna a instância reduzida e um relatório com o motivo de cada
+    # remoção e o custo fixo (peso * penalidade) das UMs removidas, que deve
+    # ser somado ao objetivo do modelo reduzido.
+
+    ums = instancia["ums"]
+    veiculos = instancia["veiculos"]
+
+    peso = np.array([um["peso"] for um in ums], dtype=float)
+    volume = np.array([um["volume"] for um in ums], dtype=float)
+    penalidade = np.array([um["penalidade"] for um in ums], dtype=float)
+    cap_peso = np.array([v["capacidade_peso"] for v in veiculos], dtype=float)
+    cap_volume = np.array([v["capacidade_volume"] for v in veiculos], dtype=float)
+    carga_minima = np.array([v["carga_minima"] for v in veiculos], dtype=float)
+
+    regioes_com_clientes = {c["destino"] for c in instancia["clientes"]}
+    com_clientes = np.array([v["destino"] in regioes_com_clientes for v in veiculos],
+                            dtype=bool)
+
+    compativel = matriz_compatibilidade(ums, veiculos)
+    cabe = ((peso[:, None] <= cap_peso[None, :])
+            & (volume[:, None] <= cap_volume[None, :]))
+
+    motivo_veiculo = {}
+    veiculo_ativo = np.ones(len(veiculos), dtype=bool)
+    um_ativa = np.ones(len(ums), dtype=bool)
+
+    for j in np.flatnonzero(~com_clientes):
+        motivo_veiculo[j] = MOTIVO_SEM_CLIENTES
+    for j in np.flatnonzero(com_clientes & (carga_minima > cap_peso)):
+        motivo_veiculo[j] = MOTIVO_CARGA_MINIMA
+    veiculo_ativo[list(motivo_veiculo)] = False
+
+    while True:
+        utilizavel = compativel & cabe & veiculo_ativo[None, :] & um_ativa[:, None]
+
+        demanda = peso @ utilizavel
+        sem_demanda = veiculo_ativo & (demanda < carga_minima)
+        sem_veiculo = um_ativa & ~utilizavel.any(axis=1)
+
+        if not sem_demanda.any() and not sem_veiculo.any():
+            break
+
+        for j in np.flatnonzero(sem_demanda):
+            motivo_veiculo[j] = MOTIVO_DEMANDA
+        veiculo_ativo &= ~sem_demanda
+        um_ativa &= ~sem_veiculo
+
+    # O motivo de cada UM removida é o mais básico que se aplica a ela
+    qualquer_compativel = compativel.any(axis=1)
+    compativel_cabe = (compativel & cabe).any(axis=1)
+
+    ums_removidas = []
+    for k in np.flatnonzero(~um_ativa):
+        if not qualquer_compativel[k]:
+            motivo = MOTIVO_INCOMPATIBILIDADE
+        elif not compativel_cabe[k]:
+            motivo = MOTIVO_CAPACIDADE
+        else:
+            motivo = MOTIVO_SEM_VEICULO
+        ums_removidas.append({'id': ums[k]["id"], 'motivo': motivo})
+
+    veiculos_removidos = [{'id': veiculos[j]["id"], 'motivo': motivo_veiculo[j]}
+                          for j in sorted(motivo_veiculo)]
+
+    reduzida = dict(instancia)
+    reduzida["ums"] = [um for um, ativa in zip(ums, um_ativa) if ativa]
+    reduzida["veiculos"] = [v for v, ativo in zip(veiculos, veiculo_ativo) if ativo]
+
+    relatorio = {
+        'ums_removidas': ums_removidas,
+        'veiculos_removidos': veiculos_removidos,
+        'custo_fixo': float(np.sum(peso[~um_ativa] * penalidade[~um_ativa])),
+    }
+
+    return reduzida, relatorio
+
+
+def imprimir_preprocessamento(relatorio):
+    if not relatorio:
+        return
+
+    print(f"\n🧹 PRÉ-PROCESSAMENTO:")
+    print(f"  UMs fixadas como não alocadas: {len(relatorio['ums_removidas'])}")
+    print(f"  Veículos removidos: {len(relatorio['veiculos_removidos'])}")
+    for v in relatorio['veiculos_removidos']:
+        print(f"    Veículo {v['id']}: {v['motivo']}")
+    if relatorio['ums_removidas']:
+        print(f"  Custo fixo de não alocação: R${relatorio['custo_fixo']:.2f}")
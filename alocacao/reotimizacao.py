@@ -0,0 +1,318 @@
+import copy
+import json
+import time
+
+import gurobipy as gp
+from gurobipy import GRB
+
+from .config import PASTA_RESULTADOS, TIMEOUT
+from .io import carregar_instancia, nome_instancia
+from .model import criar_modelo
+from .solve import configurar_modelo, extrair_resultados
+
+# Reotimização incremental: a sessão guarda o modelo de criar_modelo, as
+# restrições por nome e a última solução. Cada alteração mexe só nas
+# variáveis e restrições afetadas e a nova otimização parte da solução
+# anterior (MIP start), ajustada para continuar viável depois da alteração.
+#
+# O modelo é montado sobre a instância completa, sem preprocessar_instancia:
+# uma UM ou veículo removido no pré-processamento pode voltar a ser útil
+# depois de uma alteração (ex.: aumento de capacidade).
+#
+# A constante do objetivo (peso * penalidade de todas as UMs) fica na sessão
+# e é atribuída inteira a ObjCon: antes de modelo.update(), ObjCon devolve o
+# valor antigo, e somar sobre ele perderia as alterações anteriores à
+# reotimização.
+
+TEMPO_LIMITE_REOTIMIZACAO = 60
+
+
+def criar_sessao(instancia, nome='reotimizacao', tempo_limite=TIMEOUT, threads=None,
+                 pasta_logs=PASTA_RESULTADOS):
+
+    # A sessão altera a instância conforme as alterações chegam; a do
+    # chamador fica intacta
+    instancia = copy.deepcopy(instancia)
+
+    modelo, x, y, alpha = criar_modelo(instancia)
+    configurar_modelo(modelo, nome, tempo_limite, threads, pasta_logs)
+    modelo.update()
+
+    return {
+        'instancia': instancia,
+        'modelo': modelo,
+        'x': x,
+        'y': y,
+        'alpha': alpha,
+        'restricoes': {r.ConstrName: r for r in modelo.getConstrs()},
+        'constante': modelo.ObjCon,
+        'solucao': None,
+        'historico': [],
+    }
+
+
+def _um(sessao, um_id):
+    for um in sessao['instancia']['ums']:
+        if um['id'] == um_id:
+            return um
+    raise KeyError(f"UM {um_id} não existe na sessão")
+
+
+def _veiculo(sessao, veiculo_id):
+    for v in sessao['instancia']['veiculos']:
+        if v['id'] == veiculo_id:
+            return v
+    raise KeyError(f"Veículo {veiculo_id} não existe na sessão")
+
+
+def _zerar_veiculo_na_solucao(sessao, veiculo_id):
+    # A carga atual do veículo deixa de ser viável (veículo desativado ou
+    # capacidade reduzida): no MIP start as UMs dele ficam não alocadas
+    solucao = sessao['solucao']
+    if solucao is None:
+        return
+
+    for chave in solucao['x']:
+        if chave[1] == veiculo_id:
+            solucao['x'][chave] = 0.0
+    for chave in solucao['y']:
+        if chave[0] == veiculo_id:
+            solucao['y'][chave] = 0.0
+    solucao['alpha'][veiculo_id] = 0.0
+
+
+def _somar_constante(sessao, valor):
+    sessao['constante'] += valor
+    sessao['modelo'].ObjCon = sessao['constante']
+
+
+def adicionar_um(sessao, um):
+    # Mesmas variáveis e restrições que criar_modelo monta para a UM; os
+    # coeficientes nas restrições de capacidade e carga mínima de cada
+    # veículo entram pela coluna da variável
+
+    modelo, x, y = sessao['modelo'], sessao['x'], sessao['y']
+    restricoes = sessao['restricoes']
+    instancia = sessao['instancia']
+    beta_v = 1
+
+    if any(u['id'] == um['id'] for u in instancia['ums']):
+        raise ValueError(f"UM {um['id']} já existe na sessão")
+
+    compativeis = [vc.strip() for vc in um['compatibilidade'].split(',')]
+
+    for v in instancia['veiculos']:
+        coluna = gp.Column(
+            [um['peso'], um['volume'], um['peso']],
+            [restricoes[f"cap_peso_{v['id']}"], restricoes[f"cap_vol_{v['id']}"],
+             restricoes[f"frete_morto_minimo_{v['id']}"]])
+        gamma = 1 if v['tipo'] in compativeis else 0
+
+        for c in instancia['clientes']:
+            chave = (um['id'], v['id'], c['id'])
+            x[chave] = modelo.addVar(vtype=GRB.BINARY,
+                                     obj=-um['peso'] * (um['penalidade'] + beta_v),
+                                     column=coluna, name=f"x_{um['id']}_{v['id']}_{c['id']}")
+
+            novas = {
+                f"compat_{um['id']}_{v['id']}_{c['id']}": x[chave] <= gamma,
+                f"aloc_uso_{um['id']}_{v['id']}_{c['id']}": x[chave] <= y[(v['id'], c['id'])],
+                f"destino_{um['id']}_{v['id']}_{c['id']}":
+                    x[chave] <= (1 if v['destino'] == c['destino'] else 0),
+            }
+            for nome, restricao in novas.items():
+                restricoes[nome] = modelo.addConstr(restricao, name=nome)
+
+    nome = f"alocacao_unica_{um['id']}"
+    restricoes[nome] = modelo.addConstr(
+        gp.quicksum(x[(um['id'], v['id'], c['id'])]
+                    for v in instancia['veiculos'] for c in instancia['clientes']) <= 1,
+        name=nome)
+
+    _somar_constante(sessao, um['peso'] * um['penalidade'])
+    instancia['ums'].append(dict(um))
+
+
+def remover_um(sessao, um_id):
+
+    modelo, x = sessao['modelo'], sessao['x']
+    restricoes = sessao['restricoes']
+    instancia = sessao['instancia']
+    um = _um(sessao, um_id)
+
+    for v in instancia['veiculos']:
+        for c in instancia['clientes']:
+            chave = (um_id, v['id'], c['id'])
+            modelo.remove(x.pop(chave))
+            for prefixo in ('compat', 'aloc_uso', 'destino'):
+                modelo.remove(restricoes.pop(f"{prefixo}_{um_id}_{v['id']}_{c['id']}"))
+            if sessao['solucao'] is not None:
+                sessao['solucao']['x'].pop(chave, None)
+
+    modelo.remove(restricoes.pop(f"alocacao_unica_{um_id}"))
+
+    _somar_constante(sessao, -um['peso'] * um['penalidade'])
+    instancia['ums'].remove(um)
+
+
+def desativar_veiculo(sessao, veiculo_id):
+    # alpha = 0 desliga y e x do veículo pelas restrições de ativação
+    _veiculo(sessao, veiculo_id)
+    sessao['alpha'][veiculo_id].UB = 0
+    _zerar_veiculo_na_solucao(sessao, veiculo_id)
+
+
+def reativar_veiculo(sessao, veiculo_id):
+    _veiculo(sessao, veiculo_id)
+    sessao['alpha'][veiculo_id].UB = 1
+
+
+def alterar_penalidade(sessao, um_id, penalidade):
+    # A penalidade aparece no coeficiente de x da UM e na constante do
+    # objetivo (peso * penalidade de todas as UMs)
+
+    um = _um(sessao, um_id)
+    beta_v = 1
+
+    for v in sessao['instancia']['veiculos']:
+        for c in sessao['instancia']['clientes']:
+            sessao['x'][(um_id, v['id'], c['id'])].Obj = -um['peso'] * (penalidade + beta_v)
+
+    _somar_constante(sessao, um['peso'] * (penalidade - um['penalidade']))
+    um['penalidade'] = penalidade
+
+
+def alterar_capacidade(sessao, veiculo_id, capacidade_peso=None, capacidade_volume=None):
+    # A capacidade de peso também entra no frete morto (beta * capacidade *
+    # alpha). Se diminuir, a carga anterior pode não caber mais e sai do
+    # MIP start.
+
+    v = _veiculo(sessao, veiculo_id)
+    restricoes = sessao['restricoes']
+    beta_v = 1
+    reduziu = False
+
+    if capacidade_peso is not None:
+        restricoes[f"cap_peso_{veiculo_id}"].RHS = capacidade_peso
+        sessao['alpha'][veiculo_id].Obj = beta_v * capacidade_peso + v['custo']
+        reduziu = reduziu or capacidade_peso < v['capacidade_peso']
+        v['capacidade_peso'] = capacidade_peso
+
+    if capacidade_volume is not None:
+        restricoes[f"cap_vol_{veiculo_id}"].RHS = capacidade_volume
+        reduziu = reduziu or capacidade_volume < v['capacidade_volume']
+        v['capacidade_volume'] = capacidade_volume
+
+    if reduziu:
+        _zerar_veiculo_na_solucao(sessao, veiculo_id)
+
+
+# Alterações no formato {'tipo': ..., parâmetros}, ex.:
+#   {"tipo": "remover_um", "um_id": 12}
+#   {"tipo": "alterar_capacidade", "veiculo_id": 3, "capacidade_peso": 20000}
+ALTERACOES = {
+    'adicionar_um': adicionar_um,
+    'remover_um': remover_um,
+    'desativar_veiculo': desativar_veiculo,
+    'reativar_veiculo': reativar_veiculo,
+    'alterar_penalidade': alterar_penalidade,
+    'alterar_capacidade': alterar_capacidade,
+}
+
+
+def aplicar_alteracoes(sessao, alteracoes):
+
+    for alteracao in alteracoes:
+        parametros = dict(alteracao)
+        tipo = parametros.pop('tipo')
+        if tipo not in ALTERACOES:
+            raise ValueError(f"Alteração desconhecida: {tipo}")
+        ALTERACOES[tipo](sessao, **parametros)
+        sessao['historico'].append(alteracao)
+
+
+def carregar_alteracoes(caminho):
+    with open(caminho, mode='r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def reotimizar(sessao, tempo_limite=None):
+    # Otimiza a partir da última solução. Variáveis novas (UMs adicionadas)
+    # começam em 0, o que mantém o MIP start viável. Retorna os KPIs de
+    # extrair_resultados com o objetivo, o limite e o tempo.
+
+    modelo = sessao['modelo']
+    x, y, alpha = sessao['x'], sessao['y'], sessao['alpha']
+
+    if tempo_limite is not None:
+        modelo.Params.TimeLimit = tempo_limite
+
+    solucao = sessao['solucao']
+    if solucao is not None:
+        for nome, variaveis in (('x', x), ('y', y), ('alpha', alpha)):
+            modelo.setAttr('Start', list(variaveis.values()),
+                           [solucao[nome].get(chave, 0.0) for chave in variaveis])
+
+    inicio = time.perf_counter()
+    modelo.optimize()
+    tempo = time.perf_counter() - inicio
+
+    resultados = {
+        'status': modelo.status,
+        'tempo_execucao': tempo,
+        'melhor_solucao': modelo.ObjVal if modelo.SolCount > 0 else None,
+        'solucao_relaxada': modelo.ObjBound if modelo.SolCount > 0 else None,
+        'gap_otimizacao': modelo.MIPGap * 100 if modelo.SolCount > 0 else None,
+        'alteracoes': len(sessao['historico']),
+    }
+
+    if modelo.SolCount > 0:
+        sessao['solucao'] = {
+            'x': modelo.getAttr('X', x),
+            'y': modelo.getAttr('X', y),
+            'alpha': modelo.getAttr('X', alpha),
+        }
+        resultados.update(extrair_resultados(
+            sessao['instancia'], sessao['solucao']['x'], sessao['solucao']['alpha']))
+        resultados['custo_total'] = modelo.ObjVal
+
+    return resultados
+
+
+def encerrar_sessao(sessao):
+    sessao['modelo'].dispose()
+
+
+def executar_reotimizacao(caminho_arquivo, caminho_alteracoes, tempo_limite=TIMEOUT,
+                          tempo_limite_reotimizacao=TEMPO_LIMITE_REOTIMIZACAO, threads=None,
+                          pasta_logs=PASTA_RESULTADOS):
+    # Resolve a instância e, em seguida, cada grupo de alterações do arquivo
+    # JSON (uma lista de listas de alterações) com reotimização a quente
+
+    tipo_instancia = nome_instancia(caminho_arquivo)
+    grupos = carregar_alteracoes(caminho_alteracoes)
+
+    sessao = criar_sessao(carregar_instancia(caminho_arquivo), f"{tipo_instancia}_reotimizacao",
+                          tempo_limite, threads, pasta_logs)
+    sessao['modelo'].Params.LogToConsole = 0
+
+    try:
+        rodadas = [reotimizar(sessao)]
+        _imprimir_rodada(0, [], rodadas[-1])
+
+        for numero, alteracoes in enumerate(grupos, start=1):
+            aplicar_alteracoes(sessao, alteracoes)
+            rodadas.append(reotimizar(sessao, tempo_limite_reotimizacao))
+            _imprimir_rodada(numero, alteracoes, rodadas[-1])
+    finally:
+        encerrar_sessao(sessao)
+
+    return rodadas
+
+
+def _imprimir_rodada(numero, alteracoes, resultados):
+    descricao = ', '.join(a['tipo'] for a in alteracoes) or 'instância inicial'
+    custo = resultados['melhor_solucao']
+    print(f"🔁 [{numero}] {descricao}: "
+          f"{'sem solução' if custo is None else f'custo {custo:.2f}'} "
+          f"(gap {resultados['gap_otimizacao'] or 0:.2f}%, {resultados['tempo_execucao']:.2f} s)")
@@ -0,0 +1,429 @@
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+from gurobipy import GRB
+
+from .config import PASTA_RESULTADOS
+from .io import carregar_resultados, matriz_compatibilidade
+from .perfil import imprimir_etapas
+
+
+# Rótulos curtos do status, usados no relatório CSV e no gráfico de status
+ROTULOS_STATUS = {
+    GRB.OPTIMAL: "Ótimo",
+    GRB.TIME_LIMIT: "Timeout",
+    GRB.ITERATION_LIMIT: "Limite de iterações",
+    GRB.SUBOPTIMAL: "Subótimo",
+    GRB.INTERRUPTED: "Interrompido",
+    GRB.INFEASIBLE: "Inviável",
+    GRB.INF_OR_UNBD: "Infinito/Ilimitado",
+    GRB.UNBOUNDED: "Ilimitado"
+}
+
+# Status cujos custos, veículos e UMs são detalhados
+STATUS_COM_SOLUCAO = (GRB.OPTIMAL, GRB.TIME_LIMIT, GRB.ITERATION_LIMIT, GRB.SUBOPTIMAL,
+                      GRB.INTERRUPTED)
+
+
+def imprimir_resultados_detalhados(resultados):
+    print(f"\n{'='*80}")
+    print(
+        f" 🟢 RESULTADOS PARA INSTÂNCIA: {resultados['tipo_instancia'].upper()}")
+    print(f"{'='*80}")
+
+    status_map = {
+        GRB.OPTIMAL: "Ótimo encontrado",
+        GRB.TIME_LIMIT: "Tempo limite atingido",
+        GRB.ITERATION_LIMIT: "Limite de iterações atingido",
+        GRB.SUBOPTIMAL: "Parada antes de provar a otimalidade",
+        GRB.INTERRUPTED: "Interrompida",
+        GRB.INFEASIBLE: "Problema inviável",
+        GRB.INF_OR_UNBD: "Infinito ou ilimitado",
+        GRB.UNBOUNDED: "Ilimitado"
+    }
+
+    print(
+        f"\n🔷 Status: {status_map.get(resultados['status'], 'Desconhecido')}")
+    print(f"⏳ Tempo de execução: {resultados['tempo_execucao']:.2f} segundos")
+
+    if resultados['status'] == GRB.OPTIMAL:
+        print(
+            f"⏱️ Tempo para encontrar o ótimo: {resultados['tempo_para_otimo']:.2f} segundos")
+
+    print(
+        f"💰 Melhor solução encontrada: {resultados['melhor_solucao'] if resultados['melhor_solucao'] is not None else 'N/A'}")
+    print(
+        f"🔮 Solução relaxada: {resultados['solucao_relaxada'] if resultados['solucao_relaxada'] is not None else 'N/A'}")
+    print(
+        f"📊 GAP de otimização: {resultados['gap_otimizacao']:.2f}%" if resultados['gap_otimizacao'] is not None else "N/A")
+
+    if resultados['status'] in STATUS_COM_SOLUCAO:
+
+        def safe_format(value, fmt=".2f", prefix=""):
+            return f"{prefix}{value:{fmt}}" if value is not None else "N/A"
+
+        print(f"\n💵 CUSTOS:")
+        print(
+            f"  Total: {safe_format(resultados.get('custo_total'), '.2f', 'R$')}")
+        print(
+            f"  - Transporte: {safe_format(resultados.get('custo_transporte'), '.2f', 'R$')}")
+        print(
+            f"  - Frete morto: {safe_format(resultados.get('frete_morto_total'), '.2f', 'R$')}")
+        print(
+            f"  - Não alocação: {safe_format(resultados.get('custo_nao_alocacao'), '.2f', 'R$')}")
+
+        print(f"\n🚚 VEÍCULOS:")
+        print(f"  Ativos: {resultados.get('veiculos_ativos', 'N/A')}")
+        print(f"  Inativos: {resultados.get('veiculos_inativos', 'N/A')}")
+
+        for aloc in resultados.get('alocacoes', []):
+            print(
+                f"\n  Veículo {aloc.get('veiculo_id', 'N/A')} ({aloc.get('veiculo_tipo', 'N/A')} para {aloc.get('destino', 'N/A')}):")
+            print(f"    Cargas: {aloc.get('cargas', 'N/A')}")
+            print(f"    Peso: {safe_format(aloc.get('peso_total'), '.2f', '')}kg (min: {safe_format(aloc.get('peso_minimo'), '.2f', '')}kg, cap: {safe_format(aloc.get('capacidade_peso'), '.2f', '')}kg)")
+            print(
+                f"    Volume: {safe_format(aloc.get('volume_total'), '.2f', '')}m³ (cap: {safe_format(aloc.get('capacidade_volume'), '.2f', '')}m³)")
+            print(
+                f"    Utilização: {safe_format(aloc.get('taxa_utilizacao_peso'), '.1f', '')}% (peso), {safe_format(aloc.get('taxa_utilizacao_volume'), '.1f', '')}% (volume)")
+            print(
+                f"    Custo: {safe_format(aloc.get('custo_veiculo'), '.2f', 'R$')}")
+            if aloc.get('frete_morto', 0) > 0:
+                print(
+                    f"    ℹ️ Frete morto: {safe_format(aloc.get('frete_morto'), '.2f', 'R$')}")
+
+        print(f"\n📦 CARGAS NÃO ALOCADAS:")
+        print(
+            f"  Quantidade: {resultados.get('ums_nao_alocadas', 'N/A')} de {resultados.get('ums_alocadas', 0) + resultados.get('ums_nao_alocadas', 0)}")
+        print(
+            f"  Peso total: {safe_format(resultados.get('peso_nao_alocado'), '.2f', '')}kg")
+        print(
+            f"  Volume total: {safe_format(resultados.get('volume_nao_alocado'), '.2f', '')}m³")
+
+        print(f"\n🔍 ANÁLISE DE DECISÕES:")
+        if resultados.get('frete_morto_total', 0) > 0:
+            print("  ℹ️ Há fretes mortos - veículos operando abaixo da capacidade mínima")
+        else:
+            print("  ✅ Nenhum frete morto - todos veículos atendem carga mínima")
+
+        if resultados.get('ums_nao_alocadas', 0) > 0:
+            print(
+                f"  ℹ️ {resultados.get('ums_nao_alocadas', 0)} UMs não alocadas - verifique se é por restrições ou decisão ótima")
+        else:
+            print("  ✅ Todas UMs alocadas")
+
+        if resultados.get('veiculos_inativos', 0) > 0:
+            print(
+                f"  ℹ️ {resultados.get('veiculos_inativos', 0)} veículos inativos - verifique se é esperado")
+
+    imprimir_etapas(resultados.get('etapas'))
+
+    print(f"\n{'='*80}")
+
+
+def _possui_veiculo_compativel(instancia):
+
+    if not instancia.get('veiculos'):
+        return np.zeros(len(instancia.get('ums', [])), dtype=bool)
+
+    return matriz_compatibilidade(instancia.get('ums', []), instancia['veiculos']).any(axis=1)
+
+
+def _motivos_nao_alocacao(resultados, instancia):
+    # Motivo de não alocação de cada UM, na ordem de instancia['ums']: o
+    # motivo exato do pré-processamento, quando a UM foi removida antes do
+    # solver; senão, incompatibilidade com toda a frota ou decisão do modelo.
+
+    removidas = {um['id']: um['motivo']
+                 for um in (resultados.get('preprocessamento') or {}).get('ums_removidas', [])}
+    possui_compativel = _possui_veiculo_compativel(instancia)
+
+    motivos = []
+    for k, um in enumerate(instancia.get('ums', [])):
+        if um.get('id') in removidas:
+            motivos.append(removidas[um.get('id')])
+        elif not possui_compativel[k]:
+            motivos.append("Incompatibilidade")
+        else:
+            motivos.append("Decisão ótima")
+
+    return motivos
+
+
+def _escrever_relatorio_instancia(writer, resultados, instancia):
+
+    writer.writerow(
+        [f"INSTÂNCIA: {resultados.get('tipo_instancia', 'N/A')}"])
+    writer.writerow([])
+
+    writer.writerow([
+        "Status", "Tempo Total (s)", "Tempo para Ótimo (s)",
+        "Melhor Solução", "Solução Relaxada", "GAP (%)", "Custo Total",
+        "Custo Transporte", "Frete Morto", "Custo Não Alocação",
+        "Veículos Ativos", "Veículos Inativos", "UMs Alocadas", "UMs Não Alocadas",
+        "Peso Não Alocado", "Volume Não Alocado"
+    ])
+
+    writer.writerow([
+        ROTULOS_STATUS.get(resultados.get('status'), "Desconhecido"),
+        f"{resultados.get('tempo_execucao', 0):.2f}",
+        f"{resultados.get('tempo_para_otimo', 0):.2f}" if resultados.get(
+            'tempo_para_otimo') is not None else "N/A",
+        f"{resultados.get('melhor_solucao', 0):.2f}" if resultados.get(
+            'melhor_solucao') is not None else "N/A",
+        f"{resultados.get('solucao_relaxada', 0):.2f}" if resultados.get(
+            'solucao_relaxada') is not None else "N/A",
+        f"{resultados.get('gap_otimizacao', 0):.2f}" if resultados.get(
+            'gap_otimizacao') is not None else "N/A",
+        f"{resultados.get('custo_total', 0):.2f}" if resultados.get(
+            'custo_total') is not None else "N/A",
+        f"{resultados.get('custo_transporte', 0):.2f}",
+        f"{resultados.get('frete_morto_total', 0):.2f}",
+        f"{resultados.get('custo_nao_alocacao', 0):.2f}",
+        resultados.get('veiculos_ativos', 0),
+        resultados.get('veiculos_inativos', 0),
+        resultados.get('ums_alocadas', 0),
+        resultados.get('ums_nao_alocadas', 0),
+        f"{resultados.get('peso_nao_alocado', 0):.2f}",
+        f"{resultados.get('volume_nao_alocado', 0):.2f}"
+    ])
+    writer.writerow([])
+
+    etapas = resultados.get('etapas') or {}
+    if etapas:
+        writer.writerow(["TEMPOS POR ETAPA"])
+        writer.writerow(
+            ["Etapa", "Tempo (s)", "Tempo CPU (s)", "Pico de Memória (MiB)"])
+        for nome, medicao in etapas.items():
+            pico = medicao.get('pico_memoria_mb')
+            writer.writerow([
+                nome,
+                f"{medicao.get('tempo', 0):.3f}",
+                f"{medicao.get('tempo_cpu', 0):.3f}",
+                f"{pico:.1f}" if pico is not None else "N/A"
+            ])
+        writer.writerow([])
+
+    veiculos_removidos = (resultados.get('preprocessamento') or {}).get(
+        'veiculos_removidos', [])
+    if veiculos_removidos:
+        writer.writerow(["VEÍCULOS REMOVIDOS NO PRÉ-PROCESSAMENTO"])
+        writer.writerow(["ID", "Motivo"])
+        for v in veiculos_removidos:
+            writer.writerow([v['id'], v['motivo']])
+        writer.writerow([])
+
+    writer.writerow(["VEÍCULOS ATIVOS"])
+    writer.writerow([
+        "ID", "Tipo", "Destino", "Cargas", "Peso Total (kg)",
+        "Capacidade (kg)", "Utilização Peso(%)", "Capacidade (m3)", "Utilização Vol(%)"
+    ])
+
+    for aloc in resultados.get('alocacoes', []):
+        writer.writerow([
+            aloc.get('veiculo_id', ''),
+            aloc.get('veiculo_tipo', ''),
+            aloc.get('destino', ''),
+            ";".join(map(str, aloc.get('cargas', []))),
+            aloc.get('peso_total', ''),
+            aloc.get('capacidade_peso', ''),
+            f"{aloc.get('taxa_utilizacao_peso', 0):.1f}",
+            aloc.get('volume_total', ''),
+            aloc.get('capacidade_volume', ''),
+            f"{aloc.get('taxa_utilizacao_volume', 0):.1f}"
+        ])
+    writer.writerow([])
+
+    writer.writerow(["UNIDADES METÁLICAS NÃO ALOCADAS"])
+    writer.writerow([
+        "ID", "Tipo", "Peso (kg)", "Volume (m³)", "Cliente",
+        "Destino", "Compatibilidade", "Motivo"
+    ])
+
+    alocados_ids = set()
+    for aloc in resultados.get('alocacoes', []):
+        alocados_ids.update(aloc.get('cargas', []))
+
+    clientes_por_id = {c.get('id'): c for c in instancia.get('clientes', [])}
+    motivos = _motivos_nao_alocacao(resultados, instancia)
+
+    for um, motivo in zip(instancia.get('ums', []), motivos):
+        if um.get('id') not in alocados_ids:
+
+            cliente = clientes_por_id.get(um.get('cliente'), {})
+
+            writer.writerow([
+                um.get('id', ''),
+                um.get('tipo', ''),
+                um.get('peso', ''),
+                um.get('volume', ''),
+                cliente.get('nome', ''),
+                um.get('destino', ''),
+                um.get('compatibilidade', ''),
+                motivo
+            ])
+
+    writer.writerow([])
+    writer.writerow(["-"*50])
+    writer.writerow([])
+
+
+def exportar_resultados_csv(resultados_lista, instancias_originais, pasta_saida=PASTA_RESULTADOS):
+
+    if not resultados_lista or not instancias_originais or len(resultados_lista) != len(instancias_originais):
+        raise ValueError(
+            "Listas de resultados e instâncias originais não correspondem")
+
+    return _exportar_relatorio(zip(resultados_lista, instancias_originais), pasta_saida)
+
+
+def exportar_relatorio_resultados_salvos(caminhos, pasta_saida=PASTA_RESULTADOS):
+    # Mesmo relatório de exportar_resultados_csv, lendo uma instância salva
+    # por vez em vez de manter todas em memória.
+
+    return _exportar_relatorio((carregar_resultados(caminho) for caminho in caminhos), pasta_saida)
+
+
+def _exportar_relatorio(pares_resultados_instancia, caminho_saida):
+
+    os.makedirs(caminho_saida, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    nome_arquivo = f"resultados_completos_{timestamp}.csv"
+    caminho_completo = os.path.join(caminho_saida, nome_arquivo)
+
+    with open(caminho_completo, mode='w', newline='', encoding='utf-8') as file:
+
+        writer = csv.writer(file, delimiter=';')
+
+        writer.writerow(["RELATÓRIO DE OTIMIZAÇÃO"])
+        writer.writerow(
+            ["Gerado em:", datetime.now().strftime('%d/%m/%Y %H:%M:%S')])
+        writer.writerow([])
+
+        for resultados, instancia in pares_resultados_instancia:
+            if not resultados or not instancia:
+                continue
+
+            if 'ums' not in instancia or 'clientes' not in instancia:
+                print(
+                    f"⚠️ Estrutura inválida na instância {resultados.get('tipo_instancia', 'desconhecida')}")
+                continue
+
+            _escrever_relatorio_instancia(writer, resultados, instancia)
+
+    print(f"\n✅ Relatório salvo em: {caminho_completo}")
+
+    return caminho_completo
+
+
+COLUNAS_RESUMO = [
+    'instancia', 'status', 'tempo_execucao', 'tempo_para_otimo', 'melhor_solucao',
+    'solucao_relaxada', 'gap_otimizacao', 'custo_total', 'custo_transporte',
+    'frete_morto_total', 'custo_nao_alocacao', 'veiculos_ativos', 'veiculos_inativos',
+    'ums_alocadas', 'ums_nao_alocadas', 'peso_nao_alocado', 'volume_nao_alocado',
+    'tempo_carregamento', 'tempo_construcao_modelo', 'tempo_otimizacao', 'tempo_extracao',
+    'pico_memoria_mb'
+]
+
+COLUNAS_ALOCACOES = [
+    'instancia', 'um_id', 'um_tipo', 'peso', 'volume', 'cliente_id', 'cliente_nome',
+    'destino', 'alocada', 'veiculo_id', 'veiculo_tipo', 'motivo'
+]
+
+# Colunas inteiras com valores ausentes (UM não alocada não tem veículo): no
+# parquet viram inteiros anuláveis em vez de uma coluna object mista
+TIPOS_PARQUET = {'veiculo_id': 'Int64'}
+
+
+def linhas_resultados_instancia(resultados, instancia):
+    # Linhas tidy de uma instância: um resumo e uma linha por UM, alocada ou não
+
+    nome = resultados['tipo_instancia']
+
+    resumo = {coluna: resultados.get(coluna) for coluna in COLUNAS_RESUMO}
+    resumo['instancia'] = nome
+
+    # Só as etapas concluídas antes da exportação: a própria exportação e as
+    # visualizações ficam no JSON salvo e no relatório final
+    etapas = resultados.get('etapas') or {}
+    for etapa in ('carregamento', 'construcao_modelo', 'otimizacao', 'extracao'):
+        resumo[f'tempo_{etapa}'] = etapas.get(etapa, {}).get('tempo')
+    picos = [m['pico_memoria_mb'] for m in etapas.values()
+             if m.get('pico_memoria_mb') is not None]
+    resumo['pico_memoria_mb'] = max(picos) if picos else None
+
+    veiculo_da_um = {}
+    for aloc in resultados.get('alocacoes', []):
+        for um_id in aloc.get('cargas', []):
+            veiculo_da_um[um_id] = aloc
+
+    clientes_por_id = {c['id']: c for c in instancia.get('clientes', [])}
+    motivos = _motivos_nao_alocacao(resultados, instancia)
+
+    alocacoes = []
+    for um, motivo in zip(instancia.get('ums', []), motivos):
+        aloc = veiculo_da_um.get(um['id'])
+
+        if aloc is not None:
+            motivo = ''
+
+        alocacoes.append({
+            'instancia': nome,
+            'um_id': um['id'],
+            'um_tipo': um['tipo'],
+            'peso': um['peso'],
+            'volume': um['volume'],
+            'cliente_id': um['cliente'],
+            'cliente_nome': clientes_por_id.get(um['cliente'], {}).get('nome', ''),
+            'destino': um['destino'],
+            'alocada': int(aloc is not None),
+            'veiculo_id': aloc['veiculo_id'] if aloc is not None else None,
+            'veiculo_tipo': aloc['veiculo_tipo'] if aloc is not None else '',
+            'motivo': motivo
+        })
+
+    return resumo, alocacoes
+
+
+def _anexar_csv(caminho, colunas, linhas):
+
+    novo = not os.path.exists(caminho) or os.path.getsize(caminho) == 0
+
+    with open(caminho, mode='a', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=colunas, delimiter=';')
+        if novo:
+            writer.writeheader()
+        writer.writerows(linhas)
+
+
+def exportar_resultados_incremental(resultados, instancia, pasta_saida, campanha, formato='csv'):
+    # Acrescenta o resumo e as linhas por UM de uma instância assim que ela
+    # termina, sem depender das demais instâncias da campanha. Em parquet cada
+    # instância vira um arquivo dentro da pasta da campanha (lido com
+    # pd.read_parquet na pasta).
+
+    resumo, alocacoes = linhas_resultados_instancia(resultados, instancia)
+    os.makedirs(pasta_saida, exist_ok=True)
+
+    if formato == 'csv':
+        _anexar_csv(os.path.join(pasta_saida, f"{campanha}_resumo.csv"),
+                    COLUNAS_RESUMO, [resumo])
+        _anexar_csv(os.path.join(pasta_saida, f"{campanha}_alocacoes.csv"),
+                    COLUNAS_ALOCACOES, alocacoes)
+
+    elif formato == 'parquet':
+        for sufixo, colunas, linhas in (('resumo', COLUNAS_RESUMO, [resumo]),
+                                        ('alocacoes', COLUNAS_ALOCACOES, alocacoes)):
+            pasta = os.path.join(pasta_saida, f"{campanha}_{sufixo}")
+            os.makedirs(pasta, exist_ok=True)
+            import pandas as pd
+
+            tabela = pd.DataFrame(linhas, columns=colunas)
+            tabela = tabela.astype({coluna: tipo for coluna, tipo in TIPOS_PARQUET.items()
+                                    if coluna in tabela.columns})
+            tabela.to_parquet(
+                os.path.join(pasta, f"{resultados['tipo_instancia']}.parquet"), index=False)
+
+    else:
+        raise ValueError(f"Formato de exportação desconhecido: {formato}")
@@ -0,0 +1,209 @@
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from gurobipy import GRB
+
+from .config import PASTA_RESULTADOS
+from .io import carregar_instancia, nome_instancia
+from .model import criar_modelo
+from .preprocess import preprocessar_instancia
+from .solve import criar_ambiente
+
+# Análise de sensibilidade dos custos: cada cenário multiplica as
+# penalidades das UMs e os custos dos veículos por um fator e troca o beta_v
+# do frete morto. Nenhum deles muda as restrições (nem o pré-processamento,
+# que só olha compatibilidade, capacidades e carga mínima), então o modelo é
+# montado uma vez por processo e cada cenário só reescreve os coeficientes
+# do objetivo:
+#
+#   x[i, v, c]:  -peso_i * (fator_penalidade * penalidade_i + beta_v)
+#   alpha[v]:    beta_v * capacidade_v + fator_custo * custo_v
+#   constante:   fator_penalidade * soma_i peso_i * penalidade_i
+#
+# A solução do cenário anterior continua viável e é o MIP start do próximo.
+# Os cenários são divididos em blocos contíguos, um por processo, para que
+# o cenário anterior seja o vizinho na grade.
+
+FATORES_PENALIDADE = [0.5, 0.75, 1.0, 1.25, 1.5, 2.0]
+BETAS = [1.0]
+FATORES_CUSTO = [1.0]
+TEMPO_LIMITE_CENARIO = 60
+PROCESSOS_SENSIBILIDADE = 2
+
+COLUNAS_SENSIBILIDADE = [
+    'cenario', 'fator_penalidade', 'beta_v', 'fator_custo', 'status', 'objetivo',
+    'variacao_objetivo', 'gap', 'tempo', 'ums_alocadas', 'veiculos_ativos',
+    'variacao_veiculos_ativos', 'ums_realocadas', 'ums_trocaram_alocacao'
+]
+
+
+def gerar_cenarios(fatores_penalidade=None, betas=None, fatores_custo=None):
+
+    grade = itertools.product(fatores_penalidade or FATORES_PENALIDADE, betas or BETAS,
+                              fatores_custo or FATORES_CUSTO)
+
+    return [{'cenario': k, 'fator_penalidade': fp, 'beta_v': beta, 'fator_custo': fc}
+            for k, (fp, beta, fc) in enumerate(grade)]
+
+
+def _aplicar_cenario(modelo, x, alpha, instancia, custo_fixo, cenario):
+    fp, beta, fc = cenario['fator_penalidade'], cenario['beta_v'], cenario['fator_custo']
+
+    por_id = {um["id"]: um for um in instancia["ums"]}
+    veiculos = {v["id"]: v for v in instancia["veiculos"]}
+
+    variaveis_x = list(x.values())
+    modelo.setAttr('Obj', variaveis_x, [
+        -por_id[chave[0]]["peso"] * (fp * por_id[chave[0]]["penalidade"] + beta)
+        for chave in x])
+    modelo.setAttr('Obj', list(alpha.values()), [
+        beta * veiculos[v_id]["capacidade_peso"] + fc * veiculos[v_id]["custo"]
+        for v_id in alpha])
+
+    modelo.ObjCon = fp * (sum(um["peso"] * um["penalidade"] for um in instancia["ums"])
+                          + custo_fixo)
+
+
+def resolver_cenarios(caminho, cenarios, tempo_limite=TEMPO_LIMITE_CENARIO, threads=None):
+    # Um bloco de cenários com um único modelo e um único ambiente do
+    # Gurobi. Retorna uma linha por cenário com a atribuição {UM: veículo}.
+
+    instancia, preprocessamento = preprocessar_instancia(carregar_instancia(caminho))
+
+    env = criar_ambiente(tempo_limite, threads, console=False)
+    modelo, x, alpha = None, None, None
+    linhas = []
+
+    try:
+        modelo, x, _, alpha = criar_modelo(instancia, env)
+        modelo.update()
+        variaveis = modelo.getVars()
+
+        for cenario in cenarios:
+            _aplicar_cenario(modelo, x, alpha, instancia, preprocessamento['custo_fixo'], cenario)
+
+            inicio = time.perf_counter()
+            modelo.optimize()
+            tempo = time.perf_counter() - inicio
+
+            linha = dict(cenario, status=modelo.status, tempo=tempo, objetivo=None, gap=None,
+                         atribuicao={}, veiculos_ativos=0)
+
+            if modelo.SolCount > 0:
+                linha['objetivo'] = modelo.ObjVal
+                linha['gap'] = modelo.MIPGap * 100 if modelo.IsMIP else 0.0
+                linha['atribuicao'] = {chave[0]: chave[1] for chave, valor
+                                       in modelo.getAttr('X', x).items() if valor > 0.5}
+                linha['veiculos_ativos'] = sum(
+                    valor > 0.5 for valor in modelo.getAttr('X', alpha).values())
+
+                modelo.setAttr('Start', variaveis, modelo.getAttr('X', variaveis))
+
+            linha['ums_alocadas'] = len(linha['atribuicao'])
+            linhas.append(linha)
+    finally:
+        if modelo is not None:
+            modelo.dispose()
+        env.dispose()
+
+    return linhas
+
+
+def comparar_cenarios(linhas):
+    # Variação de objetivo, veículos ativos e UMs que mudaram de veículo (ou
+    # entre alocada e não alocada) em relação ao cenário de referência: o
+    # dos fatores originais, se estiver na grade, ou o primeiro. Veículos
+    # iguais podem trocar de carga sem mudar a solução, por isso
+    # ums_trocaram_alocacao conta só as que passaram de alocada a não
+    # alocada ou o contrário.
+
+    referencia = next((linha for linha in linhas
+                       if (linha['fator_penalidade'], linha['beta_v'], linha['fator_custo'])
+                       == (1.0, 1.0, 1.0)), linhas[0])
+
+    for linha in linhas:
+        if linha['objetivo'] is None or referencia['objetivo'] is None:
+            linha['variacao_objetivo'] = None
+        else:
+            linha['variacao_objetivo'] = linha['objetivo'] - referencia['objetivo']
+
+        linha['variacao_veiculos_ativos'] = linha['veiculos_ativos'] - referencia['veiculos_ativos']
+
+        ums = set(linha['atribuicao']) | set(referencia['atribuicao'])
+        linha['ums_realocadas'] = sum(linha['atribuicao'].get(um_id)
+                                      != referencia['atribuicao'].get(um_id) for um_id in ums)
+        linha['ums_trocaram_alocacao'] = len(set(linha['atribuicao'])
+                                             ^ set(referencia['atribuicao']))
+
+    return linhas
+
+
+def executar_sensibilidade(caminho, cenarios=None, tempo_limite=TEMPO_LIMITE_CENARIO,
+                           processos=PROCESSOS_SENSIBILIDADE, threads=None,
+                           pasta_resultados=PASTA_RESULTADOS):
+
+    cenarios = gerar_cenarios() if cenarios is None else cenarios
+    processos = max(1, min(processos, len(cenarios)))
+
+    if threads is None:
+        threads = max(1, (os.cpu_count() or 1) // processos)
+
+    tamanho_bloco = -(-len(cenarios) // processos)
+    blocos = [cenarios[k:k + tamanho_bloco] for k in range(0, len(cenarios), tamanho_bloco)]
+
+    print(f"🔍 {len(cenarios)} cenários em {len(blocos)} processos")
+
+    linhas = []
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = [pool.submit(resolver_cenarios, caminho, bloco, tempo_limite, threads)
+                   for bloco in blocos]
+        for futuro in as_completed(futuros):
+            try:
+                linhas.extend(futuro.result())
+            except Exception as e:
+                print(f"❌ Erro em um bloco de cenários: {str(e)}")
+
+    if not linhas:
+        print("\n⚠️ Nenhum cenário foi resolvido!")
+        return None
+
+    linhas.sort(key=lambda linha: linha['cenario'])
+    comparar_cenarios(linhas)
+
+    os.makedirs(pasta_resultados, exist_ok=True)
+    arquivo = os.path.join(
+        pasta_resultados,
+        f"sensibilidade_{nome_instancia(caminho)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    with open(arquivo, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=COLUNAS_SENSIBILIDADE, delimiter=';',
+                                extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(linhas)
+
+    imprimir_sensibilidade(linhas)
+    print(f"\n✅ Sensibilidade salva em: {arquivo}")
+
+    return linhas
+
+
+def imprimir_sensibilidade(linhas):
+    print(f"\n{'='*80}")
+    print("📈 SENSIBILIDADE DOS CUSTOS")
+    print(f"{'='*80}")
+    print(f"{'Pen.':>6} {'Beta':>6} {'Custo':>6} {'Objetivo':>12} {'Variação':>11} "
+          f"{'UMs aloc.':>10} {'Veíc.':>6} {'Realocadas':>11} {'Trocaram':>9} {'Tempo (s)':>10}")
+
+    for linha in linhas:
+        objetivo = linha['objetivo']
+        variacao = linha['variacao_objetivo']
+        status = '' if linha['status'] == GRB.OPTIMAL else f" (status {linha['status']})"
+        print(f"{linha['fator_penalidade']:>6.2f} {linha['beta_v']:>6.2f} {linha['fator_custo']:>6.2f} "
+              f"{objetivo if objetivo is not None else float('nan'):>12.2f} "
+              f"{variacao if variacao is not None else float('nan'):>+11.2f} "
+              f"{linha['ums_alocadas']:>10} {linha['veiculos_ativos']:>6} "
+              f"{linha['ums_realocadas']:>11} {linha['ums_trocaram_alocacao']:>9} "
+              f"{linha['tempo']:>10.2f}{status}")
@@ -0,0 +1,294 @@
+import asyncio
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import gurobipy as gp
+from gurobipy import GRB
+
+from .config import PASTA_RESULTADOS, TIMEOUT
+from .io import carregar_instancia, nome_instancia
+from .solve import executar_instancia_com_timeout, executar_instancia_decomposicao
+
+# Serviço local de resolução: um processo de longa duração que recebe
+# instâncias por HTTP (TCP ou socket Unix), guarda-as em uma fila limitada e
+# as resolve em um número fixo de trabalhadores. Cada trabalhador tem o seu
+# ambiente do Gurobi, aberto uma vez na partida do serviço, e roda um
+# trabalho por vez em uma thread (o Gurobi libera o GIL durante optimize).
+#
+#   POST   /solucoes        {"instancia": {...}} ou {"arquivo": "caminho.csv"},
+#                           opcionais "nome", "metodo", "tempo_limite",
+#                           "preprocessar" -> {"id": ...}
+#   GET    /solucoes        resumo de todos os trabalhos
+#   GET    /solucoes/<id>   estado, progresso e, no fim, os resultados
+#   DELETE /solucoes/<id>   cancela (na fila ou em execução) ou descarta;
+#                           espacial em execução não é cancelável (409)
+#   GET    /saude           trabalhadores e tamanho da fila
+
+HOST_SERVICO = '127.0.0.1'
+PORTA_SERVICO = 8765
+TRABALHADORES_SERVICO = 2
+FILA_MAXIMA = 100
+
+ESTADOS_FINAIS = ('concluida', 'cancelada', 'erro')
+
+
+def criar_servico(trabalhadores=TRABALHADORES_SERVICO, threads=None, fila_maxima=FILA_MAXIMA,
+                  pasta_resultados=PASTA_RESULTADOS):
+
+    # Sem Threads, divide os núcleos entre os trabalhadores, como na varredura
+    if threads is None:
+        threads = max(1, (os.cpu_count() or 1) // trabalhadores)
+
+    envs = []
+    for _ in range(trabalhadores):
+        env = gp.Env(empty=True)
+        env.setParam('LogToConsole', 0)
+        env.start()
+        envs.append(env)
+
+    return {
+        'envs': envs,
+        'threads': threads,
+        'pasta_resultados': pasta_resultados,
+        'executor': ThreadPoolExecutor(max_workers=trabalhadores),
+        'fila': asyncio.Queue(maxsize=fila_maxima),
+        'trabalhos': {},
+        'ids': itertools.count(1),
+    }
+
+
+def _acompanhar(trabalho):
+    # Callback do Gurobi: progresso do MIP e cancelamento pedido pelo cliente
+
+    def callback(modelo, onde):
+        if trabalho['cancelar']:
+            modelo.terminate()
+        elif onde == GRB.Callback.MIP:
+            trabalho['progresso'] = {
+                'melhor_solucao': modelo.cbGet(GRB.Callback.MIP_OBJBST),
+                'solucao_relaxada': modelo.cbGet(GRB.Callback.MIP_OBJBND),
+                'nos': modelo.cbGet(GRB.Callback.MIP_NODCNT),
+                'tempo': modelo.cbGet(GRB.Callback.RUNTIME),
+            }
+
+    return callback
+
+
+def _resolver(servico, trabalho, env):
+    # Roda na thread do trabalhador, com o ambiente dele
+
+    pedido = trabalho['pedido']
+    if 'arquivo' in pedido:
+        instancia = carregar_instancia(pedido['arquivo'])
+    else:
+        instancia = pedido['instancia']
+
+    metodo = pedido.get('metodo', 'mip')
+    tempo_limite = pedido.get('tempo_limite', TIMEOUT)
+
+    if metodo in ('lagrangeano', 'colunas', 'espacial'):
+        return executar_instancia_decomposicao(
+            metodo, trabalho['nome'], instancia, tempo_limite, servico['threads'],
+            cancelar=lambda: trabalho['cancelar'], env=env)
+
+    return executar_instancia_com_timeout(
+        trabalho['nome'], instancia, tempo_limite, servico['threads'],
+        servico['pasta_resultados'], preprocessar=pedido.get('preprocessar', True),
+        env=env, callback=_acompanhar(trabalho))
+
+
+async def _trabalhador(servico, env):
+    loop = asyncio.get_running_loop()
+
+    while True:
+        trabalho = await servico['fila'].get()
+        try:
+            if trabalho['cancelar']:
+                continue
+
+            trabalho['estado'] = 'executando'
+            trabalho['inicio'] = time.time()
+            try:
+                resultados = await loop.run_in_executor(
+                    servico['executor'], _resolver, servico, trabalho, env)
+            except Exception as e:
+                trabalho['estado'], trabalho['erro'] = 'erro', str(e)
+            else:
+                if trabalho['cancelar']:
+                    trabalho['estado'] = 'cancelada'
+                elif resultados is None:
+                    trabalho['estado'], trabalho['erro'] = 'erro', 'falha na resolução'
+                else:
+                    trabalho['estado'] = 'concluida'
+                trabalho['resultados'] = resultados
+            trabalho['fim'] = time.time()
+        finally:
+            servico['fila'].task_done()
+
+
+def _resumo(trabalho, completo=False):
+    resumo = {campo: trabalho[campo] for campo in
+              ('id', 'nome', 'estado', 'recebida', 'inicio', 'fim', 'progresso', 'erro')}
+    if completo:
+        resumo['resultados'] = trabalho['resultados']
+    return resumo
+
+
+def _submeter(servico, pedido):
+
+    if 'instancia' not in pedido and 'arquivo' not in pedido:
+        return HTTPStatus.BAD_REQUEST, {'erro': 'informe "instancia" ou "arquivo"'}
+    if pedido.get('metodo', 'mip') not in ('mip', 'lagrangeano', 'colunas', 'espacial'):
+        return HTTPStatus.BAD_REQUEST, {'erro': f"método desconhecido: {pedido['metodo']}"}
+
+    id_trabalho = str(next(servico['ids']))
+    nome = pedido.get('nome') or (nome_instancia(pedido['arquivo']) if 'arquivo' in pedido
+                                  else f"servico_{id_trabalho}")
+    trabalho = {
+        'id': id_trabalho,
+        'nome': nome,
+        'pedido': pedido,
+        'estado': 'na_fila',
+        'recebida': time.time(),
+        'inicio': None,
+        'fim': None,
+        'progresso': None,
+        'erro': None,
+        'resultados': None,
+        'cancelar': False,
+    }
+
+    try:
+        servico['fila'].put_nowait(trabalho)
+    except asyncio.QueueFull:
+        return HTTPStatus.SERVICE_UNAVAILABLE, {'erro': 'fila cheia'}
+
+    servico['trabalhos'][id_trabalho] = trabalho
+    return HTTPStatus.ACCEPTED, {'id': id_trabalho, 'na_fila': servico['fila'].qsize()}
+
+
+def _cancelar(servico, id_trabalho):
+    # Na fila, o trabalho é marcado e pulado pelo trabalhador; em execução, o
+    # callback interrompe o Gurobi e a relaxação lagrangiana e a geração de
+    # colunas param na próxima iteração, com a melhor solução que têm. A
+    # decomposição espacial resolve os grupos em outros processos, que não
+    # consultam o pedido: em execução, ela não é cancelável. Trabalhos já
+    # terminados são descartados.
+
+    trabalho = servico['trabalhos'][id_trabalho]
+
+    if trabalho['estado'] in ESTADOS_FINAIS:
+        del servico['trabalhos'][id_trabalho]
+        return HTTPStatus.OK, {'id': id_trabalho, 'estado': 'descartada'}
+
+    if trabalho['estado'] == 'executando' and trabalho['pedido'].get('metodo') == 'espacial':
+        return HTTPStatus.CONFLICT, {
+            'id': id_trabalho, 'estado': trabalho['estado'],
+            'erro': 'a decomposição espacial em execução não pode ser cancelada'}
+
+    trabalho['cancelar'] = True
+    if trabalho['estado'] == 'na_fila':
+        trabalho['estado'] = 'cancelada'
+    return HTTPStatus.ACCEPTED, {'id': id_trabalho, 'estado': trabalho['estado']}
+
+
+def _rotear(servico, metodo, caminho, corpo):
+    partes = [p for p in caminho.split('?')[0].split('/') if p]
+
+    if partes == ['saude'] and metodo == 'GET':
+        return HTTPStatus.OK, {
+            'trabalhadores': len(servico['envs']),
+            'na_fila': servico['fila'].qsize(),
+            'executando': sum(t['estado'] == 'executando' for t in servico['trabalhos'].values()),
+        }
+
+    if partes == ['solucoes']:
+        if metodo == 'POST':
+            return _submeter(servico, json.loads(corpo or b'{}'))
+        if metodo == 'GET':
+            return HTTPStatus.OK, [_resumo(t) for t in servico['trabalhos'].values()]
+
+    if len(partes) == 2 and partes[0] == 'solucoes':
+        if partes[1] not in servico['trabalhos']:
+            return HTTPStatus.NOT_FOUND, {'erro': f"trabalho {partes[1]} não existe"}
+        if metodo == 'GET':
+            return HTTPStatus.OK, _resumo(servico['trabalhos'][partes[1]], completo=True)
+        if metodo == 'DELETE':
+            return _cancelar(servico, partes[1])
+
+    return HTTPStatus.NOT_FOUND, {'erro': f"{metodo} {caminho} não existe"}
+
+
+async def _atender(servico, reader, writer):
+    # HTTP/1.1 mínimo: uma requisição por conexão, corpo em JSON
+
+    try:
+        metodo, caminho, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+
+        cabecalhos = {}
+        while True:
+            linha = (await reader.readline()).decode('latin-1').strip()
+            if not linha:
+                break
+            nome, valor = linha.split(':', 1)
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        corpo = await reader.readexactly(int(cabecalhos.get('content-length', 0)))
+        codigo, resposta = _rotear(servico, metodo, caminho, corpo)
+    except Exception as e:
+        codigo, resposta = HTTPStatus.BAD_REQUEST, {'erro': str(e)}
+
+    dados = json.dumps(resposta, ensure_ascii=False).encode('utf-8')
+    writer.write(f"HTTP/1.1 {codigo.value} {codigo.phrase}\r\n"
+                 f"Content-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(dados)}\r\n"
+                 f"Connection: close\r\n\r\n".encode('latin-1') + dados)
+    await writer.drain()
+    writer.close()
+
+
+async def servir(host=HOST_SERVICO, porta=PORTA_SERVICO, socket_unix=None,
+                 trabalhadores=TRABALHADORES_SERVICO, threads=None, fila_maxima=FILA_MAXIMA,
+                 pasta_resultados=PASTA_RESULTADOS):
+
+    servico = criar_servico(trabalhadores, threads, fila_maxima, pasta_resultados)
+    tarefas = [asyncio.create_task(_trabalhador(servico, env)) for env in servico['envs']]
+
+    def atender(reader, writer):
+        return _atender(servico, reader, writer)
+
+    if socket_unix:
+        servidor = await asyncio.start_unix_server(atender, path=socket_unix)
+        endereco = socket_unix
+    else:
+        servidor = await asyncio.start_server(atender, host, porta)
+        endereco = f"http://{host}:{porta}"
+
+    print(f"🛰️ Serviço em {endereco} com {trabalhadores} trabalhadores "
+          f"({servico['threads']} threads cada)")
+
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        for trabalho in servico['trabalhos'].values():
+            trabalho['cancelar'] = True
+        servico['executor'].shutdown(wait=True)
+        for env in servico['envs']:
+            env.dispose()
+
+
+def executar_servico(host=HOST_SERVICO, porta=PORTA_SERVICO, socket_unix=None,
+                     trabalhadores=TRABALHADORES_SERVICO, threads=None, fila_maxima=FILA_MAXIMA,
+                     pasta_resultados=PASTA_RESULTADOS):
+    try:
+        asyncio.run(servir(host, porta, socket_unix, trabalhadores, threads, fila_maxima,
+                           pasta_resultados))
+    except KeyboardInterrupt:
+        print("\n🛑 Serviço encerrado")
@@ -0,0 +1,573 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import gurobipy as gp
+from gurobipy import GRB
+
+from .banco import registrar_execucao
+from .cache import obter_modelo
+from .colunas import resolver_colunas
+from .config import PASTA_INSTANCIAS, PASTA_RESULTADOS, PASTA_VISUALIZACOES, TIMEOUT
+from .espacial import resolver_espacial
+from .heuristics import atribuicao_para_valores
+from .io import carregar_instancia, listar_instancias, nome_instancia, salvar_resultados
+from .lagrangian import TOLERANCIA_GAP, resolver_lagrangeano
+from .model import criar_modelo
+from .perfil import medir_etapa
+from .preprocess import imprimir_preprocessamento, preprocessar_instancia
+from .plots import (DPI_VISUALIZACOES, PROCESSOS_VISUALIZACOES, renderizar_arquivo,
+                    aguardar_visualizacoes, criar_pool_visualizacoes, gerar_visualizacoes)
+from .report import (exportar_relatorio_resultados_salvos, exportar_resultados_incremental,
+                     imprimir_resultados_detalhados)
+from .verificador import atribuicao_de_valores, imprimir_verificacao, verificar_solucao
+
+
+def configurar_modelo(modelo, tipo_instancia, tempo_limite=TIMEOUT, threads=None,
+                      pasta_logs=PASTA_RESULTADOS):
+
+    modelo.Params.TimeLimit = tempo_limite
+
+    os.makedirs(pasta_logs, exist_ok=True)
+    modelo.Params.LogFile = os.path.join(
+        pasta_logs, f"gurobi_log_{tipo_instancia}.log")
+
+    modelo.Params.OutputFlag = 1
+
+    if threads is not None:
+        modelo.Params.Threads = threads
+
+
+def criar_ambiente(tempo_limite=TIMEOUT, threads=None, arquivo_log=None, console=True):
+    # Ambiente do Gurobi já com os parâmetros de configurar_modelo, para ser
+    # reaproveitado por todos os modelos de um trabalhador: a licença é
+    # verificada uma vez e os modelos herdam limite de tempo, threads e log
+    # (um arquivo por trabalhador, em vez de um por instância)
+
+    env = gp.Env(empty=True)
+    env.setParam('LogToConsole', int(console))
+    env.setParam('TimeLimit', tempo_limite)
+    if threads is not None:
+        env.setParam('Threads', threads)
+    if arquivo_log:
+        os.makedirs(os.path.dirname(arquivo_log) or '.', exist_ok=True)
+        env.setParam('LogFile', arquivo_log)
+    env.start()
+
+    return env
+
+
+def extrair_resultados(instancia, x_val, alpha_val):
+    # KPIs da solução a partir dos valores das variáveis (dicionários com as
+    # mesmas chaves de x e alpha), sem depender do modelo do Gurobi.
+
+    # Chaves ausentes (UMs ou veículos removidos no pré-processamento) valem 0.
+
+    resultados = {'alocacoes': []}
+
+    beta_v = 1
+    frete_morto = 0.0
+    for v in instancia["veiculos"]:
+        v_id = v["id"]
+        capacidade = v["capacidade_peso"]
+        carga_real = sum(
+            i["peso"] * x_val.get((i["id"], v_id, c["id"]), 0)
+            for i in instancia["ums"]
+            for c in instancia["clientes"]
+        )
+        ativo = alpha_val.get(v_id, 0)
+        frete_morto_kg = max(0, capacidade * ativo - carga_real)
+        frete_morto += beta_v * frete_morto_kg
+
+    resultados['frete_morto_total'] = frete_morto
+
+    resultados['veiculos_ativos'] = sum(
+
+        1 for v in instancia["veiculos"]
+        if any(x_val.get((i["id"], v["id"], c["id"]), 0) > 0.9
+               for i in instancia["ums"]
+               for c in instancia["clientes"])
+
+        or alpha_val.get(v["id"], 0) > 0.9
+    )
+
+    resultados['veiculos_inativos'] = len(
+        instancia["veiculos"]) - resultados['veiculos_ativos']
+
+    nao_alocadas = [
+        i["id"] for i in instancia["ums"]
+        if all(x_val.get((i["id"], v["id"], c["id"]), 0) < 0.1
+
+               for v in instancia["veiculos"]
+
+               for c in instancia["clientes"])
+    ]
+
+    resultados['ums_nao_alocadas'] = len(nao_alocadas)
+    resultados['ums_alocadas'] = len(
+        instancia["ums"]) - len(nao_alocadas)
+
+    resultados['peso_nao_alocado'] = sum(
+        i["peso"] for i in instancia["ums"] if i["id"] in nao_alocadas)
+    resultados['volume_nao_alocado'] = sum(
+        i["volume"] for i in instancia["ums"] if i["id"] in nao_alocadas)
+
+    resultados['custo_transporte'] = sum(
+        v["custo"] * alpha_val.get(v["id"], 0)
+        for v in instancia["veiculos"]
+    )
+
+    resultados['custo_nao_alocacao'] = sum(
+        i["peso"] * i["penalidade"] * (1 - sum(
+            x_val.get((i["id"], v["id"], c["id"]), 0)
+            for v in instancia["veiculos"]
+            for c in instancia["clientes"]))
+        for i in instancia["ums"]
+    )
+
+    for v in instancia["veiculos"]:
+        cargas = [
+            i["id"] for i in instancia["ums"]
+            if any(x_val.get((i["id"], v["id"], c["id"]), 0) > 0.9
+                   for c in instancia["clientes"])
+        ]
+
+        if cargas:
+            tipo_carga = [next((um["tipo"]
+                                for um in instancia["ums"] if um["id"] == um_id), "Desconhecido")
+                          for um_id in cargas]
+
+            peso_total = sum(i["peso"]
+                             for i in instancia["ums"] if i["id"] in cargas)
+            volume_total = sum(i["volume"]
+                               for i in instancia["ums"] if i["id"] in cargas)
+
+            resultados['alocacoes'].append({
+                'veiculo_id': v["id"],
+                'veiculo_tipo': v["tipo"],
+                'destino': v["destino"],
+                'cargas': cargas,
+                'tipos_um': tipo_carga,
+                'peso_total': peso_total,
+                'peso_minimo': v["carga_minima"],
+                'capacidade_peso': v["capacidade_peso"],
+                'volume_total': volume_total,
+                'capacidade_volume': v["capacidade_volume"],
+                'custo_veiculo': v["custo"],
+                'frete_morto': frete_morto,
+                'taxa_utilizacao_peso': (peso_total / v["capacidade_peso"]) * 100,
+                'taxa_utilizacao_volume': (volume_total / v["capacidade_volume"]) * 100
+            })
+
+    return resultados
+
+
+def executar_instancia_com_timeout(tipo_instancia, instancia, tempo_limite=TIMEOUT, threads=None,
+                                   pasta_logs=PASTA_RESULTADOS, etapas=None, perfilador=None,
+                                   pasta_perfis=None, pasta_cache=None, preprocessar=True,
+                                   env=None, callback=None, configurar=True):
+    # etapas recebe as medições já feitas pelo chamador (ex.: carregamento) e
+    # é completado com construção do modelo, otimização e extração. Com
+    # pasta_cache, o modelo é relido do cache quando a instância já foi
+    # construída antes. Com preprocessar, o modelo é montado sobre a
+    # instância reduzida por preprocessar_instancia e o custo das UMs fixadas
+    # como não alocadas entra como constante do objetivo, de modo que
+    # ObjVal, ObjBound e MIPGap continuam os da instância completa. env é um
+    # ambiente do Gurobi reaproveitado entre modelos e callback é repassado a
+    # optimize (progresso e cancelamento no serviço). Com configurar=False
+    # os parâmetros e o log vêm do ambiente (criar_ambiente).
+
+    etapas = {} if etapas is None else etapas
+
+    def etapa(nome):
+        return medir_etapa(etapas, nome, perfilador, pasta_perfis, tipo_instancia)
+
+    try:
+        print(f"\n{'='*80}")
+        print(f"INICIANDO INSTÂNCIA: {tipo_instancia.upper()}")
+        print(f"{'='*80}")
+
+        instancia_modelo = instancia
+        preprocessamento = None
+        if preprocessar:
+            with etapa('preprocessamento'):
+                instancia_modelo, preprocessamento = preprocessar_instancia(
+                    instancia)
+            imprimir_preprocessamento(preprocessamento)
+
+        modelo_em_cache = False
+        with etapa('construcao_modelo'):
+            if pasta_cache:
+                modelo, x, y, alpha, modelo_em_cache = obter_modelo(
+                    instancia_modelo, pasta_cache, env)
+            else:
+                modelo, x, y, alpha = criar_modelo(instancia_modelo, env)
+
+            if preprocessamento:
+                # ObjCon só reflete o objetivo de criar_modelo depois do update
+                modelo.update()
+                modelo.ObjCon = modelo.ObjCon + preprocessamento['custo_fixo']
+
+            if configurar:
+                configurar_modelo(modelo, tipo_instancia,
+                                  tempo_limite, threads, pasta_logs)
+
+        with etapa('otimizacao'):
+            modelo.optimize(callback)
+
+        resultados = {
+            'tipo_instancia': tipo_instancia,
+            'status': modelo.status,
+            'tempo_execucao': modelo.Runtime,
+            'tempo_limite': tempo_limite,
+            'custo_total': None,
+            'veiculos_ativos': 0,
+            'veiculos_inativos': len(instancia["veiculos"]),
+            'ums_alocadas': 0,
+            'ums_nao_alocadas': len(instancia["ums"]),
+            'peso_nao_alocado': 0,
+            'volume_nao_alocado': 0,
+            'frete_morto_total': 0,
+            'custo_transporte': 0,
+            'custo_nao_alocacao': 0,
+            'alocacoes': [],
+
+            'tempo_para_otimo': modelo.RunTime if modelo.status == GRB.OPTIMAL else None,
+            'melhor_solucao': modelo.ObjVal if modelo.SolCount > 0 else None,
+
+            'solucao_relaxada': modelo.ObjBound if modelo.SolCount > 0 else None,
+
+            # Sem variáveis inteiras (tudo removido no pré-processamento) o
+            # modelo é um LP e não tem MIPGap
+            'gap_otimizacao': modelo.MIPGap*100 if hasattr(modelo, 'MIPGap')
+            else (0.0 if modelo.status == GRB.OPTIMAL else None),
+
+            'etapas': etapas,
+            'modelo_em_cache': modelo_em_cache,
+            'preprocessamento': preprocessamento,
+        }
+
+        if modelo.SolCount > 0:
+
+            with etapa('extracao'):
+                x_val = modelo.getAttr('X', x)
+                alpha_val = modelo.getAttr('X', alpha)
+
+                resultados.update(extrair_resultados(instancia, x_val, alpha_val))
+            resultados['custo_total'] = modelo.ObjVal
+
+            with etapa('verificacao'):
+                resultados['verificacao'] = verificar_solucao(
+                    instancia, atribuicao_de_valores(x_val))
+            imprimir_verificacao(resultados['verificacao'], resultados['custo_total'])
+
+        return resultados
+
+    except Exception as e:
+        print(f"❌ Erro ao processar instância {tipo_instancia}: {str(e)}")
+        return None
+
+
+# Status do Gurobi equivalente ao motivo de parada de um método de
+# decomposição que não fechou o gap; os demais motivos (convergência do
+# subgradiente ou do mestre relaxado, decomposição espacial) viram SUBOPTIMAL
+STATUS_PARADA = {
+    'tempo': GRB.TIME_LIMIT,
+    'iteracoes': GRB.ITERATION_LIMIT,
+    'cancelada': GRB.INTERRUPTED,
+}
+
+
+def executar_instancia_decomposicao(metodo, tipo_instancia, instancia, tempo_limite=TIMEOUT,
+                                   threads=None, etapas=None, perfilador=None, pasta_perfis=None,
+                                   cancelar=None, env=None):
+    # Mesmo dicionário de resultados de executar_instancia_com_timeout, mas
+    # com a relaxação lagrangiana, a geração de colunas ou a decomposição
+    # espacial no lugar do modelo compacto: melhor_solucao é o custo da
+    # melhor solução inteira e solucao_relaxada o limite inferior (a
+    # decomposição espacial não tem limite). Sem fechar o gap, o status vem
+    # do motivo de parada do método (STATUS_PARADA). O pré-processamento é
+    # feito dentro de cada método. cancelar (função sem argumentos) é
+    # repassado à relaxação lagrangiana e à geração de colunas, que param
+    # com a melhor solução que têm quando ele retorna True. env (ambiente já
+    # iniciado) vai para os modelos da geração de colunas; a decomposição
+    # espacial resolve os grupos em outros processos, cada um com o seu.
+
+    etapas = {} if etapas is None else etapas
+
+    def etapa(nome):
+        return medir_etapa(etapas, nome, perfilador, pasta_perfis, tipo_instancia)
+
+    try:
+        print(f"\n{'='*80}")
+        print(f"INICIANDO INSTÂNCIA ({metodo.upper()}): {tipo_instancia.upper()}")
+        print(f"{'='*80}")
+
+        with etapa('otimizacao'):
+            if metodo == 'colunas':
+                solucao = resolver_colunas(instancia, tempo_limite=tempo_limite, threads=threads,
+                                           cancelar=cancelar, env=env)
+            elif metodo == 'espacial':
+                solucao = resolver_espacial(instancia, tempo_limite=tempo_limite, threads=threads)
+            else:
+                solucao = resolver_lagrangeano(instancia, tempo_limite=tempo_limite,
+                                               cancelar=cancelar)
+        imprimir_preprocessamento(solucao['preprocessamento'])
+
+        fechou_gap = solucao['gap'] is not None and solucao['gap'] <= TOLERANCIA_GAP
+        status = GRB.OPTIMAL if fechou_gap else STATUS_PARADA.get(solucao['parada'],
+                                                                  GRB.SUBOPTIMAL)
+
+        resultados = {
+            'tipo_instancia': tipo_instancia,
+            'metodo': metodo,
+            'status': status,
+            'tempo_execucao': solucao['tempo'],
+            'tempo_limite': tempo_limite,
+            'tempo_para_otimo': solucao['tempo'] if fechou_gap else None,
+            'melhor_solucao': solucao['custo'],
+            'solucao_relaxada': solucao['limite_inferior'],
+            'gap_otimizacao': solucao['gap'] * 100 if solucao['gap'] is not None else None,
+            'iteracoes_decomposicao': solucao['iteracoes'],
+            'parada': solucao['parada'],
+            'etapas': etapas,
+            'modelo_em_cache': False,
+            'preprocessamento': solucao['preprocessamento'],
+        }
+        if 'colunas' in solucao:
+            resultados['colunas_geradas'] = solucao['colunas']
+        if 'grupos' in solucao:
+            resultados['grupos_espaciais'] = solucao['grupos']
+
+        with etapa('extracao'):
+            x_val, alpha_val = atribuicao_para_valores(instancia, solucao['atribuicao'])
+            resultados.update(extrair_resultados(instancia, x_val, alpha_val))
+        resultados['custo_total'] = solucao['custo']
+
+        with etapa('verificacao'):
+            resultados['verificacao'] = verificar_solucao(instancia, solucao['atribuicao'])
+        imprimir_verificacao(resultados['verificacao'], resultados['custo_total'])
+
+        return resultados
+
+    except Exception as e:
+        print(f"❌ Erro ao processar instância {tipo_instancia}: {str(e)}")
+        return None
+
+
+def _executar_instancia(metodo, tipo_instancia, instancia, tempo_limite, threads, pasta_logs,
+                        etapas, perfilador, pasta_perfis, pasta_cache, preprocessar, env=None):
+    if metodo in ('lagrangeano', 'colunas', 'espacial'):
+        return executar_instancia_decomposicao(metodo, tipo_instancia, instancia, tempo_limite,
+                                              threads, etapas, perfilador, pasta_perfis, env=env)
+
+    return executar_instancia_com_timeout(
+        tipo_instancia, instancia, tempo_limite, threads, pasta_logs,
+        etapas, perfilador, pasta_perfis, pasta_cache, preprocessar,
+        env=env, configurar=env is None)
+
+
+# Ambiente do processo trabalhador do lote, criado uma vez por
+# _iniciar_trabalhador_lote e usado em todas as instâncias que ele resolve
+_ambiente_lote = None
+
+
+def _iniciar_trabalhador_lote(tempo_limite, threads, pasta_logs, console=False):
+    global _ambiente_lote
+    _ambiente_lote = criar_ambiente(
+        tempo_limite, threads, os.path.join(pasta_logs, f"gurobi_log_lote_{os.getpid()}.log"),
+        console)
+
+
+def _resolver_instancia_lote(caminho, metodo, tempo_limite, threads, pasta_logs, perfilador,
+                             pasta_perfis, pasta_cache, preprocessar, carregamento='csv'):
+    # Carrega e resolve uma instância no processo trabalhador; devolve também
+    # a instância e as etapas para o processo principal exportar e salvar
+
+    tipo_instancia = nome_instancia(caminho)
+    print(f"\n{'='*80}")
+    print(f"🚀 PROCESSANDO INSTÂNCIA: {tipo_instancia}")
+    print(f"{'='*80}")
+
+    etapas = {}
+    with medir_etapa(etapas, 'carregamento', perfilador, pasta_perfis, tipo_instancia):
+        instancia = carregar_instancia(caminho, carregamento)
+
+    resultados = _executar_instancia(
+        metodo, tipo_instancia, instancia, tempo_limite, threads, pasta_logs,
+        etapas, perfilador, pasta_perfis, pasta_cache, preprocessar, _ambiente_lote)
+
+    return resultados, instancia, etapas
+
+
+def parametros_execucao(metodo, tempo_limite, threads, preprocessar, pasta_cache,
+                        trabalhadores=1):
+    # Parâmetros da execução gravados no banco de resultados
+    return {
+        'metodo': metodo,
+        'tempo_limite': tempo_limite,
+        'threads': threads,
+        'preprocessar': preprocessar,
+        'cache_modelos': bool(pasta_cache),
+        'trabalhadores': trabalhadores,
+    }
+
+
+def resolver_arquivo(caminho_arquivo, pasta_resultados=PASTA_RESULTADOS,
+                     pasta_visualizacoes=PASTA_VISUALIZACOES, tempo_limite=TIMEOUT, threads=None,
+                     visualizacoes=True, graficos=None, dpi=DPI_VISUALIZACOES, perfilador=None,
+                     pasta_cache=None, preprocessar=True, metodo='mip', banco=None,
+                     carregamento='csv'):
+
+    tipo_instancia = nome_instancia(caminho_arquivo)
+    pasta_perfis = os.path.join(pasta_resultados, 'perfis')
+
+    etapas = {}
+    with medir_etapa(etapas, 'carregamento', perfilador, pasta_perfis, tipo_instancia):
+        instancia = carregar_instancia(caminho_arquivo, carregamento)
+
+    resultados = _executar_instancia(
+        metodo, tipo_instancia, instancia, tempo_limite, threads, pasta_resultados,
+        etapas, perfilador, pasta_perfis, pasta_cache, preprocessar)
+
+    if not resultados:
+        print(f"❌ Falha ao executar instância {tipo_instancia}")
+        return None
+
+    salvar_resultados(resultados, instancia, pasta_resultados)
+
+    if visualizacoes and resultados['melhor_solucao'] is not None:
+        with medir_etapa(etapas, 'visualizacoes', perfilador, pasta_perfis, tipo_instancia):
+            gerar_visualizacoes(resultados, instancia,
+                                pasta_visualizacoes, graficos, dpi)
+        # regrava o JSON já com o tempo da etapa de visualizações
+        salvar_resultados(resultados, instancia, pasta_resultados)
+
+    if banco:
+        registrar_execucao(banco, resultados, instancia, parametros_execucao(
+            metodo, tempo_limite, threads, preprocessar, pasta_cache))
+
+    imprimir_resultados_detalhados(resultados)
+
+    return resultados
+
+
+def resolver_lote(arquivos_instancias, trabalhadores, argumentos):
+    # (caminho, (resultados, instancia, etapas) ou a exceção) de cada
+    # instância, na ordem em que terminam. Cada trabalhador, inclusive o
+    # próprio processo quando trabalhadores <= 1, tem um único ambiente do
+    # Gurobi para todas as instâncias que resolve.
+
+    global _ambiente_lote
+    _, tempo_limite, threads, pasta_logs = argumentos[:4]
+
+    if trabalhadores <= 1:
+        _iniciar_trabalhador_lote(tempo_limite, threads, pasta_logs, console=True)
+        try:
+            for caminho in arquivos_instancias:
+                try:
+                    yield caminho, _resolver_instancia_lote(caminho, *argumentos)
+                except Exception as e:
+                    yield caminho, e
+        finally:
+            _ambiente_lote.dispose()
+            _ambiente_lote = None
+        return
+
+    with ProcessPoolExecutor(max_workers=trabalhadores, initializer=_iniciar_trabalhador_lote,
+                             initargs=(tempo_limite, threads, pasta_logs)) as pool:
+        futuros = {pool.submit(_resolver_instancia_lote, caminho, *argumentos): caminho
+                   for caminho in arquivos_instancias}
+        for futuro in as_completed(futuros):
+            try:
+                yield futuros[futuro], futuro.result()
+            except Exception as e:
+                yield futuros[futuro], e
+
+
+def executar_todas_instancias_geradas(pasta_instancias=PASTA_INSTANCIAS, pasta_resultados=PASTA_RESULTADOS,
+                                      pasta_visualizacoes=PASTA_VISUALIZACOES, tempo_limite=TIMEOUT,
+                                      threads=None, visualizacoes=True, graficos=None,
+                                      dpi=DPI_VISUALIZACOES, processos=PROCESSOS_VISUALIZACOES,
+                                      formato_exportacao='csv', perfilador=None, pasta_cache=None,
+                                      preprocessar=True, metodo='mip', trabalhadores=1,
+                                      banco=None, carregamento='csv'):
+
+    os.makedirs(pasta_resultados, exist_ok=True)
+    pasta_perfis = os.path.join(pasta_resultados, 'perfis')
+
+    arquivos_instancias = listar_instancias(pasta_instancias)
+
+    if not arquivos_instancias:
+        print("❌ Nenhuma instância encontrada na pasta!")
+        return
+
+    print(f"🔍 Encontradas {len(arquivos_instancias)} instâncias para executar")
+
+    # Com vários trabalhadores e sem Threads, divide os núcleos entre eles
+    if trabalhadores > 1 and threads is None:
+        threads = max(1, (os.cpu_count() or 1) // trabalhadores)
+
+    # Cada instância é exportada e salva assim que termina; só os caminhos dos
+    # resultados salvos ficam em memória até o relatório final
+    campanha = f"campanha_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    caminhos_resultados = []
+
+    # Os gráficos são renderizados em processos separados enquanto o solver
+    # segue para a próxima instância
+    pool_visualizacoes = criar_pool_visualizacoes(
+        processos) if visualizacoes else None
+    futuros_visualizacoes = []
+
+    argumentos = (metodo, tempo_limite, threads, pasta_resultados, perfilador, pasta_perfis,
+                  pasta_cache, preprocessar, carregamento)
+    parametros = parametros_execucao(metodo, tempo_limite, threads, preprocessar, pasta_cache,
+                                     trabalhadores)
+
+    for caminho_completo, resolvida in resolver_lote(arquivos_instancias, trabalhadores,
+                                                      argumentos):
+        try:
+            if isinstance(resolvida, Exception):
+                raise resolvida
+
+            tipo_instancia = nome_instancia(caminho_completo)
+            resultados, instancia, etapas = resolvida
+
+            if resultados:
+                # Uma falha na exportação não impede de salvar os resultados
+                try:
+                    with medir_etapa(etapas, 'exportacao', perfilador, pasta_perfis,
+                                     tipo_instancia):
+                        exportar_resultados_incremental(
+                            resultados, instancia, pasta_resultados, campanha, formato_exportacao)
+                except Exception as e:
+                    print(f"⚠️ Falha na exportação incremental de {tipo_instancia}: {str(e)}")
+                caminho_resultados = salvar_resultados(
+                    resultados, instancia, pasta_resultados)
+                caminhos_resultados.append(caminho_resultados)
+                if banco:
+                    registrar_execucao(banco, resultados, instancia, parametros, campanha)
+                imprimir_resultados_detalhados(resultados)
+
+                if pool_visualizacoes and resultados['melhor_solucao'] is not None:
+                    futuros_visualizacoes.append(pool_visualizacoes.submit(
+                        renderizar_arquivo, caminho_resultados, pasta_visualizacoes, graficos, dpi,
+                        perfilador, pasta_perfis))
+            else:
+                print(f"❌ Falha ao executar instância {tipo_instancia}")
+
+        except Exception as e:
+            print(f"❌ Erro crítico ao processar {caminho_completo}: {str(e)}")
+            continue
+
+    if pool_visualizacoes:
+        aguardar_visualizacoes(futuros_visualizacoes)
+        pool_visualizacoes.shutdown()
+
+    if caminhos_resultados:
+        nome_arquivo = exportar_relatorio_resultados_salvos(
+            caminhos_resultados, pasta_resultados)
+        print(
+            f"\n✅ Todas instâncias processadas! Resultados em: {nome_arquivo} e {campanha}_*")
+    else:
+        print("\n⚠️ Nenhuma instância foi executada com sucesso!")
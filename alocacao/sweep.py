@@ -0,0 +1,248 @@
+import csv
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from gurobipy import GRB
+
+from .cache import obter_modelo
+from .config import PASTA_CACHE_MODELOS, PASTA_INSTANCIAS, PASTA_RESULTADOS
+from .io import carregar_instancia, listar_instancias, nome_instancia
+from .preprocess import preprocessar_instancia
+from .solve import configurar_modelo
+
+TEMPO_LIMITE_VARREDURA = 600
+GAP_ALVO = 0.01
+PROCESSOS_VARREDURA = 2
+AMOSTRAS_ALEATORIAS = 20
+DESLOCAMENTO_MEDIA_GEOMETRICA = 1.0  # s, como nos benchmarks de MIP
+
+ESPACO_PARAMETROS = {
+    'MIPFocus': [0, 1, 2, 3],
+    'Presolve': [-1, 0, 2],
+    'Cuts': [-1, 0, 2],
+    'Heuristics': [0.05, 0.2, 0.5],
+}
+
+COLUNAS_RODADAS = [
+    'configuracao', 'parametros', 'instancia', 'status', 'tempo_execucao',
+    'tempo_ate_gap_alvo', 'gap_final', 'melhor_solucao', 'solucao_relaxada'
+]
+
+COLUNAS_RANKING = [
+    'posicao', 'configuracao', 'parametros', 'rodadas', 'atingiram_gap_alvo',
+    'media_geometrica_tempo', 'gap_final_medio', 'gap_final_maximo'
+]
+
+
+def interpretar_parametros(textos):
+    # ["MIPFocus=1,2", "Cuts=0"] -> {'MIPFocus': [1, 2], 'Cuts': [0]}
+
+    espaco = {}
+    for texto in textos:
+        nome, valores = texto.split('=', 1)
+        espaco[nome.strip()] = [float(v) if '.' in v else int(v)
+                                for v in valores.split(',')]
+
+    return espaco
+
+
+def gerar_configuracoes(espaco=None, modo='grade', amostras=AMOSTRAS_ALEATORIAS, semente=None):
+    # Grade completa ou amostra aleatória (sem repetição) do produto
+    # cartesiano. A configuração vazia, só com os padrões do Gurobi, entra
+    # sempre como referência.
+
+    espaco = ESPACO_PARAMETROS if espaco is None else espaco
+    nomes = list(espaco)
+    combinacoes = [dict(zip(nomes, valores))
+                   for valores in itertools.product(*(espaco[n] for n in nomes))]
+
+    if modo == 'aleatorio':
+        gerador = random.Random(semente)
+        combinacoes = gerador.sample(combinacoes, min(amostras, len(combinacoes)))
+    elif modo != 'grade':
+        raise ValueError(f"Modo de varredura desconhecido: {modo}")
+
+    return [{}] + [c for c in combinacoes if c]
+
+
+def _gap(objetivo, limite):
+    # Mesma definição do MIPGap do Gurobi
+    if objetivo is None or limite is None or abs(objetivo) == GRB.INFINITY:
+        return math.inf
+    if objetivo == 0:
+        return 0.0 if limite == 0 else math.inf
+    return abs(objetivo - limite) / abs(objetivo)
+
+
+def executar_rodada(caminho, id_configuracao, parametros, tempo_limite=TEMPO_LIMITE_VARREDURA,
+                    gap_alvo=GAP_ALVO, threads=None, pasta_cache=PASTA_CACHE_MODELOS,
+                    pasta_logs=PASTA_RESULTADOS):
+    # Uma instância com um conjunto de parâmetros. O callback registra o
+    # primeiro instante em que o gap fica abaixo do alvo; a otimização segue
+    # até o ótimo ou o limite de tempo para medir também o gap final.
+
+    tipo_instancia = nome_instancia(caminho)
+    instancia, preprocessamento = preprocessar_instancia(carregar_instancia(caminho))
+    modelo, x, y, alpha, _ = obter_modelo(instancia, pasta_cache)
+    modelo.ObjCon = modelo.ObjCon + preprocessamento['custo_fixo']
+
+    configurar_modelo(modelo, f"{tipo_instancia}_cfg{id_configuracao}",
+                      tempo_limite, threads, pasta_logs)
+    modelo.Params.LogToConsole = 0
+    for nome, valor in parametros.items():
+        modelo.setParam(nome, valor)
+
+    tempo_ate_gap_alvo = [None]
+
+    def acompanhar_gap(modelo_cb, onde):
+        if onde == GRB.Callback.MIP and tempo_ate_gap_alvo[0] is None:
+            objetivo = modelo_cb.cbGet(GRB.Callback.MIP_OBJBST)
+            limite = modelo_cb.cbGet(GRB.Callback.MIP_OBJBND)
+            if _gap(objetivo, limite) <= gap_alvo:
+                tempo_ate_gap_alvo[0] = modelo_cb.cbGet(GRB.Callback.RUNTIME)
+
+    modelo.optimize(acompanhar_gap)
+
+    if tempo_ate_gap_alvo[0] is None and modelo.SolCount > 0 and modelo.MIPGap <= gap_alvo:
+        tempo_ate_gap_alvo[0] = modelo.Runtime
+
+    rodada = {
+        'configuracao': id_configuracao,
+        'parametros': ' '.join(f"{n}={v}" for n, v in parametros.items()) or 'padrao',
+        'instancia': tipo_instancia,
+        'status': modelo.status,
+        'tempo_execucao': modelo.Runtime,
+        'tempo_ate_gap_alvo': tempo_ate_gap_alvo[0],
+        'gap_final': modelo.MIPGap * 100 if modelo.SolCount > 0 else None,
+        'melhor_solucao': modelo.ObjVal if modelo.SolCount > 0 else None,
+        'solucao_relaxada': modelo.ObjBound if modelo.SolCount > 0 else None,
+    }
+
+    modelo.dispose()
+
+    return rodada
+
+
+def media_geometrica_deslocada(tempos, deslocamento=DESLOCAMENTO_MEDIA_GEOMETRICA):
+    return math.exp(sum(math.log(t + deslocamento) for t in tempos) / len(tempos)) - deslocamento
+
+
+def ranquear_configuracoes(rodadas, tempo_limite):
+    # Rodadas que não atingem o gap alvo contam com o limite de tempo. Ordena
+    # por quantas atingiram o alvo e, no empate, pela média geométrica
+    # deslocada do tempo até o alvo.
+
+    por_configuracao = {}
+    for rodada in rodadas:
+        por_configuracao.setdefault(rodada['configuracao'], []).append(rodada)
+
+    ranking = []
+    for id_configuracao, lista in por_configuracao.items():
+        tempos = [r['tempo_ate_gap_alvo'] if r['tempo_ate_gap_alvo'] is not None else tempo_limite
+                  for r in lista]
+        gaps = [r['gap_final'] for r in lista if r['gap_final'] is not None]
+
+        ranking.append({
+            'configuracao': id_configuracao,
+            'parametros': lista[0]['parametros'],
+            'rodadas': len(lista),
+            'atingiram_gap_alvo': sum(r['tempo_ate_gap_alvo'] is not None for r in lista),
+            'media_geometrica_tempo': media_geometrica_deslocada(tempos),
+            'gap_final_medio': sum(gaps) / len(gaps) if gaps else None,
+            'gap_final_maximo': max(gaps) if gaps else None,
+        })
+
+    ranking.sort(key=lambda r: (-r['atingiram_gap_alvo'], r['media_geometrica_tempo']))
+    for posicao, linha in enumerate(ranking, start=1):
+        linha['posicao'] = posicao
+
+    return ranking
+
+
+def _escrever_csv(caminho, colunas, linhas):
+    with open(caminho, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=colunas, delimiter=';')
+        writer.writeheader()
+        writer.writerows(linhas)
+
+
+def executar_varredura(pasta_instancias=PASTA_INSTANCIAS, pasta_resultados=PASTA_RESULTADOS,
+                       configuracoes=None, tempo_limite=TEMPO_LIMITE_VARREDURA, gap_alvo=GAP_ALVO,
+                       processos=PROCESSOS_VARREDURA, threads=None,
+                       pasta_cache=PASTA_CACHE_MODELOS):
+
+    caminhos = listar_instancias(pasta_instancias)
+    if not caminhos:
+        print("❌ Nenhuma instância encontrada na pasta!")
+        return None
+
+    configuracoes = gerar_configuracoes() if configuracoes is None else configuracoes
+
+    # Sem Threads na configuração, divide os núcleos entre os processos para
+    # as rodadas simultâneas não disputarem a mesma CPU
+    if threads is None:
+        threads = max(1, (os.cpu_count() or 1) // processos)
+
+    # Os modelos são construídos uma vez, aqui, e os processos só os releem
+    # do cache
+    print(f"🔧 Preparando {len(caminhos)} modelos no cache")
+    for caminho in caminhos:
+        instancia, _ = preprocessar_instancia(carregar_instancia(caminho))
+        obter_modelo(instancia, pasta_cache)[0].dispose()
+
+    total = len(caminhos) * len(configuracoes)
+    print(f"🔍 {len(configuracoes)} configurações x {len(caminhos)} instâncias = {total} rodadas")
+
+    rodadas = []
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = [pool.submit(executar_rodada, caminho, id_configuracao, parametros,
+                               tempo_limite, gap_alvo, parametros.get('Threads', threads),
+                               pasta_cache, pasta_resultados)
+                   for id_configuracao, parametros in enumerate(configuracoes)
+                   for caminho in caminhos]
+
+        for futuro in as_completed(futuros):
+            try:
+                rodada = futuro.result()
+            except Exception as e:
+                print(f"❌ Erro em uma rodada da varredura: {str(e)}")
+                continue
+
+            rodadas.append(rodada)
+            alvo = rodada['tempo_ate_gap_alvo']
+            print(f"  [{len(rodadas)}/{total}] cfg {rodada['configuracao']} {rodada['instancia']}: "
+                  f"{'%.1f s' % alvo if alvo is not None else 'sem alvo'}")
+
+    if not rodadas:
+        print("\n⚠️ Nenhuma rodada foi executada com sucesso!")
+        return None
+
+    ranking = ranquear_configuracoes(rodadas, tempo_limite)
+
+    os.makedirs(pasta_resultados, exist_ok=True)
+    prefixo = os.path.join(pasta_resultados,
+                           f"varredura_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    _escrever_csv(f"{prefixo}_rodadas.csv", COLUNAS_RODADAS, rodadas)
+    _escrever_csv(f"{prefixo}_ranking.csv", COLUNAS_RANKING, ranking)
+
+    imprimir_ranking(ranking, gap_alvo)
+    print(f"\n✅ Varredura salva em: {prefixo}_rodadas.csv e {prefixo}_ranking.csv")
+
+    return ranking
+
+
+def imprimir_ranking(ranking, gap_alvo):
+    print(f"\n{'='*80}")
+    print(f"🏁 RANKING (tempo até gap de {gap_alvo*100:.2f}%)")
+    print(f"{'='*80}")
+    print(f"{'#':>3} {'Atingiu':>8} {'Tempo (s)':>10} {'Gap méd. (%)':>13}  Parâmetros")
+
+    for linha in ranking:
+        gap = linha['gap_final_medio']
+        print(f"{linha['posicao']:>3} {linha['atingiram_gap_alvo']:>4}/{linha['rodadas']:<3} "
+              f"{linha['media_geometrica_tempo']:>10.2f} "
+              f"{gap if gap is not None else float('nan'):>13.2f}  {linha['parametros']}")
@@ -0,0 +1,156 @@
+import numpy as np
+
+from .io import matriz_compatibilidade
+
+# Verificação independente de uma solução: não lê o modelo nem confia nos
+# KPIs de extrair_resultados. Recebe a instância e a atribuição e refaz, com
+# operações em arrays, as restrições de criar_modelo e cada componente do
+# objetivo. A atribuição pode ser
+#   - {UM: veículo}, como nas heurísticas e nos métodos de decomposição;
+#   - pares (UM, veículo) ou triplas (UM, veículo, cliente), como as chaves
+#     de x com valor 1 (atribuicao_de_valores), que podem repetir a UM.
+# Com triplas, a região é a do cliente da chave (destino_ do modelo); com
+# pares, basta a região do veículo ter algum cliente. As UMs podem vir em
+# lista de dicionários ou nos arrays de carregar_dados_streaming.
+
+TOLERANCIA_VERIFICACAO = 1e-6
+TOLERANCIA_CUSTO = 1e-4  # relativa; o Gurobi aceita x a 1e-5 de um inteiro
+
+TIPOS_VIOLACAO = [
+    'um_inexistente', 'veiculo_inexistente', 'alocacao_multipla', 'incompatibilidade',
+    'regiao', 'capacidade_peso', 'capacidade_volume', 'carga_minima'
+]
+
+
+def atribuicao_de_valores(x_val):
+    # Chaves de x com valor 1, no formato aceito por verificar_solucao
+    return [chave for chave, valor in x_val.items() if valor > 0.5]
+
+
+def _arrays_ums(ums):
+    if isinstance(ums, dict):
+        return ums['id'], ums['peso'], ums['volume'], ums['penalidade']
+
+    return (np.fromiter((um['id'] for um in ums), dtype=np.int64, count=len(ums)),
+            np.fromiter((um['peso'] for um in ums), dtype=np.float64, count=len(ums)),
+            np.fromiter((um['volume'] for um in ums), dtype=np.float64, count=len(ums)),
+            np.fromiter((um['penalidade'] for um in ums), dtype=np.float64, count=len(ums)))
+
+
+def _posicoes(ids, procurados):
+    # Posição de cada id procurado em ids e máscara dos que existem
+    if len(ids) == 0:
+        return np.zeros(len(procurados), dtype=np.int64), np.zeros(len(procurados), dtype=bool)
+
+    ordem = np.argsort(ids, kind='stable')
+    pos = np.minimum(np.searchsorted(ids, procurados, sorter=ordem), len(ids) - 1)
+    posicoes = ordem[pos]
+
+    return posicoes, ids[posicoes] == procurados
+
+
+def _colunas_atribuicao(atribuicao):
+    if isinstance(atribuicao, dict):
+        n = len(atribuicao)
+        return (np.fromiter(atribuicao.keys(), dtype=np.int64, count=n),
+                np.fromiter(atribuicao.values(), dtype=np.int64, count=n), None)
+
+    chaves = np.asarray(list(atribuicao), dtype=np.int64)
+    if chaves.size == 0:
+        chaves = chaves.reshape(0, 2)
+
+    return chaves[:, 0], chaves[:, 1], (chaves[:, 2] if chaves.shape[1] == 3 else None)
+
+
+def verificar_solucao(instancia, atribuicao, tolerancia=TOLERANCIA_VERIFICACAO):
+    # Retorna {'viavel', 'violacoes' ({tipo: ids de UMs ou de veículos}),
+    # componentes do custo e contagens}. Uma UM atribuída a um id
+    # desconhecido conta como violação e não entra nas cargas.
+
+    ums = instancia["ums"]
+    veiculos = instancia["veiculos"]
+    clientes = instancia["clientes"]
+    beta_v = 1
+
+    ids_um, peso, volume, penalidade = _arrays_ums(ums)
+    ids_veiculo = np.array([v["id"] for v in veiculos], dtype=np.int64)
+    cap_peso = np.array([v["capacidade_peso"] for v in veiculos], dtype=float)
+    cap_volume = np.array([v["capacidade_volume"] for v in veiculos], dtype=float)
+    carga_minima = np.array([v["carga_minima"] for v in veiculos], dtype=float)
+    custo = np.array([v["custo"] for v in veiculos], dtype=float)
+
+    um_atrib, veiculo_atrib, cliente_atrib = _colunas_atribuicao(atribuicao)
+
+    pos_um, um_existe = _posicoes(ids_um, um_atrib)
+    pos_veiculo, veiculo_existe = _posicoes(ids_veiculo, veiculo_atrib)
+    valida = um_existe & veiculo_existe
+    pos_um, pos_veiculo = pos_um[valida], pos_veiculo[valida]
+
+    violacoes = {tipo: [] for tipo in TIPOS_VIOLACAO}
+    violacoes['um_inexistente'] = np.unique(um_atrib[~um_existe]).tolist()
+    violacoes['veiculo_inexistente'] = np.unique(veiculo_atrib[~veiculo_existe]).tolist()
+
+    vezes = np.bincount(pos_um, minlength=len(ids_um))
+    violacoes['alocacao_multipla'] = ids_um[vezes > 1].tolist()
+
+    compativel = matriz_compatibilidade(ums, veiculos)
+    violacoes['incompatibilidade'] = np.unique(
+        ids_um[pos_um[~compativel[pos_um, pos_veiculo]]]).tolist()
+
+    destinos = sorted({c["destino"] for c in clientes} | {v["destino"] for v in veiculos},
+                      key=str)
+    codigo = {d: k for k, d in enumerate(destinos)}
+    destino_veiculo = np.array([codigo[v["destino"]] for v in veiculos], dtype=np.int64)
+    if cliente_atrib is None:
+        # Algum cliente na região do veículo
+        com_clientes = np.zeros(len(destinos), dtype=bool)
+        com_clientes[[codigo[c["destino"]] for c in clientes]] = True
+        na_regiao = com_clientes[destino_veiculo[pos_veiculo]]
+    else:
+        ids_cliente = np.array([c["id"] for c in clientes], dtype=np.int64)
+        destino_cliente = np.array([codigo[c["destino"]] for c in clientes], dtype=np.int64)
+        pos_cliente, cliente_existe = _posicoes(ids_cliente, cliente_atrib[valida])
+        na_regiao = cliente_existe & (destino_cliente[pos_cliente]
+                                      == destino_veiculo[pos_veiculo])
+    violacoes['regiao'] = np.unique(ids_um[pos_um[~na_regiao]]).tolist()
+
+    carga_peso = np.bincount(pos_veiculo, weights=peso[pos_um], minlength=len(veiculos))
+    carga_volume = np.bincount(pos_veiculo, weights=volume[pos_um], minlength=len(veiculos))
+    ativo = np.bincount(pos_veiculo, minlength=len(veiculos)) > 0
+
+    violacoes['capacidade_peso'] = ids_veiculo[carga_peso > cap_peso + tolerancia].tolist()
+    violacoes['capacidade_volume'] = ids_veiculo[carga_volume > cap_volume + tolerancia].tolist()
+    violacoes['carga_minima'] = ids_veiculo[ativo & (carga_peso < carga_minima - tolerancia)].tolist()
+
+    alocada = vezes > 0
+    custo_transporte = float(custo[ativo].sum())
+    frete_morto = float(beta_v * (cap_peso[ativo] - carga_peso[ativo]).sum())
+    custo_nao_alocacao = float((peso[~alocada] * penalidade[~alocada]).sum())
+
+    return {
+        'viavel': not any(violacoes.values()),
+        'violacoes': violacoes,
+        'custo_transporte': custo_transporte,
+        'frete_morto_total': frete_morto,
+        'custo_nao_alocacao': custo_nao_alocacao,
+        'custo_total': custo_transporte + frete_morto + custo_nao_alocacao,
+        'ums_alocadas': int(alocada.sum()),
+        'ums_nao_alocadas': int((~alocada).sum()),
+        'veiculos_ativos': int(ativo.sum()),
+    }
+
+
+def imprimir_verificacao(verificacao, custo_informado=None):
+    if verificacao['viavel']:
+        print(f"✔️ Solução verificada: custo recalculado R${verificacao['custo_total']:.2f}")
+    else:
+        print("❌ Solução inviável:")
+        for tipo, ids in verificacao['violacoes'].items():
+            if ids:
+                exemplos = ', '.join(str(i) for i in ids[:10])
+                print(f"    {tipo}: {len(ids)} ({exemplos}{', ...' if len(ids) > 10 else ''})")
+
+    if custo_informado is not None and abs(custo_informado - verificacao['custo_total']) > \
+            TOLERANCIA_CUSTO * max(1.0, abs(custo_informado)):
+        print(f"⚠️ Custo informado R${custo_informado:.2f} difere do recalculado "
+              f"R${verificacao['custo_total']:.2f}")